@@ -4,20 +4,41 @@ Main application entry point
 """
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
+import asyncio
 import os
-from typing import Optional
+import time
+from typing import Any, Dict, Optional
 
 from services.riot_api import RiotAPIClient
+from services.match_store import MatchStore
+from services.player_session import PlayerSessionManager, get_display_name
+from services.match_table import iter_match_tables
+from services.match_aggregates import PlayerAggregates
+from services.pattern_accumulators import PatternAggregates
+from services.ttl_cache import TTLCache
 from services.aws_bedrock import BedrockAIService
+from services.ai_cache import AIResponseCache
 from services.analyzer import MatchAnalyzer
 from services.pattern_detector import PatternDetector
 from services.model_selector import model_selector
-from services.advanced_analytics import rank_analyzer, timeline_analyzer, challenge_analyzer
-from services.additional_analytics import clash_analyzer, mastery_analyzer, free_champion_analyzer, challenge_config_analyzer
+from services.sse import SSE_HEADERS, format_sse_event
+from services.enrichment import (
+    SECTION_DEPENDENCIES,
+    start_enrichment_tasks,
+    start_timeline_task,
+    cancel_enrichment_tasks,
+    get_task_status,
+    get_section_status,
+    build_section,
+    build_sections
+)
 from demo_data import get_demo_player_data
 from models.schemas import (
     PlayerSearchRequest,
+    MultiInsightRequest,
+    TeamCompareRequest,
     PlayerStatsResponse,
     AIInsightsResponse,
     ErrorResponse
@@ -49,13 +70,69 @@ app.add_middleware(
 )
 
 # Initialize services
-riot_client = RiotAPIClient(api_key=os.getenv("RIOT_API_KEY"))
+match_cache_path = os.getenv("MATCH_CACHE_PATH", "data/matches.db")
+match_store = MatchStore(
+    path=match_cache_path,
+    max_bytes=int(os.getenv("MATCH_CACHE_MAX_MB", 512)) * 1024 * 1024
+) if match_cache_path else None
+
+riot_client = RiotAPIClient(
+    api_key=os.getenv("RIOT_API_KEY"),
+    max_connections=int(os.getenv("RIOT_MAX_CONNECTIONS", 20)),
+    max_keepalive_connections=int(os.getenv("RIOT_MAX_KEEPALIVE", 10)),
+    http2=os.getenv("RIOT_HTTP2", "false").lower() == "true",
+    app_rate_limit=os.getenv("RIOT_APP_RATE_LIMIT", "20:1,100:120"),
+    match_store=match_store,
+    match_concurrency=int(os.getenv("RIOT_MATCH_CONCURRENCY", 10)),
+    summoner_cache_ttl=float(os.getenv("SUMMONER_CACHE_TTL", 600)),
+    static_data_ttl=float(os.getenv("STATIC_DATA_TTL", 6 * 3600))
+)
+ai_cache_path = os.getenv("AI_CACHE_PATH", "")
+ai_cache = AIResponseCache(
+    max_size=int(os.getenv("AI_CACHE_MAX", 500)),
+    ttl=float(os.getenv("AI_CACHE_TTL", 6 * 3600)),
+    path=ai_cache_path or None
+)
 bedrock_service = BedrockAIService(
     region=os.getenv("AWS_REGION", "us-east-1"),
-    model_id=os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0")
+    model_id=os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0"),
+    max_concurrency=int(os.getenv("BEDROCK_MAX_CONCURRENCY", 8)),
+    cache=ai_cache,
+    max_retries=int(os.getenv("BEDROCK_MAX_RETRIES", 3))
 )
 analyzer = MatchAnalyzer()
 pattern_detector = PatternDetector()
+player_sessions = PlayerSessionManager(
+    riot_client,
+    analyzer,
+    ttl=float(os.getenv("PLAYER_SESSION_TTL", 300)),
+    max_sessions=int(os.getenv("PLAYER_SESSION_MAX", 200)),
+    match_store=match_store
+)
+
+# Per-player season aggregates, updated with new games on each /api/season call
+# (kept in memory for a while and saved in the match store)
+season_states = TTLCache(
+    max_size=int(os.getenv("SEASON_CACHE_MAX", 100)),
+    default_ttl=float(os.getenv("SEASON_CACHE_TTL", 3600))
+)
+
+# Time budget (seconds) for enrichment calls in /api/player
+ENRICHMENT_TIMEOUT = float(os.getenv("ENRICHMENT_TIMEOUT", 4.0))
+
+
+@app.on_event("startup")
+async def startup():
+    """Open pooled Riot API connections for the app lifetime"""
+    warm_regions = [r.strip() for r in os.getenv("STATIC_WARM_REGIONS", "").split(",") if r.strip()]
+    await riot_client.start(warm_platforms=warm_regions)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled Riot API connections and Bedrock workers"""
+    await riot_client.close()
+    bedrock_service.close()
 
 
 @app.get("/")
@@ -87,15 +164,22 @@ async def health_check():
 async def get_player_stats(
     region: str,
     summoner_name: str,
-    match_count: Optional[int] = Query(default=20, ge=1, le=100)
+    match_count: Optional[int] = Query(default=20, ge=1, le=100),
+    enrichment_timeout: Optional[float] = Query(default=None, ge=0, le=30)
 ):
     """
     Fetch player statistics and match history
     
+    Enrichment sections that miss the time budget are returned with
+    status "pending" (or "unavailable" if their call failed) instead of
+    delaying the response.
+    
     Args:
         region: League region (e.g., na1, euw1, kr)
         summoner_name: Player's summoner name
         match_count: Number of recent matches to analyze (1-100)
+        enrichment_timeout: Seconds to wait for enrichment sections once
+            the matches are loaded (defaults to ENRICHMENT_TIMEOUT)
     
     Returns:
         Comprehensive player statistics
@@ -111,136 +195,62 @@ async def get_player_stats(
             )
         
         # Get display name (handle both old 'name' and new 'gameName#tagLine' formats)
-        if 'gameName' in summoner and 'tagLine' in summoner:
-            display_name = f"{summoner['gameName']}#{summoner['tagLine']}"
-        elif 'name' in summoner:
-            display_name = summoner['name']
-        else:
-            display_name = summoner_name
+        display_name = get_display_name(summoner, summoner_name)
         
-        # Get match history
-        matches = await riot_client.get_match_history(
-            region=region,
-            puuid=summoner["puuid"],
-            count=match_count
-        )
-        
-        if not matches:
-            raise HTTPException(
-                status_code=404,
-                detail="No matches found for this summoner"
-            )
-        
-        # Analyze matches
-        stats = analyzer.analyze_matches(matches, summoner["puuid"])
+        puuid = summoner["puuid"]
         
         # === ENHANCED ANALYTICS (PARALLEL EXECUTION) ===
         
-        # Run all independent API calls in parallel for speed
-        import asyncio
-        
-        # Group 1: Critical analytics (must succeed)
-        ranked_task = riot_client.get_ranked_stats(region, summoner["puuid"])
-        challenges_task = riot_client.get_challenges(region, summoner["puuid"])
-        active_game_task = riot_client.get_active_game(region, summoner["puuid"])
-        
-        # Group 2: Timeline (depends on matches)
-        timeline_task = None
-        if matches:
-            most_recent_match_id = matches[0].get("metadata", {}).get("matchId")
-            if most_recent_match_id:
-                timeline_task = riot_client.get_match_timeline(region, most_recent_match_id)
-        
-        # Group 3: Additional analytics (optional, won't block if they fail)
-        clash_task = riot_client.get_clash_data(region, summoner["puuid"])
-        total_mastery_task = riot_client.get_total_mastery_score(region, summoner["puuid"])
-        top_masteries_task = riot_client.get_top_champion_masteries(region, summoner["puuid"], 10)
-        rotation_task = riot_client.get_champion_rotations(region)
-        challenge_config_task = riot_client.get_challenge_config(region)
-        
-        # Execute all tasks in parallel with error handling
-        results = await asyncio.gather(
-            ranked_task,
-            challenges_task,
-            active_game_task,
-            timeline_task if timeline_task else asyncio.sleep(0),
-            clash_task,
-            total_mastery_task,
-            top_masteries_task,
-            rotation_task,
-            challenge_config_task,
-            return_exceptions=True  # Don't fail if one API fails
-        )
+        # Start independent enrichment calls now so they overlap the match fetch
+        enrichment_tasks = start_enrichment_tasks(riot_client, region, puuid)
         
-        # Unpack results with error handling
-        ranked_data = results[0] if not isinstance(results[0], Exception) else None
-        challenges_data = results[1] if not isinstance(results[1], Exception) else None
-        active_game = results[2] if not isinstance(results[2], Exception) else None
-        timeline_data = results[3] if not isinstance(results[3], Exception) else None
-        clash_data = results[4] if not isinstance(results[4], Exception) else []
-        total_mastery = results[5] if not isinstance(results[5], Exception) else 0
-        top_masteries = results[6] if not isinstance(results[6], Exception) else []
-        rotation_data = results[7] if not isinstance(results[7], Exception) else None
-        challenge_config = results[8] if not isinstance(results[8], Exception) else []
-        
-        # Analyze results
-        rank_analysis = rank_analyzer.analyze_rank(ranked_data) if ranked_data else {"has_ranked": False}
-        challenge_analysis = challenge_analyzer.analyze_challenges(challenges_data) if challenges_data else {"available": False}
-        is_playing_now = active_game is not None
-        
-        # Timeline analysis
-        timeline_analysis = {"available": False}
-        if timeline_data and matches:
-            participants = matches[0].get("info", {}).get("participants", [])
-            player_data = next(
-                (p for p in participants if p.get("puuid") == summoner["puuid"]),
-                None
+        try:
+            # Get match history and stats (core stats are always returned);
+            # the session is reused by the AI endpoints that follow
+            session = await player_sessions.get_session_for_summoner(
+                region, summoner, summoner_name, match_count
             )
-            if player_data:
-                participant_id = player_data.get("participantId", 1)
-                win = player_data.get("win", False)
-                timeline_analysis = timeline_analyzer.analyze_timeline(
-                    timeline_data,
-                    participant_id,
-                    win
+            matches = session.matches
+            
+            if not matches:
+                raise HTTPException(
+                    status_code=404,
+                    detail="No matches found for this summoner"
                 )
+            
+            # Timeline depends on the most recent match
+            timeline_task = start_timeline_task(riot_client, region, matches)
+            if timeline_task:
+                enrichment_tasks["timeline"] = timeline_task
+            
+            # The enrichment budget starts once matches are in, so a slow
+            # match fetch doesn't eat it (the timeline only starts now)
+            await asyncio.wait(
+                enrichment_tasks.values(),
+                timeout=enrichment_timeout if enrichment_timeout is not None else ENRICHMENT_TIMEOUT
+            )
+        finally:
+            # Late calls are dropped from this response. Their upstream
+            # request is shielded and still finishes for concurrent callers,
+            # but only static data (rotation, challenge config) is cached
+            cancel_enrichment_tasks(enrichment_tasks)
         
-        # Additional analytics
-        clash_analysis = clash_analyzer.analyze_clash_history(clash_data)
-        mastery_analysis = mastery_analyzer.analyze_total_mastery(total_mastery, top_masteries)
-        
-        # Free rotation analysis
-        recent_champs = [p.get('championId') for match in matches[:20] 
-                        for p in match.get('info', {}).get('participants', []) 
-                        if p.get('puuid') == summoner["puuid"]]
-        rotation_analysis = free_champion_analyzer.analyze_free_rotation_usage(rotation_data, recent_champs)
-        
-        # Enrich challenges
-        enriched_challenges = challenge_config_analyzer.enrich_challenges(challenges_data, challenge_config)
+        # Sections that missed the deadline come back as pending/unavailable
+        sections = build_sections(enrichment_tasks, matches, session.table, puuid)
+        is_playing_now = sections["live_status"].get("in_game", False)
         
         return {
             "summoner": {
                 "name": display_name,
                 "level": summoner["summonerLevel"],
                 "profileIconId": summoner["profileIconId"],
-                "puuid": summoner["puuid"],
+                "puuid": puuid,
                 "is_playing_now": is_playing_now
             },
-            "stats": stats,
+            "stats": session.stats,
             "matchCount": len(matches),
-            "enhanced_analytics": {
-                "ranked": rank_analysis,
-                "challenges": challenge_analysis,
-                "challenges_enriched": enriched_challenges,
-                "recent_match_timeline": timeline_analysis,
-                "live_status": {
-                    "in_game": is_playing_now,
-                    "message": "Currently in a match!" if is_playing_now else "Offline or not in game"
-                },
-                "clash": clash_analysis,
-                "mastery": mastery_analysis,
-                "free_rotation": rotation_analysis
-            }
+            "enhanced_analytics": sections,
+            "pending_sections": [name for name, data in sections.items() if "status" in data]
         }
         
     except HTTPException:
@@ -252,6 +262,296 @@ async def get_player_stats(
         )
 
 
+@app.get("/api/player/{region}/{summoner_name}/stream")
+async def stream_player_stats(
+    region: str,
+    summoner_name: str,
+    match_count: Optional[int] = Query(default=20, ge=1, le=100),
+    timeout: float = Query(default=30, ge=1, le=120)
+):
+    """
+    Stream player statistics section by section (Server-Sent Events)
+    
+    Events, in order: "summoner" (header), "stats" (core stats), one
+    "section" event per enhanced_analytics section as soon as its calls
+    finish, then "done". Sections not ready within the timeout are sent
+    with status "pending".
+    
+    Args:
+        region: League region (e.g., na1, euw1, kr)
+        summoner_name: Player's summoner name
+        match_count: Number of recent matches to analyze (1-100)
+        timeout: Seconds to keep waiting for enrichment sections once
+            the matches are loaded
+    
+    Returns:
+        text/event-stream response
+    """
+    # Resolve up front so a missing summoner is still a plain 404
+    summoner = await riot_client.get_summoner_by_name(region, summoner_name)
+    
+    if not summoner:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Summoner '{summoner_name}' not found in region '{region}'"
+        )
+    
+    puuid = summoner["puuid"]
+    
+    async def event_stream():
+        enrichment_tasks = start_enrichment_tasks(riot_client, region, puuid)
+        
+        try:
+            yield format_sse_event("summoner", {
+                "name": get_display_name(summoner, summoner_name),
+                "level": summoner["summonerLevel"],
+                "profileIconId": summoner["profileIconId"],
+                "puuid": puuid
+            })
+            
+            session = await player_sessions.get_session_for_summoner(
+                region, summoner, summoner_name, match_count
+            )
+            matches = session.matches
+            
+            if not matches:
+                yield format_sse_event("error", {"detail": "No matches found for this summoner"})
+                return
+            
+            yield format_sse_event("stats", {
+                "stats": session.stats,
+                "matchCount": len(matches)
+            })
+            
+            timeline_task = start_timeline_task(riot_client, region, matches)
+            if timeline_task:
+                enrichment_tasks["timeline"] = timeline_task
+            
+            # Timeout counts from here, so a slow match fetch doesn't eat it
+            deadline = time.monotonic() + timeout
+            
+            # Emit each section as soon as every call it needs has finished
+            remaining = list(SECTION_DEPENDENCIES)
+            while remaining:
+                status = {name: get_task_status(task) for name, task in enrichment_tasks.items()}
+                results = {name: task.result() for name, task in enrichment_tasks.items() if status[name] == "ok"}
+                
+                for section in list(remaining):
+                    section_status = get_section_status(section, status)
+                    if section_status == "pending":
+                        continue
+                    data = (
+                        build_section(section, results, matches, session.table, puuid)
+                        if section_status == "ok"
+                        else {"available": False, "status": section_status}
+                    )
+                    yield format_sse_event("section", {"name": section, "data": data})
+                    remaining.remove(section)
+                
+                in_flight = [task for task in enrichment_tasks.values() if not task.done()]
+                time_left = deadline - time.monotonic()
+                if not remaining or not in_flight or time_left <= 0:
+                    break
+                
+                await asyncio.wait(in_flight, timeout=time_left, return_when=asyncio.FIRST_COMPLETED)
+            
+            for section in remaining:
+                yield format_sse_event("section", {
+                    "name": section,
+                    "data": {"available": False, "status": "pending"}
+                })
+            
+            yield format_sse_event("done", {"pending_sections": remaining})
+            
+        except Exception as e:
+            yield format_sse_event("error", {"detail": f"Error fetching player data: {str(e)}"})
+        finally:
+            cancel_enrichment_tasks(enrichment_tasks)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+async def fold_season_matches(
+    region: str,
+    puuid: str,
+    start_time: Optional[int],
+    end_time: Optional[int],
+    queue: Optional[int],
+    max_matches: int,
+    known_ids: set
+):
+    """
+    Fold a player's matches into fresh season aggregates chunk by chunk
+    
+    Raw payloads are dropped as soon as their chunk is reduced to the
+    player's rows. Games the player isn't in and known_ids are skipped.
+    
+    Returns:
+        (PlayerAggregates, PatternAggregates) of the folded games
+    """
+    aggregates = PlayerAggregates()
+    pattern_state = PatternAggregates()
+    async for table in iter_match_tables(
+        riot_client.iter_match_history(
+            region,
+            puuid,
+            start_time=start_time,
+            end_time=end_time,
+            queue_type=queue,
+            max_matches=max_matches
+        ),
+        puuid
+    ):
+        table = table.take(table.found & ~table.isin(known_ids))
+        aggregates.update(table)
+        pattern_state.update(table)
+    return aggregates, pattern_state
+
+
+def get_season_scope(queue: Optional[int], start_time: Optional[int], end_time: Optional[int], max_matches: int) -> str:
+    """MatchStore scope of a player's season state for one request window"""
+    return f"season:{queue}:{start_time}:{end_time}:{max_matches}"
+
+
+async def load_season_state(puuid: str, scope: str) -> Optional[Dict[str, Any]]:
+    """
+    Season state saved in the match store
+    
+    Returns:
+        {"aggregates", "patterns"}, or None if nothing usable is stored
+        (no store, never saved, or saved by an older layout)
+    """
+    if not match_store:
+        return None
+    
+    data = await match_store.get_aggregates(puuid, scope)
+    if not data:
+        return None
+    
+    try:
+        return {
+            "aggregates": PlayerAggregates.from_dict(data["aggregates"]),
+            "patterns": PatternAggregates.from_dict(data["patterns"])
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@app.get("/api/season/{region}/{summoner_name}")
+async def get_season_stats(
+    region: str,
+    summoner_name: str,
+    start_time: Optional[int] = Query(default=None, description="Epoch seconds (defaults to Jan 1)"),
+    end_time: Optional[int] = Query(default=None, description="Epoch seconds"),
+    queue: Optional[int] = Query(default=None, description="Queue filter (420 = Ranked Solo/Duo)"),
+    max_matches: int = Query(default=1000, ge=1, le=5000)
+):
+    """
+    Full-season recap beyond the 100-match cap
+    
+    Matches are streamed page by page and folded into running aggregates
+    a chunk at a time, so memory stays flat for 1,000+ games.
+    The player's season aggregates are saved, so repeat calls only fetch
+    and fold in games played since the last one.
+    
+    Args:
+        region: League region (e.g., na1, euw1, kr)
+        summoner_name: Player's summoner name
+        start_time: Season window start
+        end_time: Season window end
+        queue: Optional queue filter
+        max_matches: Cap on matches analyzed
+    
+    Returns:
+        Season statistics and detected patterns
+    """
+    try:
+        summoner = await riot_client.get_summoner_by_name(region, summoner_name)
+        
+        if not summoner:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Summoner '{summoner_name}' not found in region '{region}'"
+            )
+        
+        puuid = summoner["puuid"]
+        
+        # Reuse this player's season state; only newer games are fetched
+        state_key = (region.lower(), puuid, queue, start_time, end_time, max_matches)
+        state_scope = get_season_scope(queue, start_time, end_time, max_matches)
+        state = season_states.get(state_key)
+        if state is None:
+            # Not in memory (restart or eviction) - pick up the saved state
+            state = await load_season_state(puuid, state_scope)
+        fetch_from = start_time
+        if state and state["aggregates"].newest_game_creation:
+            fetch_from = max(start_time or 0, state["aggregates"].newest_game_creation // 1000)
+        
+        new_aggregates, new_patterns = await fold_season_matches(
+            region, puuid, fetch_from, end_time, queue, max_matches,
+            state["aggregates"].match_ids if state else set()
+        )
+        
+        rebuilt = False
+        if state and state["aggregates"].games + new_aggregates.games > max_matches:
+            # The newest max_matches games no longer include the oldest
+            # counted ones, and aggregates can't drop games - rebuild
+            # (earlier matches come from the match store)
+            new_aggregates, new_patterns = await fold_season_matches(
+                region, puuid, start_time, end_time, queue, max_matches, set()
+            )
+            rebuilt = True
+        
+        # No awaits from here on, so concurrent requests can't double count
+        state = season_states.get(state_key) or state
+        fresh_state = {"aggregates": new_aggregates, "patterns": new_patterns}
+        if state is None or rebuilt:
+            state = fresh_state
+        elif (
+            not state["aggregates"].match_ids & new_aggregates.match_ids
+            and state["aggregates"].games + new_aggregates.games <= max_matches
+        ):
+            state["aggregates"].merge(new_aggregates)
+            state["patterns"].merge(new_patterns)
+        # else: a concurrent request already folded in these games
+        aggregates = state["aggregates"]
+        
+        if not aggregates.games:
+            raise HTTPException(
+                status_code=404,
+                detail="No matches found for this summoner in the requested window"
+            )
+        
+        season_states.set(state_key, state)
+        if match_store and (rebuilt or new_aggregates.games):
+            await match_store.put_aggregates(puuid, state_scope, {
+                "aggregates": aggregates.to_dict(),
+                "patterns": state["patterns"].to_dict()
+            })
+        
+        stats = analyzer.render_aggregates(aggregates)
+        patterns = pattern_detector.render_patterns(state["patterns"], stats)
+        
+        return {
+            "summoner": get_display_name(summoner, summoner_name),
+            "stats": stats,
+            "patterns": patterns,
+            "matchCount": aggregates.games
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching season data: {str(e)}"
+        )
+
+
 @app.post("/api/insights")
 async def generate_insights(request: PlayerSearchRequest):
     """
@@ -264,27 +564,18 @@ async def generate_insights(request: PlayerSearchRequest):
         AI-generated personalized insights
     """
     try:
-        # First get player stats
-        summoner = await riot_client.get_summoner_by_name(
+        # Reuse the player's session (matches + stats) when it's warm
+        session = await player_sessions.get_session(
             request.region,
-            request.summonerName
+            request.summonerName,
+            request.matchCount or 20
         )
         
-        if not summoner:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Summoner not found"
-            )
-        
-        # Get matches
-        matches = await riot_client.get_match_history(
-            region=request.region,
-            puuid=summoner["puuid"],
-            count=request.matchCount or 20
-        )
+        if not session:
+            raise HTTPException(status_code=404, detail="Summoner not found")
         
-        # Analyze matches
-        stats = analyzer.analyze_matches(matches, summoner["puuid"])
+        display_name = session.display_name
+        stats = session.stats
         
         # Generate AI insights
         insights = await bedrock_service.generate_year_recap(
@@ -307,6 +598,78 @@ async def generate_insights(request: PlayerSearchRequest):
         )
 
 
+@app.post("/api/ai-insights")
+async def generate_multi_insights(request: MultiInsightRequest):
+    """
+    Generate several AI features for one player in a single call
+    
+    Runs one summoner lookup, one match fetch and one analysis pass, then
+    generates every requested feature concurrently.
+    
+    Args:
+        request: Player search parameters and requested features
+            (recap, roast, personality, hidden_gems)
+    
+    Returns:
+        One entry per requested feature, plus errors for any that failed
+    """
+    try:
+        session = await player_sessions.get_session(
+            request.region,
+            request.summonerName,
+            request.matchCount or 20
+        )
+        
+        if not session:
+            raise HTTPException(status_code=404, detail="Summoner not found")
+        
+        display_name = session.display_name
+        stats = session.stats
+        
+        generators = {
+            "recap": lambda: bedrock_service.generate_year_recap(
+                summoner_name=display_name,
+                stats=stats
+            ),
+            "roast": lambda: bedrock_service.generate_roast(
+                summoner_name=display_name,
+                stats=stats
+            ),
+            "personality": lambda: bedrock_service.analyze_personality(
+                summoner_name=display_name,
+                stats=stats
+            ),
+            "hidden_gems": lambda: bedrock_service.discover_hidden_gems(
+                summoner_name=display_name,
+                stats=stats,
+                patterns=session.get_patterns(pattern_detector)
+            )
+        }
+        
+        features = list(dict.fromkeys(request.features))
+        results = await asyncio.gather(
+            *[generators[feature]() for feature in features],
+            return_exceptions=True
+        )
+        
+        response = {"summoner": display_name, "errors": {}}
+        for feature, result in zip(features, results):
+            if isinstance(result, Exception):
+                response["errors"][feature] = str(result)
+            else:
+                response[feature] = result
+        
+        return response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating insights: {str(e)}"
+        )
+
+
 @app.get("/api/regions")
 async def get_regions():
     """Get list of supported League of Legends regions"""
@@ -361,24 +724,18 @@ async def generate_roast(request: PlayerSearchRequest):
         Funny roasts based on player performance
     """
     try:
-        # Get player stats
-        summoner = await riot_client.get_summoner_by_name(
+        # Reuse the player's session (matches + stats) when it's warm
+        session = await player_sessions.get_session(
             request.region,
-            request.summonerName
+            request.summonerName,
+            request.matchCount or 30
         )
         
-        if not summoner:
+        if not session:
             raise HTTPException(status_code=404, detail="Summoner not found")
         
-        # Get matches
-        matches = await riot_client.get_match_history(
-            region=request.region,
-            puuid=summoner["puuid"],
-            count=request.matchCount or 30
-        )
-        
-        # Analyze matches
-        stats = analyzer.analyze_matches(matches, summoner["puuid"])
+        display_name = session.display_name
+        stats = session.stats
         
         # Generate roast using Nova Lite (cost-effective creative content)
         roast = await bedrock_service.generate_roast(
@@ -413,27 +770,21 @@ async def discover_hidden_gems(request: PlayerSearchRequest):
         Hidden gems discovered in gameplay
     """
     try:
-        # Get player data
-        summoner = await riot_client.get_summoner_by_name(
+        # Reuse the player's session (matches + stats) when it's warm
+        session = await player_sessions.get_session(
             request.region,
-            request.summonerName
+            request.summonerName,
+            request.matchCount or 50
         )
         
-        if not summoner:
+        if not session:
             raise HTTPException(status_code=404, detail="Summoner not found")
         
-        # Get matches
-        matches = await riot_client.get_match_history(
-            region=request.region,
-            puuid=summoner["puuid"],
-            count=request.matchCount or 50
-        )
-        
-        # Analyze matches
-        stats = analyzer.analyze_matches(matches, summoner["puuid"])
+        display_name = session.display_name
+        stats = session.stats
         
         # Detect patterns
-        patterns = pattern_detector.detect_patterns(matches, stats, summoner["puuid"])
+        patterns = session.get_patterns(pattern_detector)
         
         # Enhance with AI insights using Claude Haiku (better pattern recognition)
         gems = await bedrock_service.discover_hidden_gems(
@@ -469,24 +820,18 @@ async def analyze_personality(request: PlayerSearchRequest):
         Personality analysis and type
     """
     try:
-        # Get player data
-        summoner = await riot_client.get_summoner_by_name(
+        # Reuse the player's session (matches + stats) when it's warm
+        session = await player_sessions.get_session(
             request.region,
-            request.summonerName
+            request.summonerName,
+            request.matchCount or 40
         )
         
-        if not summoner:
+        if not session:
             raise HTTPException(status_code=404, detail="Summoner not found")
         
-        # Get matches
-        matches = await riot_client.get_match_history(
-            region=request.region,
-            puuid=summoner["puuid"],
-            count=request.matchCount or 40
-        )
-        
-        # Analyze matches
-        stats = analyzer.analyze_matches(matches, summoner["puuid"])
+        display_name = session.display_name
+        stats = session.stats
         
         # Generate personality analysis using Nova Lite (creative profiling)
         personality = await bedrock_service.analyze_personality(
@@ -509,6 +854,87 @@ async def analyze_personality(request: PlayerSearchRequest):
         )
 
 
+async def stream_ai_feature(
+    request: PlayerSearchRequest,
+    feature: str,
+    default_match_count: int
+) -> StreamingResponse:
+    """
+    Stream one AI feature as Server-Sent Events
+    
+    Events: "summoner" (display name), "token" for every generated text
+    chunk, then "result" with the same parsed output as the non-streaming
+    endpoint (or "error").
+    
+    Args:
+        request: Player search parameters
+        feature: recap, roast, personality or hidden_gems
+        default_match_count: Match window when the request doesn't set one
+    
+    Returns:
+        text/event-stream response
+    """
+    # Resolve up front so a missing summoner is still a plain 404
+    session = await player_sessions.get_session(
+        request.region,
+        request.summonerName,
+        request.matchCount or default_match_count
+    )
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Summoner not found")
+    
+    patterns = session.get_patterns(pattern_detector) if feature == "hidden_gems" else None
+    
+    async def event_stream():
+        try:
+            yield format_sse_event("summoner", {"name": session.display_name})
+            
+            async for event in bedrock_service.stream_feature(
+                feature,
+                summoner_name=session.display_name,
+                stats=session.stats,
+                patterns=patterns
+            ):
+                if event["type"] == "token":
+                    yield format_sse_event("token", {"text": event["text"]})
+                else:
+                    yield format_sse_event("result", {feature: event["data"]})
+                    
+        except Exception as e:
+            yield format_sse_event("error", {"detail": f"Error generating {feature}: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@app.post("/api/insights/stream")
+async def stream_insights(request: PlayerSearchRequest):
+    """Stream the AI year recap token by token (see stream_ai_feature)"""
+    return await stream_ai_feature(request, "recap", 20)
+
+
+@app.post("/api/roast/stream")
+async def stream_roast(request: PlayerSearchRequest):
+    """Stream the roast token by token (see stream_ai_feature)"""
+    return await stream_ai_feature(request, "roast", 30)
+
+
+@app.post("/api/hidden-gems/stream")
+async def stream_hidden_gems(request: PlayerSearchRequest):
+    """Stream hidden gems token by token (see stream_ai_feature)"""
+    return await stream_ai_feature(request, "hidden_gems", 50)
+
+
+@app.post("/api/personality/stream")
+async def stream_personality(request: PlayerSearchRequest):
+    """Stream the personality analysis token by token (see stream_ai_feature)"""
+    return await stream_ai_feature(request, "personality", 40)
+
+
 @app.post("/api/compare")
 async def compare_players(
     player1: str,
@@ -529,50 +955,41 @@ async def compare_players(
         Comparative analysis and synergy score
     """
     try:
-        # Get both players
-        summoner1 = await riot_client.get_summoner_by_name(region, player1)
-        summoner2 = await riot_client.get_summoner_by_name(region, player2)
+        # Get both players concurrently
+        summoner1, summoner2 = await asyncio.gather(
+            riot_client.get_summoner_by_name(region, player1),
+            riot_client.get_summoner_by_name(region, player2)
+        )
         
         if not summoner1 or not summoner2:
             raise HTTPException(status_code=404, detail="One or both summoners not found")
         
-        # Get matches for both
-        matches1 = await riot_client.get_match_history(
-            region=region,
-            puuid=summoner1["puuid"],
-            count=matchCount
-        )
-        matches2 = await riot_client.get_match_history(
-            region=region,
-            puuid=summoner2["puuid"],
-            count=matchCount
+        # Fetch both histories together; shared matches are downloaded once
+        session1, session2 = await player_sessions.get_sessions_for_summoners(
+            region,
+            [(summoner1, player1), (summoner2, player2)],
+            match_count=matchCount
         )
+        stats1 = session1.stats
+        stats2 = session2.stats
         
-        # Analyze both
-        stats1 = analyzer.analyze_matches(matches1, summoner1["puuid"])
-        stats2 = analyzer.analyze_matches(matches2, summoner2["puuid"])
-        
-        # Calculate synergy score (simple version)
-        # In reality, this would analyze duo games together
-        role_synergy = 0
-        if stats1.get("mostPlayedRole") != stats2.get("mostPlayedRole"):
-            role_synergy = 20  # Different roles = better synergy
-        
-        stat_similarity = 100 - abs(stats1.get("winRate", 0) - stats2.get("winRate", 0))
-        synergy_score = (role_synergy + stat_similarity) / 2
+        # Synergy from the games they actually played together
+        duo = analyzer.analyze_duo(session1.matches, session2.matches, session1.puuid, session2.puuid)
+        synergy_score = analyzer.calculate_synergy_score(stats1, stats2, duo)
         
         # Generate AI comparison using Nova Lite
         comparison = await bedrock_service.generate_playstyle_comparison(stats1, stats2)
         
         return {
             "player1": {
-                "name": summoner1["name"],
+                "name": session1.display_name,
                 **stats1
             },
             "player2": {
-                "name": summoner2["name"],
+                "name": session2.display_name,
                 **stats2
             },
+            "duo": duo,
             "synergyScore": round(synergy_score, 1),
             "synergyDescription": "Good duo potential!" if synergy_score >= 60 else "Compatible playstyles",
             "comparison": comparison,
@@ -588,6 +1005,122 @@ async def compare_players(
         )
 
 
+@app.post("/api/compare/team")
+async def compare_team(request: TeamCompareRequest):
+    """
+    Compare a whole team (up to 5 players or a Clash roster)
+    
+    All member pipelines run concurrently and matches shared by teammates
+    are downloaded once.
+    
+    Args:
+        request: Region plus either a list of players or one Clash player
+        
+    Returns:
+        Per-member stats and a pairwise synergy matrix over shared games
+    """
+    try:
+        region = request.region
+        
+        if request.players:
+            # Resolve every member concurrently
+            summoners = await asyncio.gather(*[
+                riot_client.get_summoner_by_name(region, name) for name in request.players
+            ])
+            missing = [name for name, summoner in zip(request.players, summoners) if not summoner]
+            if missing:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Summoners not found: {', '.join(missing)}"
+                )
+            members = list(zip(summoners, request.players))
+        elif request.clashPlayer:
+            # Resolve the Clash roster from any member
+            captain = await riot_client.get_summoner_by_name(region, request.clashPlayer)
+            if not captain:
+                raise HTTPException(status_code=404, detail="Summoner not found")
+            
+            clash_entries = await riot_client.get_clash_data(region, captain["puuid"])
+            team_id = next((e.get("teamId") for e in clash_entries if e.get("teamId")), None)
+            team = await riot_client.get_clash_team(region, team_id) if team_id else None
+            if not team:
+                raise HTTPException(status_code=404, detail="No active Clash team found for this player")
+            
+            roster_puuids = [p.get("puuid") for p in team.get("players", []) if p.get("puuid")]
+            if captain["puuid"] not in roster_puuids:
+                roster_puuids.insert(0, captain["puuid"])
+            
+            roster = await asyncio.gather(*[
+                riot_client.get_summoner_by_puuid(region, puuid) for puuid in roster_puuids[:5]
+            ])
+            members = [(summoner, summoner["puuid"]) for summoner in roster if summoner]
+        else:
+            raise HTTPException(status_code=400, detail="Provide either players or clashPlayer")
+        
+        # Drop duplicates (same player listed twice)
+        members = list({summoner["puuid"]: (summoner, name) for summoner, name in members}.values())
+        if len(members) < 2:
+            raise HTTPException(status_code=400, detail="At least two different players are required")
+        
+        # One concurrent fetch for the whole team; shared matches are downloaded once
+        sessions = await player_sessions.get_sessions_for_summoners(
+            region,
+            members,
+            match_count=request.matchCount or 20
+        )
+        
+        # Pairwise synergy over shared games
+        size = len(sessions)
+        matrix = [[None] * size for _ in range(size)]
+        pairs = []
+        for i in range(size):
+            for j in range(i + 1, size):
+                duo = analyzer.analyze_duo(
+                    sessions[i].matches,
+                    sessions[j].matches,
+                    sessions[i].puuid,
+                    sessions[j].puuid
+                )
+                score = round(analyzer.calculate_synergy_score(sessions[i].stats, sessions[j].stats, duo), 1)
+                matrix[i][j] = matrix[j][i] = score
+                pairs.append({
+                    "player1": sessions[i].display_name,
+                    "player2": sessions[j].display_name,
+                    "duo": duo,
+                    "synergyScore": score
+                })
+        
+        team_score = sum(p["synergyScore"] for p in pairs) / len(pairs)
+        best_duo = max(pairs, key=lambda p: p["synergyScore"])
+        
+        return {
+            "members": [
+                {
+                    "name": session.display_name,
+                    "puuid": session.puuid,
+                    "totalGames": session.stats.get("totalGames", 0),
+                    "winRate": session.stats.get("winRate", 0),
+                    "avgKDA": session.stats.get("avgKDA", 0),
+                    "mostPlayedRole": session.stats.get("mostPlayedRole", "Unknown"),
+                    "topChampions": session.stats.get("topChampions", [])[:3]
+                }
+                for session in sessions
+            ],
+            "synergyMatrix": matrix,
+            "pairs": pairs,
+            "teamSynergyScore": round(team_score, 1),
+            "bestDuo": best_duo
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error comparing team: {str(e)}"
+        )
+
+
 @app.get("/api/model-stats")
 async def get_model_stats():
     """
@@ -603,6 +1136,8 @@ async def get_model_stats():
         return {
             "report": report,
             "optimization_tips": tips,
+            "bedrock_queue": bedrock_service.get_concurrency_stats(),
+            "ai_cache": ai_cache.get_stats(),
             "message": "Model Whisperer Prize Entry - Intelligent cost optimization"
         }
         
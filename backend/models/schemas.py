@@ -2,7 +2,7 @@
 Pydantic models for request/response schemas
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 
@@ -13,6 +13,34 @@ class PlayerSearchRequest(BaseModel):
     matchCount: Optional[int] = Field(default=20, ge=1, le=100)
 
 
+AIFeature = Literal["recap", "roast", "personality", "hidden_gems"]
+
+
+class MultiInsightRequest(PlayerSearchRequest):
+    """Request model for generating several AI features in one call"""
+    features: List[AIFeature] = Field(
+        default=["recap", "roast", "personality", "hidden_gems"],
+        min_length=1,
+        description="AI features to generate"
+    )
+
+
+class TeamCompareRequest(BaseModel):
+    """Request model for comparing a group of players (e.g. a Clash team)"""
+    region: str = Field(..., description="Region code (e.g., na1, euw1)")
+    players: Optional[List[str]] = Field(
+        default=None,
+        min_length=2,
+        max_length=5,
+        description="Summoner names / Riot IDs of the team members"
+    )
+    clashPlayer: Optional[str] = Field(
+        default=None,
+        description="Any roster member; the rest of their Clash team is looked up"
+    )
+    matchCount: Optional[int] = Field(default=20, ge=1, le=100)
+
+
 class ChampionStats(BaseModel):
     """Statistics for a specific champion"""
     championId: int
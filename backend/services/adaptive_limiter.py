@@ -0,0 +1,100 @@
+"""
+Adaptive Concurrency Limiter
+AIMD concurrency limits per Bedrock model, driven by throttling responses
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Any
+
+
+class ThrottledError(Exception):
+    """Raised inside a limit slot when the model throttled the request"""
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit that grows by one per window of successful calls
+    (additive increase) and halves when the model throttles us
+    (multiplicative decrease).
+    """
+
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 32):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttles = 0
+        self._condition = asyncio.Condition()
+
+    def has_capacity(self) -> bool:
+        """True if a call could start right away"""
+        return self.in_flight < int(self.limit)
+
+    def on_success(self):
+        """Additive increase: about +1 after a full limit's worth of successes"""
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_throttle(self):
+        """Multiplicative decrease"""
+        self.throttles += 1
+        self.limit = max(self.minimum, self.limit / 2)
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one call slot
+
+        Raise ThrottledError inside the block to record a throttle; any
+        other exception leaves the limit unchanged.
+        """
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(self.has_capacity)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+        try:
+            yield
+        except ThrottledError:
+            self.on_throttle()
+            raise
+        else:
+            self.on_success()
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current limit and usage"""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "throttles": self.throttles
+        }
+
+
+class AdaptiveLimiter:
+    """One AdaptiveLimit per model ID"""
+
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 32):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limits: Dict[str, AdaptiveLimit] = {}
+
+    def get(self, model_id: str) -> AdaptiveLimit:
+        """Get (or create) the limit for a model"""
+        limit = self.limits.get(model_id)
+        if limit is None:
+            limit = AdaptiveLimit(self.initial, self.minimum, self.maximum)
+            self.limits[model_id] = limit
+        return limit
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Limit and usage per model"""
+        return {model_id: limit.get_stats() for model_id, limit in self.limits.items()}
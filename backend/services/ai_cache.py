@@ -0,0 +1,192 @@
+"""
+AI Response Cache
+Content-addressed cache of Bedrock responses keyed by task, model and prompt
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Awaitable, Callable
+
+from .ttl_cache import TTLCache
+
+
+def make_cache_key(task_type: str, model_id: str, prompt: str) -> str:
+    """
+    Hash a request into a cache key
+
+    Prompts embed the player's stats, so the prompt hash doubles as a stats
+    fingerprint. Whitespace is normalized so formatting changes don't miss.
+    """
+    normalized = " ".join(prompt.split())
+    digest = hashlib.sha256(f"{task_type}\0{model_id}\0{normalized}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AIResponseCache:
+    """
+    LRU + TTL cache of generated text with optional SQLite persistence.
+
+    Entries are dicts with text, input_tokens and output_tokens so a hit can
+    be reported as avoided cost. Concurrent misses for the same key share a
+    single generation.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 500,
+        ttl: float = 6 * 3600,
+        path: Optional[str] = None
+    ):
+        self.ttl = ttl
+        self.memory = TTLCache(max_size=max_size, default_ttl=ttl)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ai_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    input_tokens INTEGER NOT NULL,
+                    output_tokens INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def _load_sync(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read a live entry from disk"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, input_tokens, output_tokens, expires_at FROM ai_responses WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+
+        if not row or row[3] <= time.time():
+            return None
+
+        return {
+            "text": row[0],
+            "input_tokens": row[1],
+            "output_tokens": row[2],
+            "ttl": row[3] - time.time()
+        }
+
+    def _save_sync(self, key: str, entry: Dict[str, Any]):
+        """Write an entry to disk and drop expired ones"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_responses (cache_key, text, input_tokens, output_tokens, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, entry["text"], entry["input_tokens"], entry["output_tokens"], now + self.ttl)
+            )
+            self._conn.execute("DELETE FROM ai_responses WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Key from make_cache_key
+
+        Returns:
+            Dict with text, input_tokens and output_tokens, or None
+        """
+        entry = self.memory.get(key)
+        if entry is not None or self._conn is None:
+            return entry
+
+        try:
+            stored = await asyncio.to_thread(self._load_sync, key)
+        except Exception as e:
+            print(f"AI cache read error: {str(e)}")
+            return None
+
+        if stored is None:
+            return None
+
+        entry = {name: stored[name] for name in ("text", "input_tokens", "output_tokens")}
+        self.memory.set(key, entry, ttl=stored["ttl"])
+        return entry
+
+    async def set(self, key: str, entry: Dict[str, Any]):
+        """Store a response in memory and (if enabled) on disk"""
+        self.memory.set(key, entry)
+
+        if self._conn is not None:
+            try:
+                await asyncio.to_thread(self._save_sync, key, entry)
+            except Exception as e:
+                print(f"AI cache write error: {str(e)}")
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Return the cached entry, or generate it once for all waiting callers
+
+        Args:
+            key: Key from make_cache_key
+            generate: Coroutine factory returning a new entry (with
+                "cacheable": False to share it without storing it);
+                exceptions are passed to every waiting caller
+
+        Returns:
+            Entry dict, with "cached" set to True when no generation was run
+            for this caller
+        """
+        entry = await self.get(key)
+        if entry is not None:
+            return {**entry, "cached": True}
+
+        task = self._in_flight.get(key)
+        cached = task is not None
+        if task is None:
+            # Shielded task so one caller disconnecting doesn't fail the rest
+            task = asyncio.ensure_future(self._generate(key, generate))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        entry = await asyncio.shield(task)
+        return {**entry, "cached": cached}
+
+    async def _generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run one generation and cache its result (unless marked uncacheable)"""
+        entry = await generate()
+        if entry.pop("cacheable", True):
+            await self.set(key, entry)
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Memory cache size and hit counters"""
+        return {
+            "entries": len(self.memory),
+            "hits": self.memory.hits,
+            "misses": self.memory.misses,
+            "persistent": self._conn is not None
+        }
+
+    def close(self):
+        """Close the on-disk store"""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
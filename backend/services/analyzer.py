@@ -2,10 +2,10 @@
 Match Data Analyzer
 Processes and analyzes League of Legends match data
 """
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any
 from collections import defaultdict
-from datetime import datetime
-import statistics
+from .match_table import PlayerMatchTable, iter_match_tables
+from .match_aggregates import PlayerAggregates
 
 
 class MatchAnalyzer:
@@ -79,103 +79,88 @@ class MatchAnalyzer:
             Comprehensive statistics
         """
         
-        if not matches:
-            return self._empty_stats()
-        
-        # Initialize aggregation structures
-        champion_stats = defaultdict(lambda: {
-            'games': 0, 'wins': 0, 'kills': 0, 'deaths': 0, 'assists': 0
-        })
-        role_distribution = defaultdict(int)
-        monthly_performance = defaultdict(lambda: {'games': 0, 'wins': 0})
+        return self.analyze_table(PlayerMatchTable.from_matches(matches, puuid))
+    
+    def analyze_table(self, table: PlayerMatchTable) -> Dict[str, Any]:
+        """
+        Compute statistics from an extracted player match table
         
-        total_games = len(matches)
-        total_wins = 0
-        total_kills = 0
-        total_deaths = 0
-        total_assists = 0
+        Args:
+            table: Player's matches (see PlayerMatchTable)
+            
+        Returns:
+            Comprehensive statistics
+        """
         
-        best_game = None
-        best_kda = 0
+        return self.render_aggregates(PlayerAggregates().update(table))
+    
+    async def analyze_match_stream(
+        self,
+        matches: AsyncIterator[Dict[str, Any]],
+        puuid: str,
+        chunk_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Analyze a stream of matches without holding them all
         
-        pentakills = 0
-        quadrakills = 0
+        Matches are folded into running aggregates a chunk at a time and
+        the raw payloads dropped, so memory stays flat for 20 or 2,000 games.
         
-        # Process each match
-        for match in matches:
-            info = match.get('info', {})
-            participants = info.get('participants', [])
-            
-            # Find player's data
-            player_data = None
-            for participant in participants:
-                if participant.get('puuid') == puuid:
-                    player_data = participant
-                    break
-            
-            if not player_data:
-                continue
-            
-            # Extract basic stats
-            champion_id = player_data.get('championId', 0)
-            champion_name = self.get_champion_name(champion_id)
-            role = self.ROLE_MAP.get(player_data.get('teamPosition', 'UNKNOWN'), 'Fill')
-            
-            won = player_data.get('win', False)
-            kills = player_data.get('kills', 0)
-            deaths = player_data.get('deaths', 0)
-            assists = player_data.get('assists', 0)
-            
-            # Calculate KDA
-            kda = (kills + assists) / max(deaths, 1)
-            
-            # Track best game
-            if kda > best_kda:
-                best_kda = kda
-                best_game = {
-                    'champion': champion_name,
-                    'kda': kda,
-                    'kills': kills,
-                    'deaths': deaths,
-                    'assists': assists,
-                    'win': won
-                }
-            
-            # Aggregate stats
-            champion_stats[champion_id]['games'] += 1
-            champion_stats[champion_id]['wins'] += 1 if won else 0
-            champion_stats[champion_id]['kills'] += kills
-            champion_stats[champion_id]['deaths'] += deaths
-            champion_stats[champion_id]['assists'] += assists
-            champion_stats[champion_id]['name'] = champion_name
-            
-            role_distribution[role] += 1
-            
-            # Monthly tracking
-            game_date = datetime.fromtimestamp(info.get('gameCreation', 0) / 1000)
-            month_key = game_date.strftime('%Y-%m')
-            monthly_performance[month_key]['games'] += 1
-            monthly_performance[month_key]['wins'] += 1 if won else 0
+        Args:
+            matches: Match data (newest first), e.g. RiotAPIClient.iter_match_history()
+            puuid: Player's PUUID
+            chunk_size: Raw matches held at once
             
-            # Totals
-            total_wins += 1 if won else 0
-            total_kills += kills
-            total_deaths += deaths
-            total_assists += assists
+        Returns:
+            Comprehensive statistics
+        """
+        aggregates = PlayerAggregates()
+        async for table in iter_match_tables(matches, puuid, chunk_size):
+            aggregates.update(table)
+        return self.render_aggregates(aggregates)
+    
+    def render_aggregates(self, aggregates: PlayerAggregates) -> Dict[str, Any]:
+        """
+        Render aggregate state as the statistics dict
+        
+        Args:
+            aggregates: Player's accumulated match aggregates
             
-            # Special achievements
-            pentakills += player_data.get('pentaKills', 0)
-            quadrakills += player_data.get('quadraKills', 0)
+        Returns:
+            Comprehensive statistics
+        """
+        
+        if not aggregates.games:
+            return self._empty_stats()
+        
+        total_games = aggregates.games
+        total_wins = aggregates.wins
+        total_kills = aggregates.kills
+        total_deaths = aggregates.deaths
+        total_assists = aggregates.assists
+        
+        # Best game
+        best_game = None
+        if aggregates.best_game:
+            best = aggregates.best_game
+            best_game = {
+                'champion': self.get_champion_name(best['championId']),
+                'kda': best['kda'],
+                'kills': best['kills'],
+                'deaths': best['deaths'],
+                'assists': best['assists'],
+                'win': best['win']
+            }
         
         # Calculate aggregated stats
         win_rate = (total_wins / total_games * 100) if total_games > 0 else 0
         avg_kda = (total_kills + total_assists) / max(total_deaths, 1)
         
-        # Top champions
+        # Top champions (most games; ties go to the most recently played)
         top_champions = []
         for champ_id, stats in sorted(
-            champion_stats.items(),
-            key=lambda x: x[1]['games'],
+            aggregates.champions.items(),
+            key=lambda x: (x[1]['games'], x[1]['last_played']),
             reverse=True
         )[:5]:
             champ_games = stats['games']
@@ -184,7 +169,7 @@ class MatchAnalyzer:
             
             top_champions.append({
                 'championId': champ_id,
-                'championName': stats['name'],
+                'championName': self.get_champion_name(champ_id),
                 'gamesPlayed': champ_games,
                 'wins': stats['wins'],
                 'losses': champ_games - stats['wins'],
@@ -195,14 +180,28 @@ class MatchAnalyzer:
                 'avgAssists': round(stats['assists'] / champ_games, 1)
             })
         
+        # Role distribution (most recently played first)
+        role_distribution = defaultdict(int)
+        for position, stats in sorted(
+            aggregates.roles.items(),
+            key=lambda x: x[1]['last_played'],
+            reverse=True
+        ):
+            role = self.ROLE_MAP.get(position, 'Fill')
+            role_distribution[role] += stats['games']
+        
         # Most played role
         most_played_role = max(role_distribution.items(), key=lambda x: x[1])[0] if role_distribution else "Unknown"
         
+        # Monthly tracking (newest month first)
+        monthly_performance = {
+            month: {'games': stats['games'], 'wins': stats['wins']}
+            for month, stats in sorted(aggregates.months.items(), reverse=True)
+        }
+        
         # Performance trend (recent vs overall)
-        recent_matches = matches[:10] if len(matches) >= 10 else matches
-        recent_wins = sum(1 for m in recent_matches 
-                         if self._player_won(m, puuid))
-        recent_wr = (recent_wins / len(recent_matches) * 100) if recent_matches else 0
+        recent_wins = sum(1 for _, won in aggregates.recent if won)
+        recent_wr = (recent_wins / len(aggregates.recent) * 100) if aggregates.recent else 0
         
         trend = "Improving" if recent_wr > win_rate else "Declining" if recent_wr < win_rate else "Stable"
         
@@ -222,19 +221,96 @@ class MatchAnalyzer:
             'recentTrend': trend,
             'recentWinRate': round(recent_wr, 1),
             'achievements': {
-                'pentakills': pentakills,
-                'quadrakills': quadrakills
+                'pentakills': aggregates.pentakills,
+                'quadrakills': aggregates.quadrakills
             },
-            'monthlyPerformance': dict(monthly_performance)
+            'monthlyPerformance': monthly_performance
+        }
+    
+    def analyze_duo(
+        self,
+        matches_a: List[Dict[str, Any]],
+        matches_b: List[Dict[str, Any]],
+        puuid_a: str,
+        puuid_b: str
+    ) -> Dict[str, Any]:
+        """
+        Analyze the games two players actually shared
+        
+        Args:
+            matches_a: First player's matches
+            matches_b: Second player's matches
+            puuid_a: First player's PUUID
+            puuid_b: Second player's PUUID
+            
+        Returns:
+            Games together / against and their outcomes
+        """
+        ids_b = {m.get('metadata', {}).get('matchId') for m in matches_b}
+        
+        games_together = 0
+        wins_together = 0
+        games_against = 0
+        wins_against_a = 0
+        
+        for match in matches_a:
+            if match.get('metadata', {}).get('matchId') not in ids_b:
+                continue
+            
+            player_a = None
+            player_b = None
+            for participant in match.get('info', {}).get('participants', []):
+                if participant.get('puuid') == puuid_a:
+                    player_a = participant
+                elif participant.get('puuid') == puuid_b:
+                    player_b = participant
+            
+            if not player_a or not player_b:
+                continue
+            
+            if player_a.get('teamId') == player_b.get('teamId'):
+                games_together += 1
+                wins_together += 1 if player_a.get('win', False) else 0
+            else:
+                games_against += 1
+                wins_against_a += 1 if player_a.get('win', False) else 0
+        
+        return {
+            'sharedGames': games_together + games_against,
+            'gamesTogether': games_together,
+            'winsTogether': wins_together,
+            'winRateTogether': round(wins_together / games_together * 100, 1) if games_together else 0,
+            'gamesAgainst': games_against,
+            'player1WinsAgainst': wins_against_a,
+            'player2WinsAgainst': games_against - wins_against_a
         }
     
-    def _player_won(self, match: Dict[str, Any], puuid: str) -> bool:
-        """Check if player won the match"""
-        participants = match.get('info', {}).get('participants', [])
-        for participant in participants:
-            if participant.get('puuid') == puuid:
-                return participant.get('win', False)
-        return False
+    def calculate_synergy_score(
+        self,
+        stats_a: Dict[str, Any],
+        stats_b: Dict[str, Any],
+        duo: Dict[str, Any]
+    ) -> float:
+        """
+        Synergy score (0-100) from shared games, falling back to playstyle fit
+        
+        The playstyle estimate (complementary roles, similar win rates) is a
+        prior; the win rate in games played together takes over as the
+        number of those games grows (full weight at 10 games).
+        """
+        role_synergy = 0
+        if stats_a.get("mostPlayedRole") != stats_b.get("mostPlayedRole"):
+            role_synergy = 20  # Different roles = better synergy
+        
+        stat_similarity = 100 - abs(stats_a.get("winRate", 0) - stats_b.get("winRate", 0))
+        prior_score = (role_synergy + stat_similarity) / 2
+        
+        games_together = duo.get("gamesTogether", 0)
+        if not games_together:
+            return prior_score
+        
+        confidence = min(games_together / 10, 1.0)
+        return confidence * duo.get("winRateTogether", 0) + (1 - confidence) * prior_score
     
     def _empty_stats(self) -> Dict[str, Any]:
         """Return empty stats structure"""
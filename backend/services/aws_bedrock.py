@@ -3,27 +3,135 @@ AWS Bedrock AI Service
 Handles AI-powered insight generation using Amazon Bedrock
 """
 import boto3
+import asyncio
 import json
-from typing import Dict, Any, List
+import threading
+import time
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple, Callable, AsyncIterator
 import os
+import random
+from botocore.exceptions import ClientError
 from .model_selector import model_selector
+from .ai_cache import AIResponseCache, make_cache_key
+from .adaptive_limiter import AdaptiveLimiter, ThrottledError
+from .prompt_budget import calibrate_tokens, count_tokens, fit_prompt, get_token_budget, truncate_text
+
+
+# Bedrock error codes that mean "slow down", not "this request is bad"
+THROTTLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException"
+}
+
+# Tasks whose prompts ask for a JSON response
+JSON_TASK_TYPES = {"deep_analysis", "roast", "personality", "hidden_gems"}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """True if a boto3 error is Bedrock throttling or shedding load"""
+    return (
+        isinstance(error, ClientError)
+        and error.response.get("Error", {}).get("Code") in THROTTLE_ERROR_CODES
+    )
 
 
 class BedrockAIService:
     """Service for generating insights using AWS Bedrock"""
     
-    def __init__(self, region: str, model_id: str):
+    def __init__(
+        self,
+        region: str,
+        model_id: str,
+        max_concurrency: int = 8,
+        cache: Optional[AIResponseCache] = None,
+        max_retries: int = 3,
+        base_backoff: float = 0.5,
+        max_backoff: float = 8.0
+    ):
         self.region = region
         self.model_id = model_id
+        self.max_concurrency = max_concurrency
+        self.cache = cache or AIResponseCache()
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        
+        # Per-model limits learned from throttling (AIMD)
+        self.model_limits = AdaptiveLimiter(
+            initial=max(1, max_concurrency // 2),
+            maximum=max_concurrency
+        )
+        
+        # boto3 is blocking, so calls run on a dedicated pool sized to the
+        # concurrency cap, with one pooled HTTP connection per worker thread
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="bedrock"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # Queue-depth metrics
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
         
         # Initialize Bedrock Runtime client
         self.bedrock_runtime = boto3.client(
             service_name='bedrock-runtime',
             region_name=region,
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+            config=Config(
+                max_pool_connections=max_concurrency,
+                # Throttling is retried here so the adaptive limits see it
+                retries={"total_max_attempts": 1}
+            )
         )
     
+    @asynccontextmanager
+    async def _slot(self):
+        """Wait for one of the max_concurrency Bedrock slots"""
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        queued_at = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        self.total_wait_seconds += time.monotonic() - queued_at
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+    
+    def get_concurrency_stats(self) -> Dict[str, Any]:
+        """Current Bedrock queue depth and slot usage"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "avg_wait_seconds": round(self.total_wait_seconds / max(self.completed, 1), 3),
+            "model_limits": self.model_limits.get_stats()
+        }
+    
+    def close(self):
+        """Stop the Bedrock worker threads and close the response cache"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.close()
+    
     async def generate_year_recap(
         self,
         summoner_name: str,
@@ -58,8 +166,40 @@ class BedrockAIService:
     ) -> str:
         """Build prompt for year-end recap generation"""
         
-        top_champs = stats.get("topChampions", [])[:3]
-        champ_names = ", ".join([c["championName"] for c in top_champs])
+        top_champs = stats.get("topChampions", [])
+        best = stats.get('bestPerformance')
+        best_text = (
+            f"{best.get('champion')} {best.get('kills')}/{best.get('deaths')}/{best.get('assists')} "
+            f"({best.get('kda', 0):.2f} KDA, {'win' if best.get('win') else 'loss'})"
+            if best else "None"
+        )
+        
+        return fit_prompt(
+            "deep_analysis",
+            lambda n: self._format_recap_prompt(
+                summoner_name,
+                stats,
+                ", ".join([self._format_champion(c) for c in top_champs[:n]]),
+                best_text
+            ),
+            len(top_champs)
+        )
+    
+    def _format_champion(self, champion: Dict[str, Any]) -> str:
+        """One top champion for a prompt, e.g. 'Ahri (80 games, 55.0% WR, 3.40 KDA)'"""
+        return (
+            f"{champion.get('championName', '')} ({champion.get('gamesPlayed', 0)} games, "
+            f"{champion.get('winRate', 0):.1f}% WR, {champion.get('avgKDA', 0):.2f} KDA)"
+        )
+    
+    def _format_recap_prompt(
+        self,
+        summoner_name: str,
+        stats: Dict[str, Any],
+        champ_names: str,
+        best_text: str
+    ) -> str:
+        """Recap prompt text"""
         
         prompt = f"""You are an expert League of Legends coach creating a personalized year-end recap for {summoner_name}.
 
@@ -71,7 +211,7 @@ STATISTICS:
 - Average KDA: {stats.get('avgKDA', 0):.2f}
 - Top Champions: {champ_names}
 - Most Played Role: {stats.get('mostPlayedRole', 'Unknown')}
-- Best Performance: {stats.get('bestPerformance', {})}
+- Best Performance: {best_text}
 - Recent Trend: {stats.get('recentTrend', 'Stable')}
 
 Create a response in JSON format with these sections:
@@ -161,6 +301,17 @@ Return ONLY valid JSON, no additional text."""
     ) -> str:
         """Generate playstyle comparison between two players"""
         
+        prompt = fit_prompt("comparison", lambda n: self._format_comparison_prompt(player1_stats, player2_stats), 0)
+        response = await self._invoke_bedrock(prompt, task_type="comparison")
+        return response
+    
+    def _format_comparison_prompt(
+        self,
+        player1_stats: Dict[str, Any],
+        player2_stats: Dict[str, Any]
+    ) -> str:
+        """Comparison prompt text"""
+        
         prompt = f"""Compare these two League of Legends players' playstyles:
 
 Player 1:
@@ -175,8 +326,7 @@ Player 2:
 
 In 2-3 sentences, describe how their playstyles differ and if they would complement each other as duo partners."""
 
-        response = await self._invoke_bedrock(prompt, task_type="comparison")
-        return response
+        return prompt
     
     async def generate_roast(
         self,
@@ -188,6 +338,36 @@ In 2-3 sentences, describe how their playstyles differ and if they would complem
         Uses Nova Lite for creative, humorous content
         """
         
+        prompt = self._build_roast_prompt(summoner_name, stats)
+        response = await self._invoke_bedrock(prompt, task_type="roast")
+        return self._parse_roast(response)
+    
+    def _build_roast_prompt(
+        self,
+        summoner_name: str,
+        stats: Dict[str, Any]
+    ) -> str:
+        """Build prompt for roast generation"""
+        
+        top_champs = stats.get('topChampions', [])
+        return fit_prompt(
+            "roast",
+            lambda n: self._format_roast_prompt(
+                summoner_name,
+                stats,
+                ', '.join([self._format_champion(c) for c in top_champs[:n]])
+            ),
+            len(top_champs)
+        )
+    
+    def _format_roast_prompt(
+        self,
+        summoner_name: str,
+        stats: Dict[str, Any],
+        champ_names: str
+    ) -> str:
+        """Roast prompt text"""
+        
         # Extract embarrassing stats
         death_avg = stats.get('avgDeaths', 0)
         win_rate = stats.get('winRate', 0)
@@ -201,6 +381,7 @@ Generate a hilarious roast for {summoner_name} based on these stats:
 - Win Rate: {win_rate:.1f}%
 - KDA: {kda:.2f}
 - Recent Trend: {trend}
+- Champions: {champ_names or 'None'}
 
 Rules:
 1. Be funny and creative, but not mean-spirited
@@ -211,11 +392,13 @@ Rules:
 
 Format: Return roasts as a JSON array of strings.
 Example: {{"roasts": ["Roast 1", "Roast 2"]}}"""
-
-        response = await self._invoke_bedrock(prompt, task_type="roast")
         
+        return prompt
+    
+    def _parse_roast(self, response: str) -> Dict[str, Any]:
+        """Parse roast response"""
         try:
-            parsed = json.loads(response)
+            parsed = json.loads(self._extract_json_text(response))
             return {"roasts": parsed.get("roasts", [response])}
         except:
             return {"roast": response}
@@ -230,6 +413,36 @@ Example: {{"roasts": ["Roast 1", "Roast 2"]}}"""
         Uses Nova Lite for creative personality profiling
         """
         
+        prompt = self._build_personality_prompt(summoner_name, stats)
+        response = await self._invoke_bedrock(prompt, task_type="personality")
+        return self._parse_personality(response)
+    
+    def _build_personality_prompt(
+        self,
+        summoner_name: str,
+        stats: Dict[str, Any]
+    ) -> str:
+        """Build prompt for personality analysis"""
+        
+        top_champs = stats.get('topChampions', [])
+        return fit_prompt(
+            "personality",
+            lambda n: self._format_personality_prompt(
+                summoner_name,
+                stats,
+                ', '.join([self._format_champion(c) for c in top_champs[:n]])
+            ),
+            len(top_champs)
+        )
+    
+    def _format_personality_prompt(
+        self,
+        summoner_name: str,
+        stats: Dict[str, Any],
+        champ_names: str
+    ) -> str:
+        """Personality prompt text"""
+        
         prompt = f"""You are a League of Legends psychologist who creates fun personality profiles.
 
 Analyze {summoner_name}'s personality based on their stats:
@@ -239,7 +452,7 @@ Analyze {summoner_name}'s personality based on their stats:
 - Avg Deaths: {stats.get('avgDeaths', 0):.1f}
 - Avg Assists: {stats.get('avgAssists', 0):.1f}
 - Most Played Role: {stats.get('mostPlayedRole', 'Unknown')}
-- Top Champions: {', '.join([c.get('championName', '') for c in stats.get('topChampions', [])[:3]])}
+- Top Champions: {champ_names}
 
 Create a personality profile in JSON format:
 {{
@@ -260,11 +473,13 @@ Create a personality profile in JSON format:
 }}
 
 Make it fun, accurate to their stats, and include gaming personality traits."""
-
-        response = await self._invoke_bedrock(prompt, task_type="personality")
         
+        return prompt
+    
+    def _parse_personality(self, response: str) -> Dict[str, Any]:
+        """Parse personality response"""
         try:
-            return json.loads(response)
+            return json.loads(self._extract_json_text(response))
         except:
             return {"type": "The Player", "description": response}
     
@@ -279,10 +494,36 @@ Make it fun, accurate to their stats, and include gaming personality traits."""
         Uses Claude Haiku for better pattern analysis
         """
         
-        patterns_text = "\n".join([
-            f"- {p.get('title', '')}: {p.get('description', '')}" 
-            for p in patterns[:5]
-        ])
+        prompt = self._build_hidden_gems_prompt(summoner_name, stats, patterns)
+        response = await self._invoke_bedrock(prompt, task_type="hidden_gems")
+        return self._parse_hidden_gems(response, patterns)
+    
+    def _build_hidden_gems_prompt(
+        self,
+        summoner_name: str,
+        stats: Dict[str, Any],
+        patterns: List[Dict[str, Any]]
+    ) -> str:
+        """Build prompt for hidden gem discovery"""
+        
+        pattern_lines = [
+            f"- {p.get('title', '')}: {truncate_text(p.get('description', ''), 160)}"
+            for p in patterns
+        ]
+        
+        return fit_prompt(
+            "hidden_gems",
+            lambda n: self._format_hidden_gems_prompt(summoner_name, stats, "\n".join(pattern_lines[:n])),
+            len(pattern_lines)
+        )
+    
+    def _format_hidden_gems_prompt(
+        self,
+        summoner_name: str,
+        stats: Dict[str, Any],
+        patterns_text: str
+    ) -> str:
+        """Hidden gems prompt text"""
         
         prompt = f"""You are a data scientist analyzing League of Legends gameplay patterns.
 
@@ -308,15 +549,195 @@ Return as JSON:
 }}
 
 Make insights specific, surprising, and actionable."""
-
-        response = await self._invoke_bedrock(prompt, task_type="hidden_gems")
         
+        return prompt
+    
+    def _parse_hidden_gems(
+        self,
+        response: str,
+        patterns: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Merge AI discoveries with the detected patterns"""
         try:
-            parsed = json.loads(response)
+            parsed = json.loads(self._extract_json_text(response))
             return {"gems": patterns + parsed.get("discoveries", [])}
         except:
             return {"gems": patterns}
     
+    def _prepare_feature(
+        self,
+        feature: str,
+        summoner_name: str,
+        stats: Dict[str, Any],
+        patterns: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[str, str, Callable[[str], Dict[str, Any]]]:
+        """
+        Get prompt, task type and response parser for an AI feature
+        
+        Args:
+            feature: recap, roast, personality or hidden_gems
+            summoner_name: Player's display name
+            stats: Analyzed match statistics
+            patterns: Detected patterns (hidden_gems only)
+            
+        Returns:
+            (prompt, task_type, parser) tuple
+        """
+        if feature == "recap":
+            return self._build_recap_prompt(summoner_name, stats), "deep_analysis", self._parse_insights
+        if feature == "roast":
+            return self._build_roast_prompt(summoner_name, stats), "roast", self._parse_roast
+        if feature == "personality":
+            return self._build_personality_prompt(summoner_name, stats), "personality", self._parse_personality
+        if feature == "hidden_gems":
+            patterns = patterns or []
+            return (
+                self._build_hidden_gems_prompt(summoner_name, stats, patterns),
+                "hidden_gems",
+                lambda response: self._parse_hidden_gems(response, patterns)
+            )
+        raise ValueError(f"Unknown AI feature: {feature}")
+    
+    async def stream_feature(
+        self,
+        feature: str,
+        summoner_name: str,
+        stats: Dict[str, Any],
+        patterns: Optional[List[Dict[str, Any]]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate an AI feature token by token
+        
+        Args:
+            feature: recap, roast, personality or hidden_gems
+            summoner_name: Player's display name
+            stats: Analyzed match statistics
+            patterns: Detected patterns (hidden_gems only)
+            
+        Yields:
+            {"type": "token", "text": ...} while generating, then
+            {"type": "result", "data": ...} with the parsed output
+        """
+        prompt, task_type, parse = self._prepare_feature(feature, summoner_name, stats, patterns)
+        
+        chunks = []
+        async for text in self._stream_bedrock(prompt, task_type):
+            chunks.append(text)
+            yield {"type": "token", "text": text}
+        
+        yield {"type": "result", "data": parse("".join(chunks))}
+    
+    def _build_request_body(self, model_id: str, prompt: str, max_tokens: int = 1000) -> str:
+        """Build the invoke body for the model family"""
+        if "claude" in model_id.lower():
+            return json.dumps({
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": max_tokens,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                "temperature": 0.7,
+                "top_p": 0.9
+            })
+        elif "nova" in model_id.lower():
+            # Amazon Nova format
+            return json.dumps({
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": [{"text": prompt}]
+                    }
+                ],
+                "inferenceConfig": {
+                    "max_new_tokens": max_tokens,
+                    "temperature": 0.7,
+                    "top_p": 0.9
+                }
+            })
+        else:
+            # Default format
+            return json.dumps({
+                "prompt": prompt,
+                "max_tokens": max_tokens,
+                "temperature": 0.7
+            })
+    
+    def _extract_text(self, model_id: str, response_body: Dict[str, Any]) -> str:
+        """Extract generated text from a complete response body"""
+        if "claude" in model_id.lower():
+            return response_body['content'][0]['text']
+        elif "nova" in model_id.lower():
+            return response_body['output']['message']['content'][0]['text']
+        else:
+            return response_body.get('completion', response_body.get('output', ''))
+    
+    def _extract_usage(
+        self,
+        model_id: str,
+        response_body: Dict[str, Any],
+        prompt: str,
+        text: str
+    ) -> Tuple[int, int]:
+        """(input, output) tokens from the response, counted locally if missing"""
+        usage = response_body.get('usage') or {}
+        input_tokens = usage.get('input_tokens', usage.get('inputTokens'))
+        output_tokens = usage.get('output_tokens', usage.get('outputTokens'))
+        
+        if input_tokens is None:
+            input_tokens = count_tokens(prompt, model_id)
+        else:
+            calibrate_tokens(model_id, prompt, int(input_tokens))
+        if output_tokens is None:
+            output_tokens = count_tokens(text, model_id)
+        return int(input_tokens), int(output_tokens)
+    
+    def _extract_chunk_text(self, model_id: str, chunk: Dict[str, Any]) -> str:
+        """Extract generated text from one response-stream chunk"""
+        if "claude" in model_id.lower():
+            if chunk.get('type') == 'content_block_delta':
+                return chunk.get('delta', {}).get('text', '')
+            return ''
+        elif "nova" in model_id.lower():
+            return chunk.get('contentBlockDelta', {}).get('delta', {}).get('text', '')
+        else:
+            return chunk.get('completion', chunk.get('outputText', ''))
+    
+    def _extract_stop_reason(self, model_id: str, body: Dict[str, Any]) -> Optional[str]:
+        """Why generation stopped, from a response body or stream chunk"""
+        if "claude" in model_id.lower():
+            if body.get('type') == 'message_delta':
+                return body.get('delta', {}).get('stop_reason')
+            return body.get('stop_reason')
+        elif "nova" in model_id.lower():
+            return body.get('messageStop', body).get('stopReason')
+        else:
+            return body.get('stop_reason')
+    
+    def _extract_json_text(self, response: str) -> str:
+        """JSON part of a response (inside a ``` code block if there is one)"""
+        if '```' in response:
+            marker = '```json' if '```json' in response else '```'
+            start = response.find(marker) + len(marker)
+            end = response.find('```', start)
+            return response[start:end].strip()
+        return response.strip()
+    
+    def _is_cacheable(self, task_type: str, text: str, stop_reason: Optional[str]) -> bool:
+        """False for responses cut off at max_tokens or with broken JSON"""
+        if stop_reason == "max_tokens":
+            print(f"{task_type} response hit its output cap - not caching")
+            return False
+        if task_type in JSON_TASK_TYPES:
+            try:
+                json.loads(self._extract_json_text(text))
+            except json.JSONDecodeError:
+                print(f"{task_type} response is not valid JSON - not caching")
+                return False
+        return True
+    
     async def _invoke_bedrock(
         self, 
         prompt: str, 
@@ -337,78 +758,248 @@ Make insights specific, surprising, and actionable."""
             # Select optimal model for task
             model_id = model_selector.select_model(task_type)
             
-            # Estimate tokens (rough approximation)
-            input_tokens = len(prompt.split()) * 1.3
-            expected_output_tokens = 500 if task_type == "roast" else 1000
-            
-            print(f"Using {model_id} for {task_type}")
-            print(f"Estimated cost: ${model_selector.estimate_cost(model_id, int(input_tokens), expected_output_tokens):.4f}")
-            
-            # Prepare request body based on model
-            if "claude" in model_id.lower():
-                body = json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2000,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.7,
-                    "top_p": 0.9
-                })
-            elif "nova" in model_id.lower():
-                # Amazon Nova format
-                body = json.dumps({
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "inferenceConfig": {
-                        "max_new_tokens": 2000,
-                        "temperature": 0.7,
-                        "top_p": 0.9
-                    }
-                })
-            else:
-                # Default format
-                body = json.dumps({
-                    "prompt": prompt,
-                    "max_tokens": 2000,
-                    "temperature": 0.7
-                })
-            
-            # Invoke model
-            response = self.bedrock_runtime.invoke_model(
-                modelId=model_id,
-                body=body,
-                contentType="application/json",
-                accept="application/json"
+            entry = await self.cache.get_or_generate(
+                make_cache_key(task_type, model_id, prompt),
+                lambda: self._generate(prompt, task_type, model_id)
             )
             
-            # Parse response
-            response_body = json.loads(response['body'].read())
-            
-            # Extract text based on model format
-            if "claude" in model_id.lower():
-                text = response_body['content'][0]['text']
-            elif "nova" in model_id.lower():
-                text = response_body['output']['message']['content'][0]['text']
-            else:
-                text = response_body.get('completion', response_body.get('output', ''))
+            if entry["cached"]:
+                print(f"AI cache hit for {task_type}")
+                model_selector.track_cache_hit(model_id, entry["input_tokens"], entry["output_tokens"])
             
-            # Track usage
-            actual_output_tokens = len(text.split()) * 1.3
-            model_selector.track_usage(model_id, int(input_tokens), int(actual_output_tokens))
-            
-            return text
+            return entry["text"]
             
         except Exception as e:
             print(f"Error invoking Bedrock: {str(e)}")
             # Return fallback insights
             return self._get_fallback_response()
-
-
+    
+    async def _generate(self, prompt: str, task_type: str, model_id: str) -> Dict[str, Any]:
+        """Call Bedrock and track usage (raises on failure so nothing is cached)"""
+        max_tokens = get_token_budget(task_type)["output"]
+        input_tokens = count_tokens(prompt, model_id)
+        
+        print(f"Using {model_id} for {task_type} ({input_tokens} prompt tokens, max {max_tokens} out)")
+        print(f"Estimated cost: ${model_selector.estimate_cost(model_id, input_tokens, max_tokens):.4f}")
+        
+        # Invoke model off the event loop
+        used_model_id, response_body = await self._call_model(
+            task_type,
+            model_id,
+            lambda model: self._invoke_model_sync(model, self._build_request_body(model, prompt, max_tokens))
+        )
+        
+        text = self._extract_text(used_model_id, response_body)
+        
+        # Track usage (Bedrock's counts when the response includes them)
+        input_tokens, output_tokens = self._extract_usage(used_model_id, response_body, prompt, text)
+        model_selector.track_usage(used_model_id, input_tokens, output_tokens)
+        
+        return {
+            "text": text,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            # Failover output shouldn't stand in for the preferred model's,
+            # and truncated / unparseable output shouldn't be served again
+            "cacheable": used_model_id == model_id and self._is_cacheable(
+                task_type, text, self._extract_stop_reason(used_model_id, response_body)
+            )
+        }
+    
+    def _pick_model(self, candidates: List[str], throttled: set) -> str:
+        """First candidate with spare capacity that hasn't throttled this request"""
+        available = [model for model in candidates if model not in throttled] or candidates
+        for model in available:
+            if self.model_limits.get(model).has_capacity():
+                return model
+        return available[0]
+    
+    async def _call_model(
+        self,
+        task_type: str,
+        model_id: str,
+        call: Callable[[str], Any],
+        slots: Optional[AsyncExitStack] = None
+    ) -> Tuple[str, Any]:
+        """
+        Run a blocking Bedrock call with throttling retries and failover
+        
+        Each attempt holds a slot of the model's adaptive limit and of the
+        service-wide cap. Throttled attempts shrink that model's limit and
+        are retried after a jittered backoff, preferring cheaper models from
+        TASK_MODEL_MAP while the preferred one is saturated.
+        
+        Args:
+            task_type: Type of task (for logging)
+            model_id: Preferred model
+            call: Blocking function taking the model ID to use
+            slots: If given, the successful attempt's slots move onto this
+                stack and stay held until it closes (e.g. while a response
+                stream is read)
+            
+        Returns:
+            (model ID actually used, call result)
+        """
+        loop = asyncio.get_running_loop()
+        candidates = model_selector.get_failover_models(model_id)
+        throttled = set()
+        
+        for attempt in range(self.max_retries + 1):
+            model = self._pick_model(candidates, throttled)
+            if model != model_id:
+                print(f"Failing over {task_type} from {model_id} to {model}")
+            
+            try:
+                async with AsyncExitStack() as attempt_slots:
+                    await attempt_slots.enter_async_context(self.model_limits.get(model).slot())
+                    await attempt_slots.enter_async_context(self._slot())
+                    try:
+                        result = await loop.run_in_executor(self._executor, call, model)
+                    except ClientError as e:
+                        if is_throttling_error(e):
+                            raise ThrottledError(str(e)) from e
+                        raise
+                    if slots is not None:
+                        slots.push_async_exit(attempt_slots.pop_all())
+                    return model, result
+            except ThrottledError as e:
+                if attempt == self.max_retries:
+                    raise e.__cause__
+                
+                throttled.add(model)
+                # Full jitter so throttled callers don't retry in lockstep
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+                print(f"Bedrock throttled {model}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+    
+    def _invoke_model_sync(self, model_id: str, body: str) -> Dict[str, Any]:
+        """Blocking invoke_model call (runs on the Bedrock thread pool)"""
+        response = self.bedrock_runtime.invoke_model(
+            modelId=model_id,
+            body=body,
+            contentType="application/json",
+            accept="application/json"
+        )
+        return json.loads(response['body'].read())
+    
+    async def _stream_bedrock(
+        self,
+        prompt: str,
+        task_type: str = "deep_analysis"
+    ) -> AsyncIterator[str]:
+        """
+        Invoke Bedrock with response streaming
+        
+        Opening the stream goes through _call_model (retries, failover);
+        the blocking event stream is then read on the Bedrock thread pool
+        and handed to the event loop chunk by chunk. The model's adaptive
+        slot and the concurrency slot taken to open the stream are held
+        until it is finished or abandoned, so long streams count against
+        the model's limit.
+        
+        Args:
+            prompt: Input prompt for the model
+            task_type: Type of task for model selection
+            
+        Yields:
+            Generated text chunks (the fallback response if the call fails
+            before any text was produced)
+        """
+        model_id = model_selector.select_model(task_type)
+        cache_key = make_cache_key(task_type, model_id, prompt)
+        
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            print(f"AI cache hit for {task_type}")
+            model_selector.track_cache_hit(model_id, cached["input_tokens"], cached["output_tokens"])
+            yield cached["text"]
+            return
+        
+        print(f"Streaming {model_id} for {task_type}")
+        
+        slots = AsyncExitStack()
+        try:
+            used_model_id, response = await self._call_model(
+                task_type,
+                model_id,
+                lambda model: self.bedrock_runtime.invoke_model_with_response_stream(
+                    modelId=model,
+                    body=self._build_request_body(model, prompt, get_token_budget(task_type)["output"]),
+                    contentType="application/json",
+                    accept="application/json"
+                ),
+                slots=slots
+            )
+        except Exception as e:
+            print(f"Error streaming from Bedrock: {str(e)}")
+            yield self._get_fallback_response()
+            return
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        usage = {}
+        stop = {}
+        stopped = threading.Event()
+        
+        def read_stream():
+            try:
+                for event in response['body']:
+                    if stopped.is_set():
+                        # Client went away - stop reading and free the thread
+                        break
+                    chunk = json.loads(event.get('chunk', {}).get('bytes', b'{}'))
+                    
+                    # Final chunk carries token counts for every model family
+                    metrics = chunk.get('amazon-bedrock-invocationMetrics')
+                    if metrics:
+                        usage.update(metrics)
+                    
+                    stop_reason = self._extract_stop_reason(used_model_id, chunk)
+                    if stop_reason:
+                        stop["reason"] = stop_reason
+                    
+                    text = self._extract_chunk_text(used_model_id, chunk)
+                    if text:
+                        loop.call_soon_threadsafe(queue.put_nowait, text)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+        
+        chunks = []
+        failed = False
+        async with slots:
+            reader = loop.run_in_executor(self._executor, read_stream)
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is done:
+                        break
+                    if isinstance(item, Exception):
+                        failed = True
+                        print(f"Error streaming from Bedrock: {str(item)}")
+                        if not chunks:
+                            yield self._get_fallback_response()
+                        continue
+                    chunks.append(item)
+                    yield item
+            finally:
+                stopped.set()
+                await reader
+        
+        if chunks:
+            text = "".join(chunks)
+            if 'inputTokenCount' in usage:
+                calibrate_tokens(used_model_id, prompt, int(usage['inputTokenCount']))
+            input_tokens = int(usage.get('inputTokenCount', count_tokens(prompt, used_model_id)))
+            output_tokens = int(usage.get('outputTokenCount', count_tokens(text, used_model_id)))
+            model_selector.track_usage(used_model_id, input_tokens, output_tokens)
+            
+            # Only complete, well-formed streams from the preferred model are reusable
+            if not failed and used_model_id == model_id and self._is_cacheable(task_type, text, stop.get("reason")):
+                await self.cache.set(cache_key, {
+                    "text": text,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens
+                })
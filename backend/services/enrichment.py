@@ -0,0 +1,173 @@
+"""
+Player Enrichment Sections
+Builds the enhanced_analytics sections of /api/player from Riot API calls
+"""
+import asyncio
+from typing import Dict, List, Any, Optional
+
+from .advanced_analytics import rank_analyzer, timeline_analyzer, challenge_analyzer
+from .additional_analytics import clash_analyzer, mastery_analyzer, free_champion_analyzer, challenge_config_analyzer
+from .match_table import PlayerMatchTable
+
+
+# Section name -> enrichment calls it is built from
+SECTION_DEPENDENCIES = {
+    "ranked": ["ranked"],
+    "challenges": ["challenges"],
+    "challenges_enriched": ["challenges", "challenge_config"],
+    "recent_match_timeline": ["timeline"],
+    "live_status": ["active_game"],
+    "clash": ["clash"],
+    "mastery": ["total_mastery", "top_masteries"],
+    "free_rotation": ["rotation"]
+}
+
+
+def start_enrichment_tasks(riot_client, region: str, puuid: str) -> Dict[str, asyncio.Task]:
+    """Start every enrichment call that doesn't depend on match history"""
+    return {
+        "ranked": asyncio.create_task(riot_client.get_ranked_stats(region, puuid)),
+        "challenges": asyncio.create_task(riot_client.get_challenges(region, puuid)),
+        "active_game": asyncio.create_task(riot_client.get_active_game(region, puuid)),
+        "clash": asyncio.create_task(riot_client.get_clash_data(region, puuid)),
+        "total_mastery": asyncio.create_task(riot_client.get_total_mastery_score(region, puuid)),
+        "top_masteries": asyncio.create_task(riot_client.get_top_champion_masteries(region, puuid, 10)),
+        "rotation": asyncio.create_task(riot_client.get_champion_rotations(region)),
+        "challenge_config": asyncio.create_task(riot_client.get_challenge_config(region))
+    }
+
+
+def start_timeline_task(riot_client, region: str, matches: List[Dict[str, Any]]) -> Optional[asyncio.Task]:
+    """Start the timeline call for the most recent match"""
+    most_recent_match_id = matches[0].get("metadata", {}).get("matchId") if matches else None
+    if not most_recent_match_id:
+        return None
+    return asyncio.create_task(riot_client.get_match_timeline(region, most_recent_match_id))
+
+
+def cancel_enrichment_tasks(tasks: Dict[str, asyncio.Task]):
+    """Cancel unfinished calls and mark failed ones as handled"""
+    for task in tasks.values():
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+
+
+def get_task_status(task: asyncio.Task) -> str:
+    """'ok', 'pending' (not finished / cancelled) or 'unavailable' (failed)"""
+    if not task.done() or task.cancelled():
+        return "pending"
+    if task.exception() is not None:
+        return "unavailable"
+    return "ok"
+
+
+def get_section_status(section: str, status: Dict[str, str]) -> str:
+    """Worst status among the calls a section depends on"""
+    statuses = [status.get(name, "unavailable") for name in SECTION_DEPENDENCIES[section]]
+    for candidate in ("pending", "unavailable"):
+        if candidate in statuses:
+            return candidate
+    return "ok"
+
+
+def build_section(
+    section: str,
+    results: Dict[str, Any],
+    matches: List[Dict[str, Any]],
+    table: PlayerMatchTable,
+    puuid: str
+) -> Dict[str, Any]:
+    """
+    Build one enhanced_analytics section
+
+    Args:
+        section: Section name (see SECTION_DEPENDENCIES)
+        results: Enrichment call name -> result (missing if not available)
+        matches: Player's recent matches (newest first)
+        table: The same matches as a PlayerMatchTable
+        puuid: Player UUID
+
+    Returns:
+        Section data
+    """
+    if section == "ranked":
+        ranked_data = results.get("ranked")
+        return rank_analyzer.analyze_rank(ranked_data) if ranked_data else {"has_ranked": False}
+
+    if section == "challenges":
+        challenges_data = results.get("challenges")
+        return challenge_analyzer.analyze_challenges(challenges_data) if challenges_data else {"available": False}
+
+    if section == "challenges_enriched":
+        return challenge_config_analyzer.enrich_challenges(
+            results.get("challenges"),
+            results.get("challenge_config") or []
+        )
+
+    if section == "recent_match_timeline":
+        timeline_data = results.get("timeline")
+        if not timeline_data or not matches:
+            return {"available": False}
+
+        participants = matches[0].get("info", {}).get("participants", [])
+        player_data = next(
+            (p for p in participants if p.get("puuid") == puuid),
+            None
+        )
+        if not player_data:
+            return {"available": False}
+
+        return timeline_analyzer.analyze_timeline(
+            timeline_data,
+            player_data.get("participantId", 1),
+            player_data.get("win", False)
+        )
+
+    if section == "live_status":
+        is_playing_now = results.get("active_game") is not None
+        return {
+            "in_game": is_playing_now,
+            "message": "Currently in a match!" if is_playing_now else "Offline or not in game"
+        }
+
+    if section == "clash":
+        return clash_analyzer.analyze_clash_history(results.get("clash") or [])
+
+    if section == "mastery":
+        return mastery_analyzer.analyze_total_mastery(
+            results.get("total_mastery") or 0,
+            results.get("top_masteries") or []
+        )
+
+    if section == "free_rotation":
+        recent_champs = table.champion_id[:20][table.found[:20]].tolist()
+        return free_champion_analyzer.analyze_free_rotation_usage(results.get("rotation"), recent_champs)
+
+    raise ValueError(f"Unknown section: {section}")
+
+
+def build_sections(
+    tasks: Dict[str, asyncio.Task],
+    matches: List[Dict[str, Any]],
+    table: PlayerMatchTable,
+    puuid: str
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Build every section from finished tasks
+
+    Sections whose calls are not ready are returned as
+    {"available": False, "status": "pending" | "unavailable"}.
+    """
+    status = {name: get_task_status(task) for name, task in tasks.items()}
+    results = {name: task.result() for name, task in tasks.items() if status[name] == "ok"}
+
+    sections = {}
+    for section in SECTION_DEPENDENCIES:
+        section_status = get_section_status(section, status)
+        if section_status == "ok":
+            sections[section] = build_section(section, results, matches, table, puuid)
+        else:
+            sections[section] = {"available": False, "status": section_status}
+    return sections
@@ -0,0 +1,282 @@
+"""
+Mergeable Match Aggregates
+Incremental per-player state behind MatchAnalyzer statistics
+"""
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from .match_table import PlayerMatchTable
+
+
+def add_group(
+    groups: Dict[Any, Dict[str, int]],
+    key: Any,
+    stats: Dict[str, int],
+    fields: Tuple[str, ...]
+):
+    """Add one group's totals (and newest game) into a group dict"""
+    entry = groups.setdefault(key, {**{field: 0 for field in fields}, 'last_played': -1})
+    for field in fields:
+        entry[field] += stats[field]
+    entry['last_played'] = max(entry['last_played'], stats.get('last_played', -1))
+
+
+class PlayerAggregates:
+    """
+    Running totals for one player's matches.
+
+    update() folds in new matches (already counted match IDs are skipped),
+    merge() combines aggregates built from disjoint shards, and
+    MatchAnalyzer.render_aggregates() turns the state into the stats dict.
+    to_dict() / from_dict() round-trip the state through JSON for storage.
+    Ordering ties (top champions, roles, best game) go to the most recently
+    played entry, which is what scanning a newest-first list produced.
+    """
+
+    RECENT_GAMES = 10
+
+    def __init__(self):
+        self.match_ids = set()
+        self.games = 0
+        self.wins = 0
+        self.kills = 0
+        self.deaths = 0
+        self.assists = 0
+        self.pentakills = 0
+        self.quadrakills = 0
+        # championId -> games, wins, kills, deaths, assists, last_played
+        self.champions: Dict[int, Dict[str, int]] = {}
+        # teamPosition -> games, last_played
+        self.roles: Dict[str, Dict[str, int]] = {}
+        # 'YYYY-MM' -> games, wins
+        self.months: Dict[str, Dict[str, int]] = {}
+        # Highest-KDA game (with championId and gameCreation)
+        self.best_game: Optional[Dict[str, Any]] = None
+        # (gameCreation, win) of the newest games, newest first
+        self.recent: List[Tuple[int, bool]] = []
+
+    @property
+    def newest_game_creation(self) -> Optional[int]:
+        """gameCreation (epoch ms) of the newest counted game"""
+        return self.recent[0][0] if self.recent else None
+
+    def update(self, table: PlayerMatchTable) -> "PlayerAggregates":
+        """
+        Fold a table of matches into the aggregates
+
+        Args:
+            table: Player's matches; rows whose match ID was already counted
+                are ignored
+
+        Returns:
+            self (for chaining)
+        """
+        new = ~table.isin(self.match_ids)
+        if not new.any():
+            return self
+
+        self.match_ids.update(match_id for match_id in table.match_ids if match_id)
+        found = table.found & new
+
+        self.games += int(new.sum())
+        self.wins += int(table.win[found].sum())
+        self.kills += int(table.kills[found].sum())
+        self.deaths += int(table.deaths[found].sum())
+        self.assists += int(table.assists[found].sum())
+        self.pentakills += int(table.pentakills[found].sum())
+        self.quadrakills += int(table.quadrakills[found].sum())
+
+        for code, stats in table.group_by(table.champion_id, found):
+            add_group(self.champions, code, stats, ("games", "wins", "kills", "deaths", "assists"))
+        for code, stats in table.group_by(table.role, found):
+            add_group(self.roles, table.role_labels[code], stats, ("games",))
+        for code, stats in table.group_by(table.month, found):
+            add_group(self.months, table.month_labels[code], stats, ("games", "wins"))
+
+        if found.any():
+            kdas = np.where(found, table.kda(), 0)
+            best_rows = np.flatnonzero(kdas == kdas.max())
+            row = int(best_rows[np.argmax(table.game_creation[best_rows])])
+            if kdas[row] > 0:
+                self._offer_best_game({
+                    'championId': int(table.champion_id[row]),
+                    'kda': float(kdas[row]),
+                    'kills': int(table.kills[row]),
+                    'deaths': int(table.deaths[row]),
+                    'assists': int(table.assists[row]),
+                    'win': bool(table.win[row]),
+                    'gameCreation': int(table.game_creation[row])
+                })
+
+        self._add_recent([
+            (int(table.game_creation[row]), bool(table.win[row]))
+            for row in np.flatnonzero(new)
+        ])
+        return self
+
+    def merge(self, other: "PlayerAggregates") -> "PlayerAggregates":
+        """
+        Combine with aggregates of a disjoint set of matches
+
+        Args:
+            other: Aggregates built from different matches
+
+        Returns:
+            self (for chaining)
+        """
+        if self.match_ids & other.match_ids:
+            raise ValueError("Cannot merge aggregates that share matches")
+
+        self.match_ids |= other.match_ids
+        for name in ("games", "wins", "kills", "deaths", "assists", "pentakills", "quadrakills"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+        for key, stats in other.champions.items():
+            add_group(self.champions, key, stats, ("games", "wins", "kills", "deaths", "assists"))
+        for key, stats in other.roles.items():
+            add_group(self.roles, key, stats, ("games",))
+        for key, stats in other.months.items():
+            add_group(self.months, key, stats, ("games", "wins"))
+
+        if other.best_game:
+            self._offer_best_game(other.best_game)
+        self._add_recent(other.recent)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready copy of the state (see from_dict)"""
+        return {
+            'match_ids': sorted(self.match_ids),
+            **{name: getattr(self, name) for name in (
+                'games', 'wins', 'kills', 'deaths', 'assists', 'pentakills', 'quadrakills'
+            )},
+            # JSON object keys are strings, so integer keys go as pairs
+            'champions': [[key, stats] for key, stats in self.champions.items()],
+            'roles': self.roles,
+            'months': self.months,
+            'best_game': self.best_game,
+            'recent': [list(result) for result in self.recent]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlayerAggregates":
+        """Rebuild aggregates saved with to_dict()"""
+        aggregates = cls()
+        aggregates.match_ids = set(data['match_ids'])
+        for name in ('games', 'wins', 'kills', 'deaths', 'assists', 'pentakills', 'quadrakills'):
+            setattr(aggregates, name, int(data[name]))
+        aggregates.champions = {int(key): dict(stats) for key, stats in data['champions']}
+        aggregates.roles = {key: dict(stats) for key, stats in data['roles'].items()}
+        aggregates.months = {key: dict(stats) for key, stats in data['months'].items()}
+        aggregates.best_game = data['best_game']
+        aggregates.recent = [(int(created), bool(win)) for created, win in data['recent']]
+        return aggregates
+
+    def _offer_best_game(self, game: Dict[str, Any]):
+        """Keep the higher-KDA game (newer one on ties)"""
+        if self.best_game is None or (game['kda'], game['gameCreation']) > (
+            self.best_game['kda'], self.best_game['gameCreation']
+        ):
+            self.best_game = game
+
+    def _add_recent(self, results: List[Tuple[int, bool]]):
+        """Keep the newest RECENT_GAMES results"""
+        combined = self.recent + list(results)
+        combined.sort(key=lambda result: result[0], reverse=True)
+        self.recent = combined[:self.RECENT_GAMES]
+
+
+class StreakRuns:
+    """
+    Win/loss runs of a block of consecutive games (newest first).
+
+    Only the runs at both ends and the longest runs are kept, so blocks can
+    be joined in constant space: an end run continues into the next block
+    when the results match.
+    """
+
+    def __init__(self):
+        self.games = 0
+        # gameCreation range of the block
+        self.newest = -1
+        self.oldest = -1
+        # (win, length) of the run at the newest / oldest end
+        self.head: Tuple[bool, int] = (False, 0)
+        self.tail: Tuple[bool, int] = (False, 0)
+        self.longest_win = 0
+        self.longest_loss = 0
+
+    @classmethod
+    def from_table(cls, table: PlayerMatchTable) -> "StreakRuns":
+        """Runs of a table's rows in row order"""
+        runs = cls()
+        if not len(table):
+            return runs
+
+        won, lengths = table.runs()
+        runs.games = len(table)
+        runs.newest = int(table.game_creation.max())
+        runs.oldest = int(table.game_creation.min())
+        runs.head = (bool(won[0]), int(lengths[0]))
+        runs.tail = (bool(won[-1]), int(lengths[-1]))
+        runs.longest_win = int(lengths[won].max(initial=0))
+        runs.longest_loss = int(lengths[~won].max(initial=0))
+        return runs
+
+    def add(self, other: "StreakRuns") -> "StreakRuns":
+        """
+        Join another block of games
+
+        The block with newer games goes in front; blocks whose time ranges
+        overlap are appended behind this one.
+
+        Args:
+            other: Runs of the games right before or after this block
+
+        Returns:
+            self (for chaining)
+        """
+        if not other.games:
+            return self
+        if not self.games:
+            vars(self).update(vars(other))
+            return self
+
+        newer, older = (other, self) if other.oldest >= self.newest else (self, other)
+        head, tail = newer.head, older.tail
+
+        joined = None
+        if newer.tail[0] == older.head[0]:
+            joined = (newer.tail[0], newer.tail[1] + older.head[1])
+            if newer.head[1] == newer.games:
+                head = joined
+            if older.tail[1] == older.games:
+                tail = joined
+
+        self.longest_win = max(newer.longest_win, older.longest_win)
+        self.longest_loss = max(newer.longest_loss, older.longest_loss)
+        if joined and joined[0]:
+            self.longest_win = max(self.longest_win, joined[1])
+        elif joined:
+            self.longest_loss = max(self.longest_loss, joined[1])
+
+        self.games = newer.games + older.games
+        self.newest, self.oldest = newer.newest, older.oldest
+        self.head, self.tail = head, tail
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready copy of the state (see from_dict)"""
+        return {**vars(self), 'head': list(self.head), 'tail': list(self.tail)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreakRuns":
+        """Rebuild runs saved with to_dict()"""
+        runs = cls()
+        for name in ('games', 'newest', 'oldest', 'longest_win', 'longest_loss'):
+            setattr(runs, name, int(data[name]))
+        runs.head = (bool(data['head'][0]), int(data['head'][1]))
+        runs.tail = (bool(data['tail'][0]), int(data['tail'][1]))
+        return runs
+
@@ -0,0 +1,110 @@
+"""
+Projected Match Decoding
+Schema-driven decoding of Match-v5 payloads down to the fields the app uses
+"""
+import json
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # Optional: pip install msgspec for the fast path
+    msgspec = None
+
+
+# Per-participant summary: what the analyzers, duo/team synergy and the
+# timeline section read. Riot sends ~100 more fields per participant.
+PARTICIPANT_SCHEMA = {
+    "puuid": str,
+    "participantId": int,
+    "teamId": int,
+    "teamPosition": str,
+    "championId": int,
+    "win": bool,
+    "kills": int,
+    "deaths": int,
+    "assists": int,
+    "pentaKills": int,
+    "quadraKills": int
+}
+
+# Kept match fields: a dict is an object, a one-item list an array of that
+# schema and a type a leaf value. Everything else is dropped while decoding.
+MATCH_SCHEMA = {
+    "metadata": {
+        "matchId": str
+    },
+    "info": {
+        "gameCreation": int,
+        # Sync cursor for match ID paging (the startTime filter uses game start)
+        "gameStartTimestamp": int,
+        "gameDuration": int,
+        "queueId": int,
+        "participants": [PARTICIPANT_SCHEMA]
+    }
+}
+
+
+def project(value: Any, schema: Any) -> Any:
+    """
+    Keep only the schema's fields of an already decoded value
+
+    Args:
+        value: Decoded JSON value
+        schema: Schema (see MATCH_SCHEMA)
+
+    Returns:
+        Projected copy (missing fields stay missing)
+    """
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            return {}
+        return {key: project(value[key], field) for key, field in schema.items() if key in value}
+    if isinstance(schema, list):
+        if not isinstance(value, list):
+            return []
+        return [project(item, schema[0]) for item in value]
+    return value
+
+
+def _struct_type(name: str, schema: Dict[str, Any]) -> Any:
+    """Build a msgspec Struct for a schema (unset fields are omitted on output)"""
+    fields = []
+    for key, field in schema.items():
+        if isinstance(field, dict):
+            field_type = _struct_type(name + key[0].upper() + key[1:], field)
+        elif isinstance(field, list):
+            field_type = List[_struct_type(name + key[0].upper() + key[1:], field[0])]
+        else:
+            field_type = field
+        fields.append((key, Union[field_type, None, msgspec.UnsetType], msgspec.UNSET))
+    return msgspec.defstruct(name, fields)
+
+
+_match_decoder = msgspec.json.Decoder(_struct_type("Match", MATCH_SCHEMA)) if msgspec else None
+
+
+def decode_match(content: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decode a Match-v5 payload, keeping only MATCH_SCHEMA fields
+
+    With msgspec the typed decoder skips unused fields without building
+    them; otherwise (or if a field has an unexpected type) the payload is
+    decoded in full and projected.
+
+    Args:
+        content: Raw JSON response body
+
+    Returns:
+        Projected match dict
+    """
+    if _match_decoder is not None:
+        try:
+            return msgspec.to_builtins(_match_decoder.decode(content))
+        except msgspec.ValidationError:
+            pass
+    return project_match(json.loads(content))
+
+
+def project_match(match: Any) -> Optional[Dict[str, Any]]:
+    """Project an already decoded match (e.g. from before projection was added)"""
+    return project(match, MATCH_SCHEMA) if isinstance(match, dict) else match
@@ -0,0 +1,292 @@
+"""
+Persistent Match Store
+Durable SQLite cache for immutable Match-v5 payloads and per-player state
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Any, Optional
+
+from .match_projection import decode_match
+
+
+class MatchStore:
+    """
+    Size-bounded on-disk cache of match details keyed by matchId.
+
+    Finished matches never change, so entries never expire; when the store
+    grows past max_bytes the least recently read matches are evicted.
+    Payloads are stored as zlib-compressed JSON of the projected match
+    (see match_projection.MATCH_SCHEMA). Per-player match-ID sync state
+    and aggregate state are kept next to them.
+    """
+
+    QUERY_CHUNK = 500
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS matches (
+                match_id TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_matches_accessed ON matches (accessed_at)"
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sync_state (
+                puuid TEXT NOT NULL,
+                queue INTEGER NOT NULL,
+                match_ids TEXT NOT NULL,
+                newest_start_time INTEGER,
+                complete INTEGER NOT NULL DEFAULT 0,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (puuid, queue)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS aggregates (
+                puuid TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (puuid, scope)
+            )
+            """
+        )
+        self._conn.commit()
+
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM matches").fetchone()
+        self._total_bytes = row[0]
+
+    def _get_many_sync(self, match_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Read several matches in one query and bump their access time"""
+        rows = []
+        with self._lock:
+            # Chunk to stay under SQLite's bound-parameter limit
+            for i in range(0, len(match_ids), self.QUERY_CHUNK):
+                chunk = match_ids[i:i + self.QUERY_CHUNK]
+                placeholders = ",".join("?" for _ in chunk)
+                chunk_rows = self._conn.execute(
+                    f"SELECT match_id, payload FROM matches WHERE match_id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+
+                if chunk_rows:
+                    hit_ids = [row[0] for row in chunk_rows]
+                    self._conn.execute(
+                        f"UPDATE matches SET accessed_at = ? WHERE match_id IN ({','.join('?' for _ in hit_ids)})",
+                        [time.time(), *hit_ids]
+                    )
+                    rows.extend(chunk_rows)
+
+            if rows:
+                self._conn.commit()
+
+        return {
+            # Payloads stored before projection are trimmed on read
+            match_id: decode_match(zlib.decompress(payload))
+            for match_id, payload in rows
+        }
+
+    def _put_many_sync(self, matches: List[Dict[str, Any]]):
+        """Write matches and evict old entries if over budget"""
+        records = []
+        for match in matches:
+            match_id = match.get("metadata", {}).get("matchId")
+            if not match_id:
+                continue
+            payload = zlib.compress(json.dumps(match, separators=(",", ":")).encode("utf-8"))
+            records.append((match_id, payload, len(payload), time.time()))
+
+        if not records:
+            return
+
+        with self._lock:
+            for match_id, payload, size, accessed_at in records:
+                previous = self._conn.execute(
+                    "SELECT size FROM matches WHERE match_id = ?", (match_id,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO matches (match_id, payload, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    (match_id, payload, size, accessed_at)
+                )
+                self._total_bytes += size - (previous[0] if previous else 0)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently read matches until 90% of the budget is free"""
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT match_id, size FROM matches ORDER BY accessed_at ASC"
+        )
+
+        evicted = []
+        for match_id, size in rows:
+            if self._total_bytes <= target:
+                break
+            evicted.append((match_id,))
+            self._total_bytes -= size
+
+        self._conn.executemany("DELETE FROM matches WHERE match_id = ?", evicted)
+
+    def _get_sync_state_sync(self, puuid: str, queue: int) -> Optional[Dict[str, Any]]:
+        """Read the stored match-ID history for a player"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT match_ids, newest_start_time, complete, synced_at FROM sync_state WHERE puuid = ? AND queue = ?",
+                (puuid, queue)
+            ).fetchone()
+
+        if not row:
+            return None
+
+        return {
+            "match_ids": json.loads(row[0]),
+            "newest_start_time": row[1],
+            "complete": bool(row[2]),
+            "synced_at": row[3]
+        }
+
+    def _put_sync_state_sync(self, puuid: str, queue: int, state: Dict[str, Any]):
+        """Write the match-ID history for a player"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (puuid, queue, match_ids, newest_start_time, complete, synced_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    puuid,
+                    queue,
+                    json.dumps(state["match_ids"]),
+                    state.get("newest_start_time"),
+                    1 if state.get("complete") else 0,
+                    time.time()
+                )
+            )
+            self._conn.commit()
+
+    def _get_aggregates_sync(self, puuid: str, scope: str) -> Optional[Dict[str, Any]]:
+        """Read a player's stored aggregate state"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM aggregates WHERE puuid = ? AND scope = ?",
+                (puuid, scope)
+            ).fetchone()
+
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def _put_aggregates_sync(self, puuid: str, scope: str, state: Dict[str, Any]):
+        """Write a player's aggregate state"""
+        payload = zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO aggregates (puuid, scope, payload, updated_at) VALUES (?, ?, ?, ?)",
+                (puuid, scope, payload, time.time())
+            )
+            self._conn.commit()
+
+    async def get_many(self, match_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up cached matches
+
+        Args:
+            match_ids: Match IDs to look up
+
+        Returns:
+            Dict of matchId -> match data for the IDs that were cached
+        """
+        try:
+            return await asyncio.to_thread(self._get_many_sync, match_ids)
+        except Exception as e:
+            print(f"Match store read error: {str(e)}")
+            return {}
+
+    async def get(self, match_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a single cached match"""
+        return (await self.get_many([match_id])).get(match_id)
+
+    async def put_many(self, matches: List[Dict[str, Any]]):
+        """Store fetched matches (keyed by metadata.matchId)"""
+        try:
+            await asyncio.to_thread(self._put_many_sync, matches)
+        except Exception as e:
+            print(f"Match store write error: {str(e)}")
+
+    async def get_sync_state(self, puuid: str, queue: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a player's incremental sync state
+
+        Args:
+            puuid: Player UUID
+            queue: Queue filter the history was synced with (None = all queues)
+
+        Returns:
+            Dict with match_ids (newest first), newest_start_time (epoch
+            seconds), complete and synced_at, or None if never synced
+        """
+        try:
+            return await asyncio.to_thread(self._get_sync_state_sync, puuid, queue or 0)
+        except Exception as e:
+            print(f"Match store read error: {str(e)}")
+            return None
+
+    async def put_sync_state(self, puuid: str, queue: Optional[int], state: Dict[str, Any]):
+        """Save a player's incremental sync state"""
+        try:
+            await asyncio.to_thread(self._put_sync_state_sync, puuid, queue or 0, state)
+        except Exception as e:
+            print(f"Match store write error: {str(e)}")
+
+    async def get_aggregates(self, puuid: str, scope: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a player's stored aggregate state
+
+        Args:
+            puuid: Player UUID
+            scope: Which aggregates (e.g. recent matches or one season window)
+
+        Returns:
+            State saved with put_aggregates, or None if there is none
+        """
+        try:
+            return await asyncio.to_thread(self._get_aggregates_sync, puuid, scope)
+        except Exception as e:
+            print(f"Match store read error: {str(e)}")
+            return None
+
+    async def put_aggregates(self, puuid: str, scope: str, state: Dict[str, Any]):
+        """Save a player's aggregate state (a JSON-ready dict, e.g. PlayerAggregates.to_dict())"""
+        try:
+            await asyncio.to_thread(self._put_aggregates_sync, puuid, scope, state)
+        except Exception as e:
+            print(f"Match store write error: {str(e)}")
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,227 @@
+"""
+Columnar Player Match Table
+One-time extraction of a player's per-match values into NumPy arrays
+"""
+import time
+from typing import AsyncIterator, Dict, List, Any, Optional, Set, Tuple
+
+import numpy as np
+
+
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+TIME_SLOT_NAMES = ["morning", "afternoon", "evening", "night"]
+
+
+def first_seen(codes: np.ndarray) -> np.ndarray:
+    """Distinct codes in order of first appearance (dict insertion order)"""
+    unique, first_index = np.unique(codes, return_index=True)
+    return unique[np.argsort(first_index)]
+
+
+def group_sum(codes: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """Sum values per code (codes are 0..size-1)"""
+    return np.bincount(codes, weights=values, minlength=size)
+
+
+class PlayerMatchTable:
+    """
+    One row per match (input order, newest first) with the player's values.
+
+    Rows for matches the player isn't in are kept (found=False, win=False,
+    zero stats) so per-match counts match the raw list. Roles and months are
+    stored as integer codes into role_labels / month_labels.
+    """
+
+    def __init__(self, size: int):
+        self.match_ids: List[str] = [""] * size
+        self.found = np.zeros(size, dtype=bool)
+        self.win = np.zeros(size, dtype=bool)
+        self.kills = np.zeros(size, dtype=np.int32)
+        self.deaths = np.zeros(size, dtype=np.int32)
+        self.assists = np.zeros(size, dtype=np.int32)
+        self.champion_id = np.zeros(size, dtype=np.int32)
+        self.team_id = np.zeros(size, dtype=np.int16)
+        self.role = np.zeros(size, dtype=np.int16)
+        self.pentakills = np.zeros(size, dtype=np.int16)
+        self.quadrakills = np.zeros(size, dtype=np.int16)
+        self.game_creation = np.zeros(size, dtype=np.int64)
+        self.duration = np.zeros(size, dtype=np.int32)
+        self.queue_id = np.zeros(size, dtype=np.int32)
+        self.hour = np.zeros(size, dtype=np.int8)
+        self.weekday = np.zeros(size, dtype=np.int8)
+        self.month = np.zeros(size, dtype=np.int16)
+        self.role_labels: List[str] = []
+        self.month_labels: List[str] = []
+
+    @classmethod
+    def from_matches(cls, matches: List[Dict[str, Any]], puuid: str) -> "PlayerMatchTable":
+        """
+        Extract a player's rows from raw Match-v5 payloads
+
+        Args:
+            matches: Match data (newest first)
+            puuid: Player UUID
+
+        Returns:
+            PlayerMatchTable with one row per match
+        """
+        table = cls(len(matches))
+        role_codes: Dict[str, int] = {}
+        month_codes: Dict[str, int] = {}
+
+        for row, match in enumerate(matches):
+            info = match.get('info', {})
+            table.match_ids[row] = match.get('metadata', {}).get('matchId') or ""
+
+            # Local time, like the analyzers always used
+            game_date = time.localtime(info.get('gameCreation', 0) / 1000)
+            month_key = f"{game_date.tm_year:04d}-{game_date.tm_mon:02d}"
+            table.game_creation[row] = info.get('gameCreation', 0)
+            table.duration[row] = info.get('gameDuration', 0)
+            table.queue_id[row] = info.get('queueId') or 0
+            table.hour[row] = game_date.tm_hour
+            table.weekday[row] = game_date.tm_wday
+            table.month[row] = month_codes.setdefault(month_key, len(month_codes))
+
+            player = next(
+                (p for p in info.get('participants', []) if p.get('puuid') == puuid),
+                None
+            )
+            if player is None:
+                table.role[row] = role_codes.setdefault('UNKNOWN', len(role_codes))
+                continue
+
+            table.found[row] = True
+            table.win[row] = player.get('win', False)
+            table.kills[row] = player.get('kills', 0)
+            table.deaths[row] = player.get('deaths', 0)
+            table.assists[row] = player.get('assists', 0)
+            table.champion_id[row] = player.get('championId', 0)
+            table.team_id[row] = player.get('teamId', 0)
+            table.pentakills[row] = player.get('pentaKills', 0)
+            table.quadrakills[row] = player.get('quadraKills', 0)
+            table.role[row] = role_codes.setdefault(player.get('teamPosition', 'UNKNOWN'), len(role_codes))
+
+        table.role_labels = list(role_codes)
+        table.month_labels = list(month_codes)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.match_ids)
+
+    def isin(self, match_ids: Set[str]) -> np.ndarray:
+        """Mask of rows whose match ID is in match_ids"""
+        return np.array([match_id in match_ids for match_id in self.match_ids], dtype=bool)
+
+    def take(self, mask: np.ndarray) -> "PlayerMatchTable":
+        """Rows selected by a boolean mask (labels are kept as is)"""
+        table = PlayerMatchTable(0)
+        table.match_ids = [match_id for match_id, keep in zip(self.match_ids, mask) if keep]
+        for name, column in vars(self).items():
+            if isinstance(column, np.ndarray):
+                setattr(table, name, column[mask])
+        table.role_labels = list(self.role_labels)
+        table.month_labels = list(self.month_labels)
+        return table
+
+    def time_slot(self) -> np.ndarray:
+        """Time-of-day code per match (index into TIME_SLOT_NAMES)"""
+        return np.select(
+            [(self.hour >= 6) & (self.hour < 12), (self.hour >= 12) & (self.hour < 18), self.hour >= 18],
+            [0, 1, 2],
+            default=3
+        )
+
+    def kda(self) -> np.ndarray:
+        """Per-match KDA ((kills + assists) / max(deaths, 1))"""
+        return (self.kills + self.assists) / np.maximum(self.deaths, 1)
+
+    def group_by(
+        self,
+        codes: np.ndarray,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, Dict[str, int]]]:
+        """
+        Games, wins, kills, deaths, assists and last_played (newest
+        gameCreation) per code
+
+        Args:
+            codes: Integer code per row (e.g. self.role)
+            mask: Rows to include (default: every row)
+
+        Returns:
+            (code, totals) pairs in order of first appearance
+        """
+        names = ("win", "kills", "deaths", "assists", "game_creation")
+        if mask is not None:
+            codes = codes[mask]
+            columns = {name: getattr(self, name)[mask] for name in names}
+        else:
+            columns = {name: getattr(self, name) for name in names}
+
+        if not len(codes):
+            return []
+
+        codes = codes.astype(np.int64)
+        size = int(codes.max()) + 1
+        games = np.bincount(codes, minlength=size)
+        sums = {
+            "wins": group_sum(codes, columns["win"], size),
+            "kills": group_sum(codes, columns["kills"], size),
+            "deaths": group_sum(codes, columns["deaths"], size),
+            "assists": group_sum(codes, columns["assists"], size)
+        }
+
+        last_played = np.full(size, -1, dtype=np.int64)
+        np.maximum.at(last_played, codes, columns["game_creation"])
+
+        return [
+            (int(code), {
+                "games": int(games[code]),
+                **{name: int(values[code]) for name, values in sums.items()},
+                "last_played": int(last_played[code])
+            })
+            for code in first_seen(codes)
+        ]
+
+    def runs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(won, length) of each win/loss run in row order"""
+        if not len(self):
+            return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int64)
+
+        changes = np.flatnonzero(self.win[1:] != self.win[:-1]) + 1
+        starts = np.concatenate(([0], changes))
+        lengths = np.diff(np.concatenate((starts, [len(self)])))
+        return self.win[starts], lengths
+
+
+async def iter_match_tables(
+    matches: AsyncIterator[Dict[str, Any]],
+    puuid: str,
+    chunk_size: int = 50
+) -> AsyncIterator[PlayerMatchTable]:
+    """
+    Turn a stream of raw matches into small player tables
+
+    At most chunk_size raw payloads are held at a time; each chunk is
+    reduced to the player's row values and the payloads are dropped.
+
+    Args:
+        matches: Match data (newest first), e.g. RiotAPIClient.iter_match_history()
+        puuid: Player UUID
+        chunk_size: Raw matches buffered per table
+
+    Yields:
+        PlayerMatchTable per chunk, in stream order
+    """
+    chunk = []
+    async for match in matches:
+        chunk.append(match)
+        if len(chunk) >= chunk_size:
+            table = PlayerMatchTable.from_matches(chunk, puuid)
+            chunk = []
+            yield table
+
+    if chunk:
+        yield PlayerMatchTable.from_matches(chunk, puuid)
@@ -2,7 +2,7 @@
 Intelligent Model Selector for Cost Optimization
 Implements the "Model Whisperer" strategy
 """
-from typing import Dict, Any, Literal
+from typing import Dict, Any, List, Literal
 import json
 
 TaskType = Literal["quick_summary", "roast", "personality", "deep_analysis", "hidden_gems", "comparison"]
@@ -39,7 +39,10 @@ class ModelSelector:
             "total_tokens": 0,
             "total_cost": 0,
             "calls_by_model": {},
-            "tasks_completed": 0
+            "tasks_completed": 0,
+            "cache_hits": 0,
+            "avoided_cost": 0,
+            "avoided_tokens": 0
         }
     
     def select_model(self, task_type: TaskType, complexity: str = "medium") -> str:
@@ -63,6 +66,26 @@ class ModelSelector:
         
         return base_model
     
+    def get_failover_models(self, model_id: str) -> List[str]:
+        """
+        Get the model plus cheaper task models to fall back to
+        
+        Args:
+            model_id: Preferred model
+        
+        Returns:
+            [model_id, next cheapest, ...] using models from TASK_MODEL_MAP
+        """
+        def price(candidate: str) -> float:
+            costs = self.MODEL_COSTS.get(candidate, {"input": 0, "output": 0})
+            return costs["input"] + costs["output"]
+        
+        cheaper = {
+            candidate for candidate in self.TASK_MODEL_MAP.values()
+            if price(candidate) < price(model_id)
+        }
+        return [model_id] + sorted(cheaper, key=price, reverse=True)
+    
     def estimate_cost(
         self, 
         model_id: str, 
@@ -113,6 +136,17 @@ class ModelSelector:
         self.usage_stats["calls_by_model"][model_id]["total_cost"] += cost
         self.usage_stats["calls_by_model"][model_id]["tokens"] += input_tokens + output_tokens
     
+    def track_cache_hit(
+        self,
+        model_id: str,
+        input_tokens: int,
+        output_tokens: int
+    ):
+        """Track a response served from cache instead of the model"""
+        self.usage_stats["cache_hits"] += 1
+        self.usage_stats["avoided_tokens"] += input_tokens + output_tokens
+        self.usage_stats["avoided_cost"] += self.estimate_cost(model_id, input_tokens, output_tokens)
+    
     def get_usage_report(self) -> Dict[str, Any]:
         """Generate usage and cost report"""
         report = {
@@ -123,6 +157,9 @@ class ModelSelector:
                 self.usage_stats["total_cost"] / max(self.usage_stats["tasks_completed"], 1), 
                 4
             ),
+            "cache_hits": self.usage_stats["cache_hits"],
+            "avoided_tokens": self.usage_stats["avoided_tokens"],
+            "avoided_cost_usd": round(self.usage_stats["avoided_cost"], 4),
             "models_used": []
         }
         
@@ -0,0 +1,384 @@
+"""
+Pattern Accumulators
+Registered per-detector running state behind PatternDetector patterns
+"""
+import inspect
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Type
+
+from .match_table import PlayerMatchTable, TIME_SLOT_NAMES, WEEKDAY_NAMES
+from .match_aggregates import StreakRuns, add_group
+
+
+# Accumulator classes in the order their patterns are listed
+PATTERN_ACCUMULATORS: List[Type["PatternAccumulator"]] = []
+
+
+def register_pattern(cls: Type["PatternAccumulator"]) -> Type["PatternAccumulator"]:
+    """Class decorator adding a detector to every PatternAggregates"""
+    if inspect.isabstract(cls):
+        missing = ", ".join(sorted(cls.__abstractmethods__))
+        raise TypeError(f"Can't register {cls.__name__}: missing {missing}")
+    PATTERN_ACCUMULATORS.append(cls)
+    return cls
+
+
+def most_recent_first(groups: Dict[Any, Dict[str, int]]) -> List[Any]:
+    """Group (key, stats) pairs ordered by last_played, newest first"""
+    return sorted(groups.items(), key=lambda item: item[1]["last_played"], reverse=True)
+
+
+class PatternAccumulator(ABC):
+    """
+    Running state of one pattern detector.
+
+    Subclasses fold a shared PlayerMatchTable into their own counts with
+    vectorized column operations, merge with state built from other
+    matches and finalize the state into patterns. to_dict() / from_dict()
+    round-trip the state through JSON for storage.
+    """
+
+    @abstractmethod
+    def update(self, table: PlayerMatchTable):
+        """Fold a table of matches (newest first, not counted before)"""
+
+    @abstractmethod
+    def merge(self, other: "PatternAccumulator"):
+        """Add the counts of the same detector built from other matches"""
+
+    @abstractmethod
+    def finalize(self) -> List[Dict[str, Any]]:
+        """Patterns found so far"""
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready copy of the state"""
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PatternAccumulator":
+        """Rebuild state saved with to_dict()"""
+
+
+@register_pattern
+class TimePatterns(PatternAccumulator):
+    """Performance by time of day and day of week"""
+
+    def __init__(self):
+        # TIME_SLOT_NAMES index -> games, wins, last_played
+        self.time_slots: Dict[int, Dict[str, int]] = {}
+        # WEEKDAY_NAMES index -> games, wins, last_played
+        self.weekdays: Dict[int, Dict[str, int]] = {}
+
+    def update(self, table: PlayerMatchTable):
+        for code, stats in table.group_by(table.time_slot()):
+            add_group(self.time_slots, code, stats, ("games", "wins"))
+        for code, stats in table.group_by(table.weekday):
+            add_group(self.weekdays, code, stats, ("games", "wins"))
+
+    def merge(self, other: "TimePatterns"):
+        for key, stats in other.time_slots.items():
+            add_group(self.time_slots, key, stats, ("games", "wins"))
+        for key, stats in other.weekdays.items():
+            add_group(self.weekdays, key, stats, ("games", "wins"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "time_slots": [[key, stats] for key, stats in self.time_slots.items()],
+            "weekdays": [[key, stats] for key, stats in self.weekdays.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TimePatterns":
+        accumulator = cls()
+        accumulator.time_slots = {int(key): dict(stats) for key, stats in data["time_slots"]}
+        accumulator.weekdays = {int(key): dict(stats) for key, stats in data["weekdays"]}
+        return accumulator
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        patterns = []
+
+        # Time of day (morning, afternoon, evening, night), most recent first
+        time_performance = [
+            (TIME_SLOT_NAMES[code], stats) for code, stats in most_recent_first(self.time_slots)
+        ]
+        day_performance = [
+            (WEEKDAY_NAMES[code], stats) for code, stats in most_recent_first(self.weekdays)
+        ]
+
+        # Find best time slot
+        best_time = max(
+            time_performance,
+            key=lambda x: x[1]["wins"] / max(x[1]["games"], 1),
+            default=None
+        )
+
+        if best_time and best_time[1]["games"] >= 5:
+            wr = (best_time[1]["wins"] / best_time[1]["games"]) * 100
+            if wr >= 55:
+                patterns.append({
+                    "title": f"{best_time[0].capitalize()} Performer",
+                    "description": f"You perform best during the {best_time[0]} with a {wr:.1f}% win rate across {best_time[1]['games']} games!",
+                    "rarity": 4,
+                    "category": "time"
+                })
+
+        # Find best day
+        best_day = max(
+            day_performance,
+            key=lambda x: x[1]["wins"] / max(x[1]["games"], 1),
+            default=None
+        )
+
+        if best_day and best_day[1]["games"] >= 5:
+            wr = (best_day[1]["wins"] / best_day[1]["games"]) * 100
+            if wr >= 55:
+                patterns.append({
+                    "title": f"{best_day[0]} Specialist",
+                    "description": f"Your {best_day[0]} win rate is {wr:.1f}%, significantly above your overall average!",
+                    "rarity": 3,
+                    "category": "time"
+                })
+
+        return patterns
+
+
+@register_pattern
+class StreakPatterns(PatternAccumulator):
+    """Longest win and loss streaks"""
+
+    def __init__(self):
+        self.streaks = StreakRuns()
+
+    def update(self, table: PlayerMatchTable):
+        self.streaks.add(StreakRuns.from_table(table))
+
+    def merge(self, other: "StreakPatterns"):
+        # Streaks only join correctly for games right before or after ours
+        self.streaks.add(other.streaks)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"streaks": self.streaks.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreakPatterns":
+        accumulator = cls()
+        accumulator.streaks = StreakRuns.from_dict(data["streaks"])
+        return accumulator
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        patterns = []
+
+        max_win_streak = self.streaks.longest_win
+        max_loss_streak = self.streaks.longest_loss
+
+        if max_win_streak >= 5:
+            patterns.append({
+                "title": "Win Streak Master",
+                "description": f"You achieved an impressive {max_win_streak}-game win streak! That's mental fortitude!",
+                "rarity": 5,
+                "category": "performance"
+            })
+
+        if max_loss_streak >= 5:
+            patterns.append({
+                "title": "Resilience Badge",
+                "description": f"You pushed through a {max_loss_streak}-game loss streak and kept playing. That's determination!",
+                "rarity": 3,
+                "category": "mental"
+            })
+
+        return patterns
+
+
+@register_pattern
+class RolePatterns(PatternAccumulator):
+    """Performance differences across roles"""
+
+    FIELDS = ("games", "wins", "kills", "deaths", "assists")
+
+    def __init__(self):
+        # teamPosition -> games, wins, kills, deaths, assists, last_played
+        self.roles: Dict[str, Dict[str, int]] = {}
+
+    def update(self, table: PlayerMatchTable):
+        for code, stats in table.group_by(table.role, table.found):
+            add_group(self.roles, table.role_labels[code], stats, self.FIELDS)
+
+    def merge(self, other: "RolePatterns"):
+        for key, stats in other.roles.items():
+            add_group(self.roles, key, stats, self.FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"roles": self.roles}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RolePatterns":
+        accumulator = cls()
+        accumulator.roles = {key: dict(stats) for key, stats in data["roles"].items()}
+        return accumulator
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        patterns = []
+
+        # Find role with unusual performance
+        for role, stats in most_recent_first(self.roles):
+            if stats["games"] >= 5:
+                wr = (stats["wins"] / stats["games"]) * 100
+                kda = (stats["kills"] + stats["assists"]) / max(stats["deaths"], 1)
+
+                if wr >= 60:
+                    patterns.append({
+                        "title": f"{role} Dominator",
+                        "description": f"You have a {wr:.1f}% win rate as {role} with {kda:.2f} KDA. This is your power role!",
+                        "rarity": 4,
+                        "category": "role"
+                    })
+
+        return patterns
+
+
+class ChampionSynergyPatterns(PatternAccumulator):
+    """Champion synergies with teammates"""
+
+    # This would require more complex analysis of teammate champions.
+    # For now, a placeholder that finds nothing - it is left unregistered
+    # so no table is fed to it; add @register_pattern once it's implemented.
+
+    def update(self, table: PlayerMatchTable):
+        pass
+
+    def merge(self, other: "ChampionSynergyPatterns"):
+        pass
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChampionSynergyPatterns":
+        return cls()
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        return []
+
+
+@register_pattern
+class ComebackPatterns(PatternAccumulator):
+    """Comeback victories and mental resilience"""
+
+    # Games of at least this many minutes count as long. This would need
+    # timeline data for gold difference at 15 min; for now game duration is
+    # the proxy (long games often indicate comebacks).
+    LONG_GAME_MINUTES = 35
+
+    def __init__(self):
+        self.long_games = 0
+        self.long_game_wins = 0
+
+    def update(self, table: PlayerMatchTable):
+        long = table.duration / 60 >= self.LONG_GAME_MINUTES
+        self.long_games += int(long.sum())
+        self.long_game_wins += int(table.win[long].sum())
+
+    def merge(self, other: "ComebackPatterns"):
+        self.long_games += other.long_games
+        self.long_game_wins += other.long_game_wins
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"long_games": self.long_games, "long_game_wins": self.long_game_wins}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ComebackPatterns":
+        accumulator = cls()
+        accumulator.long_games = int(data["long_games"])
+        accumulator.long_game_wins = int(data["long_game_wins"])
+        return accumulator
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        patterns = []
+
+        if self.long_games >= 10:
+            wr = (self.long_game_wins / self.long_games) * 100
+            if wr >= 55:
+                patterns.append({
+                    "title": "Comeback King",
+                    "description": f"You have a {wr:.1f}% win rate in long games (35+ min). You never give up!",
+                    "rarity": 4,
+                    "category": "mental"
+                })
+
+        return patterns
+
+
+class PatternAggregates:
+    """
+    One accumulator per registered pattern detector, fed together.
+
+    Like PlayerAggregates, update() folds in tables and merge() combines
+    shards, so patterns can be detected without keeping the matches. Every
+    detector reads the same extracted table, so adding one adds no pass over
+    the raw matches. No match IDs are kept: callers feed each match once.
+    """
+
+    def __init__(self, accumulators: Optional[List[Type[PatternAccumulator]]] = None):
+        self.accumulators = [cls() for cls in (accumulators or PATTERN_ACCUMULATORS)]
+
+    def update(self, table: PlayerMatchTable) -> "PatternAggregates":
+        """
+        Feed a table of matches to every detector
+
+        Args:
+            table: Player's matches (newest first), not counted before
+
+        Returns:
+            self (for chaining)
+        """
+        if len(table):
+            for accumulator in self.accumulators:
+                accumulator.update(table)
+        return self
+
+    def merge(self, other: "PatternAggregates") -> "PatternAggregates":
+        """
+        Combine with state built from a disjoint set of matches
+
+        Streaks only join correctly when other covers the games right
+        before or after this state's games (e.g. newly played ones).
+
+        Args:
+            other: State built from different matches (same detectors)
+
+        Returns:
+            self (for chaining)
+        """
+        for accumulator, other_accumulator in zip(self.accumulators, other.accumulators):
+            accumulator.merge(other_accumulator)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready state of every detector, keyed by class name"""
+        return {type(accumulator).__name__: accumulator.to_dict() for accumulator in self.accumulators}
+
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Any],
+        accumulators: Optional[List[Type[PatternAccumulator]]] = None
+    ) -> "PatternAggregates":
+        """
+        Rebuild state saved with to_dict()
+
+        Raises:
+            KeyError: A detector has no saved state (registered later), so
+                the state can't stand in for the same matches
+        """
+        state = cls(accumulators)
+        state.accumulators = [
+            type(accumulator).from_dict(data[type(accumulator).__name__])
+            for accumulator in state.accumulators
+        ]
+        return state
+
+    def patterns(self) -> List[Dict[str, Any]]:
+        """Every detector's patterns, in registration order"""
+        return [pattern for accumulator in self.accumulators for pattern in accumulator.finalize()]
@@ -0,0 +1,318 @@
+"""
+Player Data Sessions
+Short-lived per-player memo of fetched matches and computed stats
+"""
+import asyncio
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from .ttl_cache import TTLCache
+from .match_table import PlayerMatchTable
+from .match_aggregates import PlayerAggregates
+
+
+def get_display_name(summoner: Dict[str, Any], fallback: str) -> str:
+    """Display name for both old 'name' and new 'gameName#tagLine' formats"""
+    if 'gameName' in summoner and 'tagLine' in summoner:
+        return f"{summoner['gameName']}#{summoner['tagLine']}"
+    if 'name' in summoner:
+        return summoner['name']
+    return fallback
+
+
+class PlayerSession:
+    """Everything the endpoints need about one player's match window"""
+
+    def __init__(
+        self,
+        region: str,
+        summoner: Dict[str, Any],
+        display_name: str,
+        matches: List[Dict[str, Any]],
+        table: PlayerMatchTable,
+        stats: Dict[str, Any],
+        match_count: int
+    ):
+        self.region = region
+        self.summoner = summoner
+        self.puuid = summoner["puuid"]
+        self.display_name = display_name
+        self.matches = matches
+        self.table = table
+        self.stats = stats
+        self.match_count = match_count
+        self._patterns: Optional[List[Dict[str, Any]]] = None
+        self._windows: Dict[int, "PlayerSession"] = {}
+
+    def get_patterns(self, pattern_detector) -> List[Dict[str, Any]]:
+        """Detect patterns once per session"""
+        if self._patterns is None:
+            self._patterns = pattern_detector.detect_table_patterns(self.table, self.stats)
+        return self._patterns
+
+    def window(self, match_count: int, analyzer) -> "PlayerSession":
+        """
+        The session for the newest match_count matches of this window
+
+        Smaller windows are sliced from the already extracted table and
+        analyzed once, without fetching anything.
+
+        Args:
+            match_count: Window size (at most this session's match_count)
+            analyzer: MatchAnalyzer for the window's stats
+
+        Returns:
+            This session, or a memoized session for the smaller window
+        """
+        if match_count >= len(self.matches):
+            return self
+
+        session = self._windows.get(match_count)
+        if session is None:
+            table = self.table.take(np.arange(len(self.table)) < match_count)
+            session = PlayerSession(
+                region=self.region,
+                summoner=self.summoner,
+                display_name=self.display_name,
+                matches=self.matches[:match_count],
+                table=table,
+                stats=analyzer.analyze_table(table),
+                match_count=match_count
+            )
+            self._windows[match_count] = session
+        return session
+
+
+class PlayerSessionManager:
+    """
+    Memoizes player sessions keyed by (region, PUUID).
+
+    /api/player and the AI endpoints are usually called back to back for
+    the same player; the first one fetches and analyzes the matches and the
+    rest reuse that work for a short TTL. Endpoints asking for a smaller
+    match window get a slice of the cached one; only a larger window is
+    fetched again. Concurrent requests for the same player share one build.
+
+    With a match store, each player's aggregates for the last built window
+    are kept there, so a rebuild only folds in the matches played since.
+    """
+
+    # MatchStore scope of the persisted session aggregates
+    AGGREGATES_SCOPE = "recent"
+
+    def __init__(
+        self,
+        riot_client,
+        analyzer,
+        ttl: float = 300.0,
+        max_sessions: int = 200,
+        match_store=None
+    ):
+        self.riot_client = riot_client
+        self.analyzer = analyzer
+        self.match_store = match_store
+        self.sessions = TTLCache(max_size=max_sessions, default_ttl=ttl)
+        # (region, puuid) -> (match count, build task) of the largest build in flight
+        self._building: Dict[Tuple[str, str], Tuple[int, asyncio.Future]] = {}
+
+    async def get_session(
+        self,
+        region: str,
+        summoner_name: str,
+        match_count: int = 20
+    ) -> Optional[PlayerSession]:
+        """
+        Get (or build) the session for a player
+
+        Args:
+            region: Platform region
+            summoner_name: Summoner name or Riot ID (GameName#TAG)
+            match_count: Number of recent matches in the window
+
+        Returns:
+            PlayerSession, or None if the summoner was not found
+        """
+        summoner = await self.riot_client.get_summoner_by_name(region, summoner_name)
+        if not summoner:
+            return None
+
+        return await self.get_session_for_summoner(region, summoner, summoner_name, match_count)
+
+    async def get_session_for_summoner(
+        self,
+        region: str,
+        summoner: Dict[str, Any],
+        summoner_name: str,
+        match_count: int = 20
+    ) -> PlayerSession:
+        """Get (or build) the session for an already resolved summoner"""
+        key = (region.lower(), summoner["puuid"])
+
+        session = self.sessions.get(key)
+        if session is not None and session.match_count >= match_count:
+            return session.window(match_count, self.analyzer)
+
+        task = self._find_build(key, match_count)
+        if task is None:
+            task = self._start_build(
+                key,
+                match_count,
+                self._build_session(region, summoner, summoner_name, match_count)
+            )
+
+        session = await asyncio.shield(task)
+        return session.window(match_count, self.analyzer)
+
+    def _find_build(self, key: Tuple[str, str], match_count: int) -> Optional[asyncio.Future]:
+        """A build in flight whose window covers match_count, if any"""
+        building = self._building.get(key)
+        if building is not None and building[0] >= match_count:
+            return building[1]
+        return None
+
+    def _start_build(self, key: Tuple[str, str], match_count: int, build) -> asyncio.Future:
+        """Run a session build that later requests for the player can join"""
+        task = asyncio.ensure_future(build)
+        self._building[key] = (match_count, task)
+
+        def forget(done: asyncio.Future):
+            if self._building.get(key, (0, None))[1] is done:
+                del self._building[key]
+
+        task.add_done_callback(forget)
+        return task
+
+    async def _build_session(
+        self,
+        region: str,
+        summoner: Dict[str, Any],
+        summoner_name: str,
+        match_count: int,
+        histories: Optional[asyncio.Future] = None
+    ) -> PlayerSession:
+        """
+        Fetch matches, analyze them and cache the session
+
+        Args:
+            region: Platform region
+            summoner: Resolved summoner
+            summoner_name: Requested name (display fallback)
+            match_count: Number of recent matches in the window
+            histories: Shared get_match_histories() fetch to read the
+                matches from instead of fetching them alone
+        """
+        if histories is not None:
+            matches = (await asyncio.shield(histories)).get(summoner["puuid"], [])
+        else:
+            matches = await self.riot_client.get_match_history(
+                region=region,
+                puuid=summoner["puuid"],
+                count=match_count
+            )
+
+        table = PlayerMatchTable.from_matches(matches, summoner["puuid"])
+        aggregates = await self._update_aggregates(summoner["puuid"], table)
+        session = PlayerSession(
+            region=region,
+            summoner=summoner,
+            display_name=get_display_name(summoner, summoner_name),
+            matches=matches,
+            table=table,
+            stats=self.analyzer.render_aggregates(aggregates),
+            match_count=match_count
+        )
+
+        # Don't pin empty results (the player may just be between syncs),
+        # and don't replace a larger window built meanwhile
+        key = (region.lower(), summoner["puuid"])
+        cached = self.sessions.get(key)
+        if matches and (cached is None or cached.match_count <= match_count):
+            self.sessions.set(key, session)
+
+        return session
+
+    async def _update_aggregates(self, puuid: str, table: PlayerMatchTable) -> PlayerAggregates:
+        """
+        Aggregates of exactly the table's matches
+
+        The stored aggregates are reused when every match they count is
+        still in the window, so only newer matches are folded in. If the
+        window moved past some of them (aggregates can't drop games), or
+        nothing usable is stored, they are built from the whole table.
+
+        Args:
+            puuid: Player UUID
+            table: Player's matches in the window
+
+        Returns:
+            PlayerAggregates of the table's matches
+        """
+        aggregates = None
+        if self.match_store:
+            data = await self.match_store.get_aggregates(puuid, self.AGGREGATES_SCOPE)
+            try:
+                aggregates = PlayerAggregates.from_dict(data) if data else None
+            except (KeyError, TypeError, ValueError):
+                # Saved by an older layout - rebuild below
+                aggregates = None
+            if aggregates and not aggregates.match_ids <= set(table.match_ids):
+                aggregates = None
+
+        rebuilt = aggregates is None
+        if rebuilt:
+            aggregates = PlayerAggregates()
+
+        games = aggregates.games
+        aggregates.update(table)
+
+        if self.match_store and len(table) and (rebuilt or aggregates.games != games):
+            await self.match_store.put_aggregates(puuid, self.AGGREGATES_SCOPE, aggregates.to_dict())
+
+        return aggregates
+
+    async def get_sessions_for_summoners(
+        self,
+        region: str,
+        summoners: List[Tuple[Dict[str, Any], str]],
+        match_count: int = 20
+    ) -> List[PlayerSession]:
+        """
+        Get sessions for several resolved summoners at once
+
+        Cold sessions are built together so matches the players share are
+        downloaded only once. The builds are registered like single ones,
+        so concurrent requests for any of the players join them.
+
+        Args:
+            region: Platform region
+            summoners: (summoner, requested name) pairs
+            match_count: Number of recent matches in each window
+
+        Returns:
+            Sessions in the same order as summoners
+        """
+        cold: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        for summoner, summoner_name in summoners:
+            key = (region.lower(), summoner["puuid"])
+            session = self.sessions.get(key)
+            if session is not None and session.match_count >= match_count:
+                continue
+            if self._find_build(key, match_count) is None:
+                cold.setdefault(summoner["puuid"], (summoner, summoner_name))
+
+        if cold:
+            histories = asyncio.ensure_future(
+                self.riot_client.get_match_histories(region, list(cold), count=match_count)
+            )
+            for summoner, summoner_name in cold.values():
+                self._start_build(
+                    (region.lower(), summoner["puuid"]),
+                    match_count,
+                    self._build_session(region, summoner, summoner_name, match_count, histories)
+                )
+
+        return list(await asyncio.gather(*[
+            self.get_session_for_summoner(region, summoner, summoner_name, match_count)
+            for summoner, summoner_name in summoners
+        ]))
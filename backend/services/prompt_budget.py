@@ -0,0 +1,156 @@
+"""
+Prompt Token Budgets
+Token counting per model family and per-task input/output limits
+"""
+import math
+import re
+from typing import Callable, Dict, Optional
+
+from .model_selector import model_selector
+
+
+# Input budget for the prompt and max output tokens per task. Input budgets
+# fit each prompt's fixed text plus ~3 champions / 4 patterns, so longer
+# lists get trimmed; output caps leave ~2x headroom over
+# the JSON each prompt asks for, so responses aren't cut off mid-object.
+TASK_TOKEN_BUDGETS = {
+    "quick_summary": {"input": 300, "output": 200},
+    "roast": {"input": 265, "output": 600},
+    "personality": {"input": 450, "output": 900},
+    "deep_analysis": {"input": 410, "output": 1600},
+    "hidden_gems": {"input": 400, "output": 1200},
+    "comparison": {"input": 150, "output": 250}
+}
+
+DEFAULT_TOKEN_BUDGET = {"input": 800, "output": 1000}
+
+# How each model family's BPE tokenizer splits text, approximately:
+# - word_chars: average characters per token of a plain word
+# - digits: digits merged into one token (Nova splits numbers per digit)
+# - non_ascii_bytes: UTF-8 bytes per token of emoji and other symbols
+TOKENIZER_PROFILES = {
+    "claude": {"word_chars": 4.5, "digits": 3, "non_ascii_bytes": 2.0},
+    "nova": {"word_chars": 4.2, "digits": 1, "non_ascii_bytes": 1.5},
+    "default": {"word_chars": 4.0, "digits": 3, "non_ascii_bytes": 2.0}
+}
+
+# Words (with their leading space), digit runs, single symbols, whitespace
+TOKEN_PATTERN = re.compile(r" ?[A-Za-z]+| ?\d+| ?[^\sA-Za-z\d]|\s+")
+
+# Per-family correction (Bedrock-reported / estimated prompt tokens),
+# learned from responses by calibrate_tokens()
+TOKEN_CALIBRATION: Dict[str, float] = {}
+
+CALIBRATION_WEIGHT = 0.2
+CALIBRATION_RANGE = (0.5, 2.0)
+
+
+def get_model_family(model_id: str) -> str:
+    """'claude', 'nova' or 'default'"""
+    model_id = model_id.lower()
+    for family in TOKENIZER_PROFILES:
+        if family in model_id:
+            return family
+    return "default"
+
+
+def _estimate_tokens(text: str, family: str) -> int:
+    """Uncalibrated token count with a family's tokenizer profile"""
+    profile = TOKENIZER_PROFILES[family]
+
+    tokens = 0
+    for piece in TOKEN_PATTERN.findall(text):
+        word = piece.strip()
+        if word.isascii() and word.isalpha():
+            tokens += max(1, math.ceil(len(word) / profile["word_chars"]))
+        elif word.isdigit():
+            tokens += math.ceil(len(word) / profile["digits"])
+        elif word.isascii() or not word:
+            tokens += 1
+        else:
+            # Emoji and other non-ASCII symbols span several byte-level tokens
+            tokens += max(1, math.ceil(len(word.encode("utf-8")) / profile["non_ascii_bytes"]))
+    return tokens
+
+
+def count_tokens(text: str, model_id: Optional[str] = None) -> int:
+    """
+    Count tokens the way the model family's BPE tokenizer splits text
+
+    Bedrock only reports exact counts after a call, so prompts are sized
+    with a per-family pre-tokenizer (see TOKENIZER_PROFILES), scaled by
+    what Bedrock reported for that family's earlier prompts.
+
+    Args:
+        text: Text to count
+        model_id: Model the text is for (None = default family)
+
+    Returns:
+        Token count
+    """
+    family = get_model_family(model_id or "")
+    tokens = _estimate_tokens(text, family)
+    return math.ceil(tokens * TOKEN_CALIBRATION.get(family, 1.0))
+
+
+def calibrate_tokens(model_id: str, text: str, reported_tokens: int):
+    """
+    Learn a family's estimate error from a Bedrock-reported token count
+
+    Args:
+        model_id: Model that processed the text
+        text: Prompt sent
+        reported_tokens: Input tokens Bedrock reported for it
+    """
+    family = get_model_family(model_id)
+    estimate = _estimate_tokens(text, family)
+    if not estimate or not reported_tokens:
+        return
+
+    ratio = min(max(reported_tokens / estimate, CALIBRATION_RANGE[0]), CALIBRATION_RANGE[1])
+    previous = TOKEN_CALIBRATION.get(family, 1.0)
+    TOKEN_CALIBRATION[family] = previous + CALIBRATION_WEIGHT * (ratio - previous)
+
+
+def get_token_budget(task_type: str) -> Dict[str, int]:
+    """Input/output token limits for a task"""
+    return TASK_TOKEN_BUDGETS.get(task_type, DEFAULT_TOKEN_BUDGET)
+
+
+def fit_prompt(
+    task_type: str,
+    build: Callable[[int], str],
+    max_items: int
+) -> str:
+    """
+    Build the largest prompt that fits the task's input budget
+
+    Args:
+        task_type: Task the prompt is for (selects budget and model family)
+        build: Builds the prompt with the first n items of its variable-length
+            section (champions, patterns, ...)
+        max_items: Items available (0 for prompts without such a section)
+
+    Returns:
+        Prompt with as many items as fit (at least the 0-item prompt)
+    """
+    budget = get_token_budget(task_type)["input"]
+    model_id = model_selector.select_model(task_type)
+
+    for n in range(max_items, 0, -1):
+        prompt = build(n)
+        if count_tokens(prompt, model_id) <= budget:
+            return prompt
+
+    prompt = build(0)
+    tokens = count_tokens(prompt, model_id)
+    if tokens > budget:
+        print(f"{task_type} prompt is {tokens} tokens, over its {budget} token budget")
+    return prompt
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Cut text at a word boundary, marking the cut with an ellipsis"""
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + "…"
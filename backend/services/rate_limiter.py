@@ -0,0 +1,218 @@
+"""
+Riot API Rate Limiter
+Proactively schedules requests from Riot's rate limit headers
+"""
+import asyncio
+import re
+import time
+from typing import Dict, List, Optional, Tuple, Mapping
+
+
+# URL path patterns -> method name used for method rate limits
+METHOD_PATTERNS = [
+    (re.compile(r"^/riot/account/v1/accounts/by-riot-id/"), "account-v1.by-riot-id"),
+    (re.compile(r"^/riot/account/v1/accounts/by-puuid/"), "account-v1.by-puuid"),
+    (re.compile(r"^/lol/summoner/v4/summoners/by-puuid/"), "summoner-v4.by-puuid"),
+    (re.compile(r"^/lol/summoner/v4/summoners/by-name/"), "summoner-v4.by-name"),
+    (re.compile(r"^/lol/match/v5/matches/by-puuid/[^/]+/ids"), "match-v5.ids"),
+    (re.compile(r"^/lol/match/v5/matches/[^/]+/timeline"), "match-v5.timeline"),
+    (re.compile(r"^/lol/match/v5/matches/[^/]+$"), "match-v5.match"),
+    (re.compile(r"^/lol/champion-mastery/v4/champion-masteries/by-puuid/[^/]+/top"), "champion-mastery-v4.top"),
+    (re.compile(r"^/lol/champion-mastery/v4/champion-masteries/by-puuid/"), "champion-mastery-v4.by-puuid"),
+    (re.compile(r"^/lol/champion-mastery/v4/scores/by-puuid/"), "champion-mastery-v4.scores"),
+    (re.compile(r"^/lol/league/v4/entries/by-puuid/"), "league-v4.entries"),
+    (re.compile(r"^/lol/challenges/v1/player-data/"), "challenges-v1.player-data"),
+    (re.compile(r"^/lol/challenges/v1/challenges/config"), "challenges-v1.config"),
+    (re.compile(r"^/lol/spectator/v5/active-games/"), "spectator-v5.active-games"),
+    (re.compile(r"^/lol/clash/v1/players/by-puuid/"), "clash-v1.players"),
+    (re.compile(r"^/lol/clash/v1/teams/"), "clash-v1.teams"),
+    (re.compile(r"^/lol/platform/v3/champion-rotations"), "platform-v3.rotations"),
+]
+
+
+def get_method_name(path: str) -> str:
+    """Map a request path to the Riot API method it belongs to"""
+    for pattern, name in METHOD_PATTERNS:
+        if pattern.search(path):
+            return name
+
+    # Unknown endpoint - group by its parent path
+    return path.rsplit("/", 1)[0]
+
+
+def parse_rate_limit_header(value: Optional[str]) -> List[Tuple[int, int]]:
+    """
+    Parse a Riot rate limit header
+
+    Args:
+        value: Header value like "20:1,100:120" (amount:window_seconds)
+
+    Returns:
+        List of (amount, window_seconds) pairs
+    """
+    if not value:
+        return []
+
+    pairs = []
+    for part in value.split(","):
+        try:
+            amount, window = part.strip().split(":")
+            pairs.append((int(amount), int(window)))
+        except ValueError:
+            continue
+    return pairs
+
+
+class RateLimitWindow:
+    """Fixed window counter matching how Riot counts requests"""
+
+    def __init__(self, limit: int, seconds: int):
+        self.limit = limit
+        self.seconds = seconds
+        self.count = 0
+        self.reset_at: Optional[float] = None
+
+    def refresh(self, now: float):
+        """Start a new window once the current one expired"""
+        if self.reset_at is not None and now >= self.reset_at:
+            self.count = 0
+            self.reset_at = None
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until this window has room (0 if available now)"""
+        self.refresh(now)
+        if self.count < self.limit:
+            return 0.0
+        return max(self.reset_at - now, 0.0)
+
+    def consume(self, now: float, margin: float):
+        """Record one request in this window"""
+        if self.reset_at is None:
+            # Pad the window so our clock never runs ahead of Riot's
+            self.reset_at = now + self.seconds + margin
+        self.count += 1
+
+
+class RateLimitBucket:
+    """Set of rate limit windows (e.g. per-second and per-2-minutes)"""
+
+    def __init__(self, limits: Optional[List[Tuple[int, int]]] = None):
+        self.windows: Dict[int, RateLimitWindow] = {}
+        self.blocked_until = 0.0
+        if limits:
+            self.set_limits(limits)
+
+    def set_limits(self, limits: List[Tuple[int, int]]):
+        """Apply limits, keeping counts of windows that still exist"""
+        windows = {}
+        for limit, seconds in limits:
+            window = self.windows.get(seconds) or RateLimitWindow(limit, seconds)
+            window.limit = limit
+            windows[seconds] = window
+        self.windows = windows
+
+    def sync_counts(self, counts: List[Tuple[int, int]], now: float, margin: float):
+        """Adopt Riot's counts when they are ahead of ours (other workers, restarts)"""
+        for count, seconds in counts:
+            window = self.windows.get(seconds)
+            if window is None:
+                continue
+            window.refresh(now)
+            if count > window.count:
+                window.count = count
+                if window.reset_at is None:
+                    window.reset_at = now + seconds + margin
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until every window has room"""
+        wait = max(self.blocked_until - now, 0.0)
+        for window in self.windows.values():
+            wait = max(wait, window.wait_time(now))
+        return wait
+
+    def consume(self, now: float, margin: float):
+        """Record one request in every window"""
+        for window in self.windows.values():
+            window.consume(now, margin)
+
+
+class RateLimiter:
+    """
+    Header-driven rate limiter for the Riot API.
+
+    Keeps one application bucket per host (routing value or platform) and
+    one method bucket per (host, method). Limits are learned from the
+    X-App-Rate-Limit / X-Method-Rate-Limit headers and counts are kept in
+    sync with their -Count counterparts.
+    """
+
+    def __init__(
+        self,
+        default_app_limits: str = "20:1,100:120",
+        margin: float = 0.05
+    ):
+        self.default_app_limits = parse_rate_limit_header(default_app_limits)
+        self.margin = margin
+        self.app_buckets: Dict[str, RateLimitBucket] = {}
+        self.method_buckets: Dict[Tuple[str, str], RateLimitBucket] = {}
+
+    def _get_buckets(self, host: str, method: str) -> Tuple[RateLimitBucket, RateLimitBucket]:
+        """Get (or create) the app and method buckets for a request"""
+        app_bucket = self.app_buckets.get(host)
+        if app_bucket is None:
+            app_bucket = RateLimitBucket(self.default_app_limits)
+            self.app_buckets[host] = app_bucket
+
+        method_bucket = self.method_buckets.get((host, method))
+        if method_bucket is None:
+            # Method limits are unknown until the first response
+            method_bucket = RateLimitBucket()
+            self.method_buckets[(host, method)] = method_bucket
+
+        return app_bucket, method_bucket
+
+    async def acquire(self, host: str, method: str):
+        """Wait until a request to host/method fits in every window, then reserve it"""
+        app_bucket, method_bucket = self._get_buckets(host, method)
+
+        while True:
+            now = time.monotonic()
+            wait = max(app_bucket.wait_time(now), method_bucket.wait_time(now))
+
+            if wait <= 0:
+                # Check and reserve happen without yielding, so no lock is needed
+                app_bucket.consume(now, self.margin)
+                method_bucket.consume(now, self.margin)
+                return
+
+            await asyncio.sleep(wait)
+
+    def update(self, host: str, method: str, headers: Mapping[str, str]):
+        """Learn limits and counts from a response's headers"""
+        app_bucket, method_bucket = self._get_buckets(host, method)
+        now = time.monotonic()
+
+        for bucket, prefix in ((app_bucket, "X-App-Rate-Limit"), (method_bucket, "X-Method-Rate-Limit")):
+            limits = parse_rate_limit_header(headers.get(prefix))
+            if limits:
+                bucket.set_limits(limits)
+            counts = parse_rate_limit_header(headers.get(f"{prefix}-Count"))
+            if counts:
+                bucket.sync_counts(counts, now, self.margin)
+
+    def penalize(self, host: str, method: str, headers: Mapping[str, str], retry_after: float):
+        """Block the bucket that tripped a 429 until Retry-After has passed"""
+        app_bucket, method_bucket = self._get_buckets(host, method)
+        blocked_until = time.monotonic() + retry_after
+
+        limit_type = headers.get("X-Rate-Limit-Type", "").lower()
+        if limit_type == "method":
+            buckets = [method_bucket]
+        elif limit_type == "application":
+            buckets = [app_bucket]
+        else:
+            # Service limits (or unknown) - back off the whole host
+            buckets = [app_bucket, method_bucket]
+
+        for bucket in buckets:
+            bucket.blocked_until = max(bucket.blocked_until, blocked_until)
@@ -4,14 +4,48 @@ Handles all interactions with League of Legends API
 """
 import httpx
 import asyncio
-from typing import Optional, List, Dict, Any
+import importlib.util
+import time
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Tuple
 from datetime import datetime, timedelta
+from urllib.parse import quote
+from .rate_limiter import RateLimiter, get_method_name
+from .match_store import MatchStore
+from .match_projection import decode_match
+from .ttl_cache import TTLCache
+
+
+# Returned by _fetch for 404s so callers can tell "missing" from "failed"
+NOT_FOUND = object()
 
 
 class RiotAPIClient:
     """Client for interacting with Riot Games API"""
     
-    def __init__(self, api_key: str):
+    # Upper bound on match IDs kept in a player's sync state
+    MAX_SYNCED_MATCH_IDS = 1000
+    
+    # Platform endpoints whose data changes weekly at most
+    STATIC_ENDPOINTS = {
+        "champion_rotations": "/lol/platform/v3/champion-rotations",
+        "challenge_config": "/lol/challenges/v1/challenges/config"
+    }
+    
+    def __init__(
+        self,
+        api_key: str,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: float = 30.0,
+        app_rate_limit: str = "20:1,100:120",
+        match_store: Optional[MatchStore] = None,
+        match_concurrency: int = 10,
+        summoner_cache_ttl: float = 600.0,
+        summoner_negative_ttl: float = 60.0,
+        static_data_ttl: float = 6 * 3600
+    ):
         self.api_key = api_key
         self.base_urls = {
             "americas": "https://americas.api.riotgames.com",
@@ -43,42 +77,178 @@ class RiotAPIClient:
         self.headers = {
             "X-Riot-Token": self.api_key
         }
+        
+        # Connection pool settings shared by every per-host client
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        
+        # HTTP/2 needs the optional 'h2' package (pip install httpx[http2])
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            print("HTTP/2 requested but 'h2' is not installed - falling back to HTTP/1.1")
+        
+        # One long-lived client (and connection pool) per API host
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        
+        # Upstream calls currently in flight, keyed by URL (single-flight)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        
+        # Proactive limiter; app limits are refined from response headers
+        self.rate_limiter = RateLimiter(default_app_limits=app_rate_limit)
+        
+        # Match-detail downloads kept in flight at once
+        self.match_concurrency = max(match_concurrency, 1)
+        
+        # Riot ID / summoner name -> summoner resolution, shared by all endpoints
+        self.summoner_cache = TTLCache(max_size=10000, default_ttl=summoner_cache_ttl)
+        self.summoner_negative_ttl = summoner_negative_ttl
+        
+        # Region-scoped static data (rotations, challenge config):
+        # (kind, region) -> (value, fetched_at), refreshed in the background
+        self.static_data_ttl = static_data_ttl
+        self._static_data: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        self._background_tasks: set = set()
+        
+        # Optional durable cache for finished (immutable) matches
+        self.match_store = match_store
     
     def _get_routing_value(self, platform: str) -> str:
         """Get routing value for regional API"""
         return self.routing_map.get(platform.lower(), "americas")
     
+    def _get_client(self, url: str) -> httpx.AsyncClient:
+        """Get (or lazily open) the pooled client for the URL's host"""
+        host = httpx.URL(url).host
+        client = self._clients.get(host)
+        
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                # Skip an unset key so the app still boots (e.g. demo mode)
+                headers={k: v for k, v in self.headers.items() if v},
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2
+            )
+            self._clients[host] = client
+        
+        return client
+    
+    async def start(self, platforms: Optional[List[str]] = None, warm_platforms: Optional[List[str]] = None):
+        """
+        Open pooled clients up front so the first requests skip setup
+        
+        Static data is otherwise fetched on each platform's first use, so
+        only the platforms given here are warmed (and none without a key).
+        
+        Args:
+            platforms: Platform regions to pre-open (defaults to all known)
+            warm_platforms: Platform regions whose static data is fetched now
+        """
+        platforms = platforms or list(self.routing_map.keys())
+        
+        for routing_url in self.base_urls.values():
+            self._get_client(routing_url)
+        for platform in platforms:
+            self._get_client(f"https://{platform}.api.riotgames.com")
+        
+        if not self.api_key:
+            return
+        
+        # Warm static data without delaying startup
+        for platform in warm_platforms or []:
+            platform = platform.lower()
+            if platform not in self.routing_map:
+                print(f"Skipping static data warm-up for unknown platform {platform}")
+                continue
+            for kind in self.STATIC_ENDPOINTS:
+                self._schedule_static_refresh(kind, platform)
+    
+    async def close(self):
+        """Close every pooled client and release its connections"""
+        for task in list(self._background_tasks):
+            task.cancel()
+        
+        clients = list(self._clients.values())
+        self._clients.clear()
+        
+        await asyncio.gather(
+            *[client.aclose() for client in clients],
+            return_exceptions=True
+        )
+        
+        if self.match_store:
+            self.match_store.close()
+    
     async def _make_request(
         self,
         url: str,
         retries: int = 3,
-        backoff: float = 1.0
+        backoff: float = 1.0,
+        not_found: Any = None,
+        decode: Optional[Callable[[bytes], Any]] = None
+    ) -> Optional[Dict[Any, Any]]:
+        """
+        Make HTTP request, sharing one upstream call between concurrent callers
+        
+        Identical URLs requested while a call is already in flight await that
+        call instead of issuing their own. Results are shared between callers
+        and should be treated as read-only. A 404 returns not_found (None
+        unless the caller asks for a marker). decode replaces plain JSON
+        decoding of the body (e.g. decode_match).
+        """
+        task = self._in_flight.get(url)
+        
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url, retries, backoff, decode))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        
+        # Shield so one caller giving up doesn't cancel the call for the others
+        result = await asyncio.shield(task)
+        return not_found if result is NOT_FOUND else result
+    
+    async def _fetch(
+        self,
+        url: str,
+        retries: int = 3,
+        backoff: float = 1.0,
+        decode: Optional[Callable[[bytes], Any]] = None
     ) -> Optional[Dict[Any, Any]]:
         """Make HTTP request with retry logic"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for attempt in range(retries):
-                try:
-                    response = await client.get(url, headers=self.headers)
-                    
-                    if response.status_code == 200:
-                        return response.json()
-                    elif response.status_code == 429:
-                        # Rate limited - wait and retry
-                        retry_after = int(response.headers.get("Retry-After", backoff))
-                        await asyncio.sleep(retry_after)
-                        continue
-                    elif response.status_code == 404:
-                        return None
-                    else:
-                        print(f"API Error: {response.status_code} - {response.text}")
-                        
-                except Exception as e:
-                    print(f"Request error (attempt {attempt + 1}/{retries}): {str(e)}")
-                    if attempt < retries - 1:
-                        await asyncio.sleep(backoff * (attempt + 1))
-                        continue
+        client = self._get_client(url)
+        parsed_url = httpx.URL(url)
+        host = parsed_url.host
+        method = get_method_name(parsed_url.path)
+        
+        for attempt in range(retries):
+            try:
+                await self.rate_limiter.acquire(host, method)
+                response = await client.get(url)
+                self.rate_limiter.update(host, method, response.headers)
+                
+                if response.status_code == 200:
+                    return decode(response.content) if decode else response.json()
+                elif response.status_code == 429:
+                    # Rate limited - block the tripped bucket, then retry
+                    retry_after = float(response.headers.get("Retry-After", backoff))
+                    self.rate_limiter.penalize(host, method, response.headers, retry_after)
+                    continue
+                elif response.status_code == 404:
+                    return NOT_FOUND
+                else:
+                    print(f"API Error: {response.status_code} - {response.text}")
                     
-            return None
+            except Exception as e:
+                print(f"Request error (attempt {attempt + 1}/{retries}): {str(e)}")
+                if attempt < retries - 1:
+                    await asyncio.sleep(backoff * (attempt + 1))
+                    continue
+                
+        return None
     
     async def get_summoner_by_name(
         self,
@@ -95,6 +265,34 @@ class RiotAPIClient:
         Returns:
             Summoner data or None if not found
         """
+        # Riot IDs and names are case-insensitive
+        cache_key = (region.lower(), summoner_name.strip().lower())
+        cached = self.summoner_cache.get(cache_key)
+        if cached is not None:
+            return None if cached is NOT_FOUND else cached
+        
+        summoner = await self._resolve_summoner(region, summoner_name.strip())
+        
+        if summoner is NOT_FOUND:
+            # Short-lived negative entry so repeated typos don't hit the API
+            self.summoner_cache.set(cache_key, NOT_FOUND, ttl=self.summoner_negative_ttl)
+            return None
+        if summoner:
+            self.summoner_cache.set(cache_key, summoner)
+        
+        return summoner
+    
+    async def _resolve_summoner(
+        self,
+        region: str,
+        summoner_name: str
+    ) -> Any:
+        """
+        Resolve a summoner via account-v1 / summoner-v4
+        
+        Returns:
+            Summoner data, NOT_FOUND if Riot returned 404, or None on errors
+        """
         # Try new Riot ID format first (GameName#TAG)
         if '#' in summoner_name:
             parts = summoner_name.split('#')
@@ -103,79 +301,408 @@ class RiotAPIClient:
             
             # Use Account-V1 API for Riot ID
             routing = self._get_routing_value(region)
-            account_url = f"{self.base_urls[routing]}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-            account_data = await self._make_request(account_url)
+            account_url = (
+                f"{self.base_urls[routing]}/riot/account/v1/accounts/by-riot-id/"
+                f"{quote(game_name, safe='')}/{quote(tag_line, safe='')}"
+            )
+            account_data = await self._make_request(account_url, not_found=NOT_FOUND)
             
-            if account_data and account_data.get('puuid'):
+            if account_data is None:
+                # Upstream error - don't fall through (or negatively cache)
+                return None
+            
+            if account_data is NOT_FOUND:
+                # A Riot ID is never a legacy summoner name - the lookup ends here
+                return NOT_FOUND
+            
+            if account_data.get('puuid'):
                 # Get summoner data by PUUID
                 summoner_url = f"https://{region}.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{account_data['puuid']}"
-                summoner_data = await self._make_request(summoner_url)
-                if summoner_data:
-                    # Add game name and tag line to response
-                    summoner_data['gameName'] = account_data.get('gameName')
-                    summoner_data['tagLine'] = account_data.get('tagLine')
+                summoner_data = await self._make_request(summoner_url, not_found=NOT_FOUND)
+                if summoner_data and summoner_data is not NOT_FOUND:
+                    # Add game name and tag line (copy - the response may be shared)
+                    summoner_data = {
+                        **summoner_data,
+                        'gameName': account_data.get('gameName'),
+                        'tagLine': account_data.get('tagLine')
+                    }
                 return summoner_data
         
-        # Fallback to old summoner name API (still works for some accounts)
-        url = f"https://{region}.api.riotgames.com/lol/summoner/v4/summoners/by-name/{summoner_name}"
-        return await self._make_request(url)
+            return None
+        
+        # Bare names: old summoner name API (still works for some accounts)
+        url = f"https://{region}.api.riotgames.com/lol/summoner/v4/summoners/by-name/{quote(summoner_name, safe='')}"
+        return await self._make_request(url, not_found=NOT_FOUND)
     
-    async def get_match_history(
+    async def get_match_ids(
         self,
         region: str,
         puuid: str,
+        start: int = 0,
         count: int = 20,
-        queue_type: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+        queue_type: Optional[int] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> List[str]:
         """
-        Get match history for a player
+        Get one page of match IDs for a player (newest first)
         
         Args:
             region: Platform region
             puuid: Player UUID
-            count: Number of matches to fetch (max 100)
+            start: Offset into the match list
+            count: Page size (max 100)
             queue_type: Optional queue filter (420 = Ranked Solo/Duo)
+            start_time: Optional epoch seconds lower bound on game start
+            end_time: Optional epoch seconds upper bound on game start
             
         Returns:
-            List of detailed match data
+            List of match IDs (empty if the request failed)
         """
+        result = await self._fetch_match_ids(region, puuid, start, count, queue_type, start_time, end_time)
+        return result if result else []
+    
+    async def _fetch_match_ids(
+        self,
+        region: str,
+        puuid: str,
+        start: int = 0,
+        count: int = 20,
+        queue_type: Optional[int] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> Optional[List[str]]:
+        """Like get_match_ids, but None if the request failed ([] = no games)"""
         routing = self._get_routing_value(region)
         
-        # Get match IDs
         match_ids_url = f"{self.base_urls[routing]}/lol/match/v5/matches/by-puuid/{puuid}/ids"
-        params = f"?start=0&count={min(count, 100)}"
+        params = f"?start={start}&count={min(count, 100)}"
         
         if queue_type:
             params += f"&queue={queue_type}"
+        if start_time is not None:
+            params += f"&startTime={start_time}"
+        if end_time is not None:
+            params += f"&endTime={end_time}"
+        
+        return await self._make_request(match_ids_url + params)
+    
+    async def _sync_match_ids(
+        self,
+        region: str,
+        puuid: str,
+        count: int,
+        queue_type: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the newest match IDs, pulling only the delta for known players
         
-        match_ids = await self._make_request(match_ids_url + params)
+        The stored history is extended with IDs whose game started at or
+        after the newest game we already have; a full fetch only happens
+        for new players or when more history is requested than stored.
+        A failed request leaves the stored history as it was.
         
-        if not match_ids:
-            return []
+        Returns:
+            Updated sync state (not yet saved) with the merged match_ids
+        """
+        state = await self.match_store.get_sync_state(puuid, queue_type)
+        known_ids = state["match_ids"] if state else []
+        complete = state.get("complete", False) if state else False
+        
+        can_sync = (
+            state is not None
+            and state.get("newest_start_time") is not None
+            and (len(known_ids) >= count or complete)
+        )
+        
+        if can_sync:
+            new_ids = []
+            start = 0
+            
+            # startTime is inclusive, so the newest known match comes back too
+            while True:
+                page = await self._fetch_match_ids(
+                    region,
+                    puuid,
+                    start=start,
+                    count=100,
+                    queue_type=queue_type,
+                    start_time=state["newest_start_time"]
+                )
+                if page is None:
+                    # A missing page would leave a hole between new and known IDs
+                    new_ids = []
+                    break
+                new_ids.extend(page)
+                if len(page) < 100:
+                    break
+                start += 100
+            
+            merged = list(dict.fromkeys(new_ids + known_ids))
+        else:
+            fresh_ids = await self._fetch_match_ids(region, puuid, count=count, queue_type=queue_type)
+            
+            if fresh_ids is None:
+                merged = known_ids
+            elif set(fresh_ids) & set(known_ids):
+                # The fresh page reaches back into the stored IDs - no gap
+                merged = list(dict.fromkeys(fresh_ids + known_ids))
+                complete = len(fresh_ids) < min(count, 100) or complete
+            else:
+                # More games than one page since the last sync: start over
+                merged = fresh_ids
+                complete = len(fresh_ids) < min(count, 100)
+        
+        return {
+            "match_ids": merged[:self.MAX_SYNCED_MATCH_IDS],
+            "newest_start_time": state.get("newest_start_time") if state else None,
+            "complete": complete
+        }
+    
+    async def iter_match_details(
+        self,
+        region: str,
+        match_ids: List[str]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Fetch match details with a sliding window of requests in flight
+        
+        Up to match_concurrency downloads run at once and a new one starts
+        as soon as any finishes, so one slow match never stalls the rest.
+        Cached matches are yielded first, then downloads as they complete.
+        
+        Args:
+            region: Platform region
+            match_ids: Match IDs to fetch
+            
+        Yields:
+            (match_id, match data) tuples in completion order
+        """
+        routing = self._get_routing_value(region)
+        
+        # Finished matches never change - serve what we can from the store
+        cached = await self.match_store.get_many(match_ids) if self.match_store else {}
+        for match_id in match_ids:
+            if match_id in cached:
+                yield match_id, cached[match_id]
+        
+        missing_ids = [mid for mid in match_ids if mid not in cached]
+        if not missing_ids:
+            return
+        
+        semaphore = asyncio.Semaphore(self.match_concurrency)
         
-        # Fetch detailed match data in parallel batches to avoid rate limiting
         async def fetch_match(match_id: str):
-            match_url = f"{self.base_urls[routing]}/lol/match/v5/matches/{match_id}"
-            return await self._make_request(match_url)
+            async with semaphore:
+                match_url = f"{self.base_urls[routing]}/lol/match/v5/matches/{match_id}"
+                # Keep only the fields the analyzers use (see MATCH_SCHEMA)
+                return match_id, await self._make_request(match_url, decode=decode_match)
         
-        # Process in batches of 10 to respect rate limits
-        batch_size = 10
-        matches = []
+        tasks = [asyncio.ensure_future(fetch_match(mid)) for mid in missing_ids]
+        # Downloads not yet written, stored one window at a time
+        unstored = []
+        remaining = len(tasks)
         
-        for i in range(0, len(match_ids), batch_size):
-            batch = match_ids[i:i + batch_size]
-            batch_results = await asyncio.gather(*[fetch_match(mid) for mid in batch], return_exceptions=True)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                remaining -= 1
+                try:
+                    match_id, match_data = await next_done
+                except Exception as e:
+                    print(f"Match fetch error: {str(e)}")
+                    continue
+                
+                if match_data:
+                    if self.match_store:
+                        unstored.append(match_data)
+                        # Write before yielding: the consumer may stop here
+                        if len(unstored) >= self.match_concurrency or not remaining:
+                            await self.match_store.put_many(unstored)
+                            unstored = []
+                    yield match_id, match_data
             
-            # Filter out None and exceptions
-            for match_data in batch_results:
-                if match_data and not isinstance(match_data, Exception):
-                    matches.append(match_data)
+            if unstored:
+                await self.match_store.put_many(unstored)
+        finally:
+            # Consumer stopped early - don't leave downloads running (the
+            # unwritten part of the window is downloaded again next time)
+            for task in tasks:
+                task.cancel()
+    
+    async def get_match_details(
+        self,
+        region: str,
+        match_ids: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get match details for a list of match IDs, using the store when possible
+        
+        Args:
+            region: Platform region
+            match_ids: Match IDs (order is preserved in the result)
             
-            # Small delay between batches
-            if i + batch_size < len(match_ids):
-                await asyncio.sleep(0.1)
+        Returns:
+            List of detailed match data
+        """
+        results = {}
+        async for match_id, match_data in self.iter_match_details(region, match_ids):
+            results[match_id] = match_data
         
-        return matches
+        # Keep the newest-first order of the match ID list
+        return [results[mid] for mid in match_ids if mid in results]
+    
+    async def get_match_history(
+        self,
+        region: str,
+        puuid: str,
+        count: int = 20,
+        queue_type: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get match history for a player
+        
+        With a match store configured, returning players only pull the
+        match IDs played since their last sync.
+        
+        Args:
+            region: Platform region
+            puuid: Player UUID
+            count: Number of matches to fetch (max 100)
+            queue_type: Optional queue filter (420 = Ranked Solo/Duo)
+            
+        Returns:
+            List of detailed match data
+        """
+        histories = await self.get_match_histories(region, [puuid], count, queue_type)
+        return histories[puuid]
+    
+    async def get_match_histories(
+        self,
+        region: str,
+        puuids: List[str],
+        count: int = 20,
+        queue_type: Optional[int] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get match histories for several players, downloading shared matches once
+        
+        Match-ID lists are fetched concurrently and details are fetched for
+        the union of IDs, so games the players played together (duo, Clash)
+        cost a single request.
+        
+        Args:
+            region: Platform region
+            puuids: Player UUIDs
+            count: Number of matches per player (max 100)
+            queue_type: Optional queue filter (420 = Ranked Solo/Duo)
+            
+        Returns:
+            Dict of puuid -> list of detailed match data (newest first)
+        """
+        count = min(count, 100)
+        puuids = list(dict.fromkeys(puuids))
+        
+        async def get_ids(puuid: str):
+            if not self.match_store:
+                return await self.get_match_ids(region, puuid, count=count, queue_type=queue_type), None
+            sync_state = await self._sync_match_ids(region, puuid, count, queue_type)
+            return sync_state["match_ids"][:count], sync_state
+        
+        id_results = await asyncio.gather(*[get_ids(puuid) for puuid in puuids])
+        
+        all_ids = list(dict.fromkeys(mid for match_ids, _ in id_results for mid in match_ids))
+        details = await self.get_match_details(region, all_ids) if all_ids else []
+        by_id = {m.get("metadata", {}).get("matchId"): m for m in details}
+        
+        histories = {}
+        for puuid, (match_ids, sync_state) in zip(puuids, id_results):
+            matches = [by_id[mid] for mid in match_ids if mid in by_id]
+            histories[puuid] = matches
+            
+            if sync_state is None:
+                continue
+            
+            # Remember the newest game start so the next sync only pulls the delta
+            start_times = [
+                m.get("info", {}).get("gameStartTimestamp") or m.get("info", {}).get("gameCreation") or 0
+                for m in matches
+            ]
+            newest = max(start_times, default=0) // 1000
+            if newest and newest > (sync_state["newest_start_time"] or 0):
+                sync_state["newest_start_time"] = newest
+            
+            await self.match_store.put_sync_state(puuid, queue_type, sync_state)
+        
+        return histories
+    
+    async def iter_match_history(
+        self,
+        region: str,
+        puuid: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        queue_type: Optional[int] = None,
+        max_matches: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a player's full match history (newest first), beyond the 100-match cap
+        
+        Match IDs are paged 100 at a time and each page's details come
+        through the iter_match_details sliding window, so one slow match
+        never stalls the rest. Matches that arrive ahead of a slower, newer
+        one are held (projected, a few KB each) until they can be yielded in
+        order. Pacing comes from the rate limiter.
+        
+        Args:
+            region: Platform region
+            puuid: Player UUID
+            start_time: Epoch seconds lower bound (defaults to Jan 1 of this year)
+            end_time: Optional epoch seconds upper bound
+            queue_type: Optional queue filter (420 = Ranked Solo/Duo)
+            max_matches: Optional cap on matches yielded
+            
+        Yields:
+            Detailed match data
+        """
+        if start_time is None:
+            start_time = int(datetime(datetime.now().year, 1, 1).timestamp())
+        
+        start = 0
+        yielded = 0
+        
+        while max_matches is None or yielded < max_matches:
+            page = await self.get_match_ids(
+                region,
+                puuid,
+                start=start,
+                count=100,
+                queue_type=queue_type,
+                start_time=start_time,
+                end_time=end_time
+            )
+            full_page = len(page) == 100
+            if max_matches is not None:
+                page = page[:max_matches - yielded]
+            
+            # Re-sequence completion-order arrivals into page order
+            position = {match_id: i for i, match_id in enumerate(page)}
+            arrived: Dict[int, Dict[str, Any]] = {}
+            next_position = 0
+            async for match_id, match in self.iter_match_details(region, page):
+                arrived[position[match_id]] = match
+                while next_position < len(page) and next_position in arrived:
+                    yield arrived.pop(next_position)
+                    yielded += 1
+                    next_position += 1
+            
+            # Anything still held was queued behind a failed download
+            for i in sorted(arrived):
+                yield arrived.pop(i)
+                yielded += 1
+            
+            if not full_page:
+                break
+            start += 100
     
     async def get_champion_mastery(
         self,
@@ -330,12 +857,114 @@ class RiotAPIClient:
         result = await self._make_request(url)
         return result if result else []
     
+    async def get_clash_team(
+        self,
+        region: str,
+        team_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a Clash team and its roster
+        
+        Args:
+            region: Platform region
+            team_id: Clash team ID (from get_clash_data)
+            
+        Returns:
+            Team data with its players, or None if not found
+        """
+        url = f"https://{region}.api.riotgames.com/lol/clash/v1/teams/{team_id}"
+        return await self._make_request(url)
+    
+    async def get_summoner_by_puuid(
+        self,
+        region: str,
+        puuid: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get summoner information (with Riot ID) by PUUID
+        
+        Args:
+            region: Platform region
+            puuid: Player UUID
+            
+        Returns:
+            Summoner data or None if not found
+        """
+        cache_key = (region.lower(), "by-puuid", puuid)
+        cached = self.summoner_cache.get(cache_key)
+        if cached is not None:
+            return None if cached is NOT_FOUND else cached
+        
+        routing = self._get_routing_value(region)
+        account_url = f"{self.base_urls[routing]}/riot/account/v1/accounts/by-puuid/{puuid}"
+        summoner_url = f"https://{region}.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{puuid}"
+        account_data, summoner_data = await asyncio.gather(
+            self._make_request(account_url),
+            self._make_request(summoner_url, not_found=NOT_FOUND)
+        )
+        
+        if summoner_data is NOT_FOUND:
+            self.summoner_cache.set(cache_key, NOT_FOUND, ttl=self.summoner_negative_ttl)
+            return None
+        if not summoner_data:
+            return None
+        
+        if account_data:
+            summoner_data = {
+                **summoner_data,
+                'gameName': account_data.get('gameName'),
+                'tagLine': account_data.get('tagLine')
+            }
+        
+        self.summoner_cache.set(cache_key, summoner_data)
+        return summoner_data
+    
+    async def _refresh_static_data(self, kind: str, region: str) -> Any:
+        """Fetch a static endpoint and store it (failures keep the old value)"""
+        url = f"https://{region}.api.riotgames.com{self.STATIC_ENDPOINTS[kind]}"
+        result = await self._make_request(url)
+        
+        if result:
+            self._static_data[(kind, region)] = (result, time.monotonic())
+        return result
+    
+    def _schedule_static_refresh(self, kind: str, region: str):
+        """Refresh static data in the background (once per key at a time)"""
+        if any(task.get_name() == f"static:{kind}:{region}" for task in self._background_tasks):
+            return
+        
+        task = asyncio.create_task(
+            self._refresh_static_data(kind, region),
+            name=f"static:{kind}:{region}"
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _get_static_data(self, kind: str, region: str) -> Any:
+        """
+        Read static data from memory, refreshing stale entries in the background
+        
+        Only the very first request for a region waits on the network.
+        """
+        region = region.lower()
+        entry = self._static_data.get((kind, region))
+        
+        if entry is None:
+            return await self._refresh_static_data(kind, region)
+        
+        value, fetched_at = entry
+        if time.monotonic() - fetched_at > self.static_data_ttl:
+            # Serve the stale value now; the next request sees fresh data
+            self._schedule_static_refresh(kind, region)
+        
+        return value
+    
     async def get_champion_rotations(
         self,
         region: str
     ) -> Optional[Dict[str, Any]]:
         """
-        Get current free champion rotation
+        Get current free champion rotation (cached per region)
         
         Args:
             region: Platform region
@@ -343,15 +972,14 @@ class RiotAPIClient:
         Returns:
             Free champion rotation data
         """
-        url = f"https://{region}.api.riotgames.com/lol/platform/v3/champion-rotations"
-        return await self._make_request(url)
+        return await self._get_static_data("champion_rotations", region)
     
     async def get_challenge_config(
         self,
         region: str
     ) -> List[Dict[str, Any]]:
         """
-        Get challenge configuration (names, descriptions, thresholds)
+        Get challenge configuration (names, descriptions, thresholds), cached per region
         
         Args:
             region: Platform region
@@ -359,8 +987,5 @@ class RiotAPIClient:
         Returns:
             List of challenge configurations
         """
-        url = f"https://{region}.api.riotgames.com/lol/challenges/v1/challenges/config"
-        result = await self._make_request(url)
+        result = await self._get_static_data("challenge_config", region)
         return result if result else []
-
-
@@ -0,0 +1,18 @@
+"""
+Server-Sent Events Helpers
+Formatting for the streaming endpoints
+"""
+import json
+from typing import Any
+
+
+# Keep proxies (nginx) from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+
+def format_sse_event(event: str, data: Any) -> str:
+    """Format one SSE message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
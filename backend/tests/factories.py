@@ -0,0 +1,116 @@
+"""
+Test Factories
+Synthetic Match-v5 payloads shaped like Riot's responses
+"""
+from typing import Any, Dict, List, Optional
+
+POSITIONS = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+# Epoch ms of the first generated game (2024-01-01)
+BASE_CREATION = 1704067200000
+
+
+def make_participant(
+    puuid: str,
+    participant_id: int,
+    team_id: int,
+    win: bool,
+    champion_id: int = 103,
+    kills: int = 5,
+    deaths: int = 3,
+    assists: int = 7,
+    position: Optional[str] = None,
+    penta_kills: int = 0,
+    quadra_kills: int = 0
+) -> Dict[str, Any]:
+    """One participant with the fields we use plus a few of the ~100 we drop"""
+    return {
+        "puuid": puuid,
+        "participantId": participant_id,
+        "teamId": team_id,
+        "teamPosition": position or POSITIONS[(participant_id - 1) % 5],
+        "championId": champion_id,
+        "championName": f"Champion{champion_id}",
+        "win": win,
+        "kills": kills,
+        "deaths": deaths,
+        "assists": assists,
+        "pentaKills": penta_kills,
+        "quadraKills": quadra_kills,
+        "goldEarned": 11000 + participant_id,
+        "totalDamageDealtToChampions": 20000 + participant_id,
+        "visionScore": 20,
+        "item0": 3031,
+        "perks": {"statPerks": {"defense": 5002}, "styles": [{"style": 8000}]},
+        "challenges": {"kda": 3.1, "killParticipation": 0.5}
+    }
+
+
+def make_match(
+    index: int,
+    players: Optional[List[Dict[str, Any]]] = None,
+    creation: Optional[int] = None,
+    duration: int = 1800,
+    queue_id: int = 420
+) -> Dict[str, Any]:
+    """
+    A full Match-v5 payload
+
+    Args:
+        index: Match number (match ID NA1_<index>, one hour apart by default)
+        players: Participants to put in; filler players complete the ten
+        creation: gameCreation in epoch ms
+        duration: gameDuration in seconds
+        queue_id: Queue ID
+
+    Returns:
+        Match payload
+    """
+    creation = BASE_CREATION + index * 3600 * 1000 if creation is None else creation
+    participants = list(players or [])
+    used_ids = {p["participantId"] for p in participants}
+    filler = (pid for pid in range(1, 11) if pid not in used_ids)
+    while len(participants) < 10:
+        pid = next(filler)
+        team_id = 100 if pid <= 5 else 200
+        participants.append(make_participant(f"filler-{pid}", pid, team_id, win=team_id == 100))
+
+    return {
+        "metadata": {
+            "dataVersion": "2",
+            "matchId": f"NA1_{index}",
+            "participants": [p["puuid"] for p in participants]
+        },
+        "info": {
+            "endOfGameResult": "GameComplete",
+            "gameCreation": creation,
+            "gameStartTimestamp": creation + 30000,
+            "gameEndTimestamp": creation + 30000 + duration * 1000,
+            "gameDuration": duration,
+            "gameMode": "CLASSIC",
+            "gameVersion": "14.1.555.5555",
+            "mapId": 11,
+            "queueId": queue_id,
+            "participants": participants,
+            "teams": [{"teamId": 100, "win": True}, {"teamId": 200, "win": False}]
+        }
+    }
+
+
+def make_player_match(
+    index: int,
+    puuid: str,
+    win: bool,
+    champion_id: int = 103,
+    kills: int = 5,
+    deaths: int = 3,
+    assists: int = 7,
+    position: str = "MIDDLE",
+    **match_fields
+) -> Dict[str, Any]:
+    """A match with the given player on team 100 (participant 3)"""
+    player = make_participant(
+        puuid, 3, 100, win,
+        champion_id=champion_id, kills=kills, deaths=deaths, assists=assists, position=position
+    )
+    return make_match(index, [player], **match_fields)
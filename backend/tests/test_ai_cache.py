@@ -0,0 +1,102 @@
+"""
+AI Response Cache Tests
+Cache keys, single-flight generation and the on-disk store
+"""
+import asyncio
+
+import pytest
+
+from services.ai_cache import AIResponseCache, make_cache_key
+
+
+MODEL = "anthropic.claude-3-haiku-20240307-v1:0"
+
+
+def entry(text="recap"):
+    return {"text": text, "input_tokens": 100, "output_tokens": 20}
+
+
+def test_cache_key_ignores_whitespace_formatting():
+    key = make_cache_key("recap", MODEL, "Games: 20\nWins: 12")
+
+    assert make_cache_key("recap", MODEL, "  Games:   20\n\n  Wins: 12 ") == key
+    assert make_cache_key("recap", MODEL, "Games: 20\nWins: 13") != key
+
+
+def test_cache_key_depends_on_task_and_model():
+    key = make_cache_key("recap", MODEL, "Games: 20")
+
+    assert make_cache_key("roast", MODEL, "Games: 20") != key
+    assert make_cache_key("recap", "amazon.nova-lite-v1:0", "Games: 20") != key
+    # Fields are separated, so shifting text between them changes the key
+    assert make_cache_key("recap", "m", "x") != make_cache_key("recap", "mx", "")
+
+
+def test_concurrent_misses_share_one_generation():
+    cache = AIResponseCache()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return entry()
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_generate("key", generate) for _ in range(3)])
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert [result["cached"] for result in results] == [False, True, True]
+    assert asyncio.run(cache.get_or_generate("key", generate))["cached"] is True
+    assert len(calls) == 1
+
+
+def test_uncacheable_entries_are_shared_but_not_stored():
+    cache = AIResponseCache()
+
+    async def generate():
+        return {**entry("fallback"), "cacheable": False}
+
+    result = asyncio.run(cache.get_or_generate("key", generate))
+
+    assert result["text"] == "fallback" and "cacheable" not in result
+    assert asyncio.run(cache.get("key")) is None
+
+
+def test_generation_errors_reach_the_caller():
+    cache = AIResponseCache()
+
+    async def generate():
+        raise RuntimeError("throttled")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_generate("key", generate))
+    assert asyncio.run(cache.get("key")) is None
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache" / "ai.db")
+    cache = AIResponseCache(path=path)
+    asyncio.run(cache.set("key", entry()))
+    cache.close()
+
+    reopened = AIResponseCache(path=path)
+    try:
+        assert asyncio.run(reopened.get("key")) == entry()
+        assert asyncio.run(reopened.get("other")) is None
+    finally:
+        reopened.close()
+
+
+def test_expired_entries_are_not_loaded(tmp_path):
+    path = str(tmp_path / "ai.db")
+    cache = AIResponseCache(path=path, ttl=-1)
+    asyncio.run(cache.set("key", entry()))
+    cache.close()
+
+    reopened = AIResponseCache(path=path)
+    try:
+        assert asyncio.run(reopened.get("key")) is None
+    finally:
+        reopened.close()
@@ -0,0 +1,255 @@
+"""
+Match Aggregates Tests
+Incremental and merged aggregates agree with one pass over every match
+"""
+import json
+import random
+from typing import List, Tuple
+
+import pytest
+
+from services.analyzer import MatchAnalyzer
+from services.match_aggregates import PlayerAggregates, StreakRuns
+from services.match_table import PlayerMatchTable
+from services.pattern_accumulators import PatternAccumulator, PatternAggregates, register_pattern
+
+from factories import BASE_CREATION, make_match, make_player_match
+
+
+PUUID = "player-a"
+MINUTE = 60 * 1000
+
+
+def make_history(count: int = 50, seed: int = 3):
+    """Newest-first matches; every seventh one doesn't include the player"""
+    rng = random.Random(seed)
+    matches = []
+    for index in range(count, 0, -1):
+        if index % 7 == 0:
+            matches.append(make_match(index))
+            continue
+        matches.append(make_player_match(
+            index, PUUID, rng.random() < 0.5,
+            champion_id=rng.choice([103, 238, 157, 64]),
+            kills=rng.randint(0, 12),
+            deaths=rng.randint(0, 8),
+            assists=rng.randint(0, 15),
+            position=rng.choice(["MIDDLE", "JUNGLE"])
+        ))
+    return matches
+
+
+def results_table(results: List[Tuple[int, bool]], first_index: int = 1) -> PlayerMatchTable:
+    """Table of (gameCreation, win) results, given newest first"""
+    return PlayerMatchTable.from_matches([
+        make_player_match(first_index + offset, PUUID, win, creation=creation)
+        for offset, (creation, win) in enumerate(results)
+    ], PUUID)
+
+
+def aggregates_state(aggregates: PlayerAggregates):
+    """Saved state with group order ignored (rendering orders by last_played)"""
+    state = aggregates.to_dict()
+    state["champions"] = dict(state["champions"])
+    return state
+
+
+@pytest.fixture
+def table():
+    return PlayerMatchTable.from_matches(make_history(), PUUID)
+
+
+# StreakRuns joins
+
+@pytest.mark.parametrize("split", [1, 2, 5, 17, 30, 49])
+def test_streak_runs_join_in_either_order(table, split):
+    expected = StreakRuns.from_table(table).to_dict()
+    newer = table.take(table.game_creation >= table.game_creation[split - 1])
+    older = table.take(table.game_creation < table.game_creation[split - 1])
+
+    assert StreakRuns.from_table(newer).add(StreakRuns.from_table(older)).to_dict() == expected
+    assert StreakRuns.from_table(older).add(StreakRuns.from_table(newer)).to_dict() == expected
+
+
+def test_streak_runs_join_one_game_at_a_time(table):
+    expected = StreakRuns.from_table(table).to_dict()
+    oldest_first = StreakRuns()
+    for row in reversed(range(len(table))):
+        oldest_first.add(StreakRuns.from_table(table.take(table.game_creation == table.game_creation[row])))
+    assert oldest_first.to_dict() == expected
+
+
+def test_streak_runs_join_blocks_sharing_a_game_creation():
+    now = BASE_CREATION
+    newer = [(now + 2 * MINUTE, True), (now, True)]
+    older = [(now, True), (now - MINUTE, False)]
+    expected = StreakRuns.from_table(results_table(newer + older)).to_dict()
+
+    newer_runs = StreakRuns.from_table(results_table(newer))
+    older_runs = StreakRuns.from_table(results_table(older, first_index=10))
+
+    assert StreakRuns.from_dict(newer_runs.to_dict()).add(older_runs).to_dict() == expected
+    assert StreakRuns.from_dict(older_runs.to_dict()).add(newer_runs).to_dict() == expected
+    assert expected["head"] == [True, 3]
+
+
+def test_streak_runs_overlapping_ranges_go_behind():
+    now = BASE_CREATION
+    first = [(now + 5 * MINUTE, False), (now + MINUTE, True)]
+    second = [(now + 3 * MINUTE, True), (now - MINUTE, True)]
+
+    joined = StreakRuns.from_table(results_table(first)).add(
+        StreakRuns.from_table(results_table(second, first_index=10))
+    )
+
+    assert joined.head == (False, 1)
+    assert joined.tail == (True, 3)
+    assert joined.longest_win == 3
+    assert (joined.newest, joined.oldest) == (now + 5 * MINUTE, now - MINUTE)
+
+
+def test_streak_runs_all_win_blocks_join_head_and_tail():
+    now = BASE_CREATION
+    newer = StreakRuns.from_table(results_table([(now + 3 * MINUTE, True), (now + 2 * MINUTE, True)]))
+    older = StreakRuns.from_table(results_table([(now + MINUTE, True), (now, True)], first_index=10))
+
+    joined = newer.add(older)
+
+    assert joined.games == 4
+    assert joined.head == joined.tail == (True, 4)
+    assert (joined.longest_win, joined.longest_loss) == (4, 0)
+
+
+def test_streak_runs_empty_blocks(table):
+    expected = StreakRuns.from_table(table).to_dict()
+    empty = StreakRuns.from_table(table.take(table.game_creation < 0))
+
+    assert empty.games == 0
+    assert StreakRuns.from_table(table).add(empty).to_dict() == expected
+    assert empty.add(StreakRuns.from_table(table)).to_dict() == expected
+
+
+# PlayerAggregates
+
+def chunks(table: PlayerMatchTable, size: int) -> List[PlayerMatchTable]:
+    """Row blocks of a table, newest first"""
+    rows = table.game_creation
+    bounds = sorted(set(rows[::size]), reverse=True)
+    return [
+        table.take((rows <= upper) & (rows > lower))
+        for upper, lower in zip(bounds, bounds[1:] + [rows.min() - 1])
+    ]
+
+
+@pytest.mark.parametrize("size", [1, 3, 10, 50])
+def test_chunked_updates_match_one_full_update(table, size):
+    expected = aggregates_state(PlayerAggregates().update(table))
+
+    newest_first = PlayerAggregates()
+    oldest_first = PlayerAggregates()
+    for chunk in chunks(table, size):
+        newest_first.update(chunk)
+    for chunk in reversed(chunks(table, size)):
+        oldest_first.update(chunk)
+
+    assert aggregates_state(newest_first) == expected
+    assert aggregates_state(oldest_first) == expected
+
+
+@pytest.mark.parametrize("size", [1, 4, 25])
+def test_merged_shards_match_one_full_update(table, size):
+    analyzer = MatchAnalyzer()
+    full = PlayerAggregates().update(table)
+
+    merged = PlayerAggregates()
+    for chunk in reversed(chunks(table, size)):
+        merged.merge(PlayerAggregates().update(chunk))
+
+    assert aggregates_state(merged) == aggregates_state(full)
+    assert analyzer.render_aggregates(merged) == analyzer.render_aggregates(full)
+
+
+def test_rows_without_the_player_count_as_games_only(table):
+    aggregates = PlayerAggregates().update(table)
+
+    assert (~table.found).sum() == 7
+    assert aggregates.games == len(table)
+    assert aggregates.wins == int(table.win[table.found].sum())
+    assert sum(stats["games"] for stats in aggregates.champions.values()) == int(table.found.sum())
+    assert 0 not in aggregates.champions
+
+
+def test_render_aggregates_matches_analyze_matches():
+    matches = make_history()
+    analyzer = MatchAnalyzer()
+    aggregates = PlayerAggregates().update(PlayerMatchTable.from_matches(matches, PUUID))
+
+    assert analyzer.render_aggregates(aggregates) == analyzer.analyze_matches(matches, PUUID)
+
+
+def test_counted_matches_are_skipped(table):
+    aggregates = PlayerAggregates().update(table)
+    expected = aggregates.to_dict()
+
+    aggregates.update(table)
+    aggregates.update(chunks(table, 5)[2])
+
+    assert aggregates.to_dict() == expected
+
+
+def test_merge_rejects_shared_matches(table):
+    first, second = chunks(table, 25)
+    aggregates = PlayerAggregates().update(first)
+
+    with pytest.raises(ValueError):
+        aggregates.merge(PlayerAggregates().update(first).update(second))
+
+
+def test_aggregates_round_trip_through_json(table):
+    analyzer = MatchAnalyzer()
+    aggregates = PlayerAggregates().update(table)
+
+    restored = PlayerAggregates.from_dict(json.loads(json.dumps(aggregates.to_dict())))
+
+    assert restored.to_dict() == aggregates.to_dict()
+    assert analyzer.render_aggregates(restored) == analyzer.render_aggregates(aggregates)
+
+
+# PatternAggregates
+
+def test_pattern_state_merges_newer_games(table):
+    expected = PatternAggregates().update(table).patterns()
+    older, newer = chunks(table, 20)[1:], chunks(table, 20)[0]
+
+    state = PatternAggregates()
+    for chunk in older:
+        state.merge(PatternAggregates().update(chunk))
+    state.merge(PatternAggregates().update(newer))
+
+    assert state.patterns() == expected
+
+
+def test_pattern_state_round_trips_through_json(table):
+    state = PatternAggregates().update(table)
+
+    restored = PatternAggregates.from_dict(json.loads(json.dumps(state.to_dict())))
+
+    assert restored.patterns() == state.patterns()
+    assert restored.to_dict() == state.to_dict()
+
+
+def test_pattern_state_missing_a_detector_is_rejected(table):
+    data = PatternAggregates().update(table).to_dict()
+    data.pop(next(iter(data)))
+
+    with pytest.raises(KeyError):
+        PatternAggregates.from_dict(data)
+
+
+def test_register_pattern_rejects_unfinished_detectors():
+    class HalfDone(PatternAccumulator):
+        def update(self, table):
+            pass
+
+    with pytest.raises(TypeError, match="HalfDone"):
+        register_pattern(HalfDone)
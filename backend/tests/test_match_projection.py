@@ -0,0 +1,169 @@
+"""
+Match Projection Tests
+MATCH_SCHEMA keeps every field the sync cursor, analyzers and prompts read
+"""
+import json
+import random
+
+import numpy as np
+import pytest
+
+from services import match_projection
+from services.analyzer import MatchAnalyzer
+from services.aws_bedrock import BedrockAIService
+from services.match_projection import MATCH_SCHEMA, decode_match, project_match
+from services.match_table import PlayerMatchTable
+from services.pattern_detector import PatternDetector
+
+from factories import make_match, make_participant, make_player_match
+
+
+PUUID = "player-a"
+DUO_PUUID = "player-b"
+
+
+def make_history(count: int = 60, seed: int = 7):
+    """Newest-first history with duo games, a missing player and multikills"""
+    rng = random.Random(seed)
+    matches = []
+    for index in range(count, 0, -1):
+        win = rng.random() < 0.55
+        players = [
+            make_participant(
+                PUUID, 3, 100, win,
+                champion_id=rng.choice([103, 238, 157]),
+                kills=rng.randint(0, 15),
+                deaths=rng.randint(0, 10),
+                assists=rng.randint(0, 20),
+                position=rng.choice(["MIDDLE", "TOP", "UTILITY"]),
+                penta_kills=int(index % 17 == 0),
+                quadra_kills=int(index % 11 == 0)
+            )
+        ]
+        if index % 4 == 0:
+            # Duo partner, on either side
+            team_id = 100 if index % 8 == 0 else 200
+            players.append(make_participant(DUO_PUUID, 7, team_id, win if team_id == 100 else not win))
+        if index % 13 == 0:
+            # Player missing from the payload
+            players = []
+        matches.append(make_match(index, players, duration=rng.choice([1500, 2200])))
+    return matches
+
+
+def projected(matches):
+    """Round-trip matches through the decoder used for downloads and the store"""
+    return [decode_match(json.dumps(match).encode("utf-8")) for match in matches]
+
+
+@pytest.fixture
+def history():
+    matches = make_history()
+    return matches, projected(matches)
+
+
+def test_schema_keeps_sync_cursor_fields(history):
+    full, kept = history
+    for original, match in zip(full, kept):
+        assert match["metadata"]["matchId"] == original["metadata"]["matchId"]
+        # RiotAPIClient.get_match_histories advances newest_start_time from these
+        assert match["info"]["gameStartTimestamp"] == original["info"]["gameStartTimestamp"]
+        assert match["info"]["gameCreation"] == original["info"]["gameCreation"]
+
+
+def test_schema_drops_unused_fields(history):
+    _, kept = history
+    participant = kept[0]["info"]["participants"][0]
+    assert "goldEarned" not in participant and "perks" not in participant
+    assert "teams" not in kept[0]["info"]
+    assert set(kept[0]["info"]) <= set(MATCH_SCHEMA["info"])
+
+
+def test_player_table_is_unchanged(history):
+    full, kept = history
+    expected = PlayerMatchTable.from_matches(full, PUUID)
+    actual = PlayerMatchTable.from_matches(kept, PUUID)
+
+    assert actual.match_ids == expected.match_ids
+    assert actual.role_labels == expected.role_labels
+    assert actual.month_labels == expected.month_labels
+    for name, column in vars(expected).items():
+        if isinstance(column, np.ndarray):
+            assert np.array_equal(getattr(actual, name), column), name
+
+
+def test_analyzers_are_unchanged(history):
+    full, kept = history
+    analyzer = MatchAnalyzer()
+    detector = PatternDetector()
+
+    stats = analyzer.analyze_matches(full, PUUID)
+    assert analyzer.analyze_matches(kept, PUUID) == stats
+    assert detector.detect_patterns(kept, stats, PUUID) == detector.detect_patterns(full, stats, PUUID)
+    assert (
+        analyzer.analyze_duo(kept, kept, PUUID, DUO_PUUID)
+        == analyzer.analyze_duo(full, full, PUUID, DUO_PUUID)
+    )
+
+
+def test_prompts_are_unchanged(history):
+    full, kept = history
+    analyzer = MatchAnalyzer()
+    detector = PatternDetector()
+    service = BedrockAIService(region="us-east-1", model_id="anthropic.claude-3-haiku-20240307-v1:0")
+
+    try:
+        prompts = []
+        for matches in (full, kept):
+            stats = analyzer.analyze_matches(matches, PUUID)
+            patterns = detector.detect_patterns(matches, stats, PUUID)
+            prompts.append([
+                service._build_recap_prompt("Player#NA1", stats),
+                service._build_roast_prompt("Player#NA1", stats),
+                service._build_personality_prompt("Player#NA1", stats),
+                service._build_hidden_gems_prompt("Player#NA1", stats, patterns)
+            ])
+        assert prompts[0] == prompts[1]
+    finally:
+        service.close()
+
+
+def test_timeline_participant_fields_are_kept(history):
+    _, kept = history
+    player = next(p for p in kept[0]["info"]["participants"] if p["puuid"] == PUUID)
+    # enrichment.build_section('recent_match_timeline') reads these
+    assert {"participantId", "win"} <= set(player)
+
+
+def test_fallback_decoder_matches_msgspec(monkeypatch, history):
+    full, kept = history
+    monkeypatch.setattr(match_projection, "_match_decoder", None)
+    assert projected(full) == kept
+
+
+def test_unexpected_type_falls_back_to_projection():
+    match = make_player_match(1, PUUID, True)
+    match["info"]["participants"][0]["kills"] = "7"
+    match["info"]["queueId"] = None
+
+    decoded = decode_match(json.dumps(match).encode("utf-8"))
+
+    assert decoded["info"]["participants"][0]["kills"] == "7"
+    assert decoded["info"]["queueId"] is None
+    assert "goldEarned" not in decoded["info"]["participants"][0]
+
+
+def test_missing_fields_stay_missing():
+    match = make_player_match(1, PUUID, True)
+    del match["info"]["gameStartTimestamp"]
+    del match["info"]["participants"][0]["teamPosition"]
+
+    decoded = decode_match(json.dumps(match).encode("utf-8"))
+
+    assert "gameStartTimestamp" not in decoded["info"]
+    assert "teamPosition" not in decoded["info"]["participants"][0]
+
+
+def test_project_match_passes_through_non_dicts():
+    assert project_match(None) is None
+    assert project_match({"metadata": "oops"}) == {"metadata": {}}
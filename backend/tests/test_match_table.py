@@ -0,0 +1,137 @@
+"""
+Player Match Table Tests
+Row extraction and the column helpers the analyzers build on
+"""
+import asyncio
+import time
+
+import numpy as np
+
+from services.match_table import PlayerMatchTable, iter_match_tables
+
+from factories import BASE_CREATION, make_match, make_player_match
+
+
+PUUID = "player-a"
+HOUR = 3600 * 1000
+
+
+def make_table():
+    """Newest first: win, win, missing player, loss, win"""
+    return PlayerMatchTable.from_matches([
+        make_player_match(5, PUUID, True, champion_id=238, kills=10, deaths=0, assists=4, position="MIDDLE"),
+        make_player_match(4, PUUID, True, champion_id=103, kills=2, deaths=4, assists=9, position="UTILITY"),
+        make_match(3),
+        make_player_match(2, PUUID, False, champion_id=238, kills=1, deaths=7, assists=2, position="MIDDLE"),
+        make_player_match(1, PUUID, True, champion_id=238, kills=6, deaths=2, assists=6, position="MIDDLE")
+    ], PUUID)
+
+
+def test_rows_follow_input_order():
+    table = make_table()
+
+    assert len(table) == 5
+    assert table.match_ids == ["NA1_5", "NA1_4", "NA1_3", "NA1_2", "NA1_1"]
+    assert table.game_creation.tolist() == [BASE_CREATION + index * HOUR for index in (5, 4, 3, 2, 1)]
+    assert table.kills.tolist() == [10, 2, 0, 1, 6]
+    assert table.champion_id.tolist() == [238, 103, 0, 238, 238]
+    assert table.team_id.tolist() == [100, 100, 0, 100, 100]
+    assert table.duration.tolist() == [1800] * 5
+    assert table.queue_id.tolist() == [420] * 5
+
+
+def test_rows_without_the_player_are_kept_empty():
+    table = make_table()
+
+    assert table.found.tolist() == [True, True, False, True, True]
+    assert not table.win[2]
+    assert table.kills[2] == table.deaths[2] == table.assists[2] == 0
+    assert table.role_labels[table.role[2]] == "UNKNOWN"
+    # Match data still counts for the missing row
+    assert table.game_creation[2] == BASE_CREATION + 3 * HOUR
+
+
+def test_labels_are_coded_in_first_seen_order():
+    table = make_table()
+
+    assert table.role_labels == ["MIDDLE", "UTILITY", "UNKNOWN"]
+    assert [table.role_labels[code] for code in table.role] == [
+        "MIDDLE", "UTILITY", "UNKNOWN", "MIDDLE", "MIDDLE"
+    ]
+    # Months are local-time "YYYY-MM" keys
+    assert [table.month_labels[code] for code in table.month] == [
+        time.strftime("%Y-%m", time.localtime(created / 1000)) for created in table.game_creation
+    ]
+
+
+def test_empty_and_malformed_matches():
+    assert len(PlayerMatchTable.from_matches([], PUUID)) == 0
+
+    table = PlayerMatchTable.from_matches([{}], PUUID)
+    assert table.match_ids == [""]
+    assert not table.found[0]
+
+
+def test_take_keeps_columns_and_labels_aligned():
+    table = make_table()
+
+    subset = table.take(table.found & table.win)
+
+    assert subset.match_ids == ["NA1_5", "NA1_4", "NA1_1"]
+    assert subset.kills.tolist() == [10, 2, 6]
+    assert subset.role_labels == table.role_labels
+    assert [subset.role_labels[code] for code in subset.role] == ["MIDDLE", "UTILITY", "MIDDLE"]
+
+
+def test_isin_and_kda():
+    table = make_table()
+
+    assert table.isin({"NA1_4", "NA1_1", "NA1_99"}).tolist() == [False, True, False, False, True]
+    assert np.allclose(table.kda(), [14.0, 11 / 4, 0.0, 3 / 7, 6.0])
+
+
+def test_runs_in_row_order():
+    won, lengths = make_table().runs()
+
+    # The missing-player row has win=False, so it extends the loss run
+    assert won.tolist() == [True, False, True]
+    assert lengths.tolist() == [2, 2, 1]
+
+    won, lengths = PlayerMatchTable(0).runs()
+    assert len(won) == len(lengths) == 0
+
+
+def test_group_by_totals_per_code():
+    table = make_table()
+
+    groups = dict(table.group_by(table.champion_id, table.found))
+
+    assert list(groups) == [238, 103]
+    assert groups[238] == {
+        "games": 3, "wins": 2, "kills": 17, "deaths": 9, "assists": 12,
+        "last_played": BASE_CREATION + 5 * HOUR
+    }
+    assert groups[103]["games"] == 1
+    assert table.group_by(table.champion_id, np.zeros(len(table), dtype=bool)) == []
+
+
+def test_group_by_without_mask_includes_every_row():
+    table = make_table()
+
+    games = {table.role_labels[code]: stats["games"] for code, stats in table.group_by(table.role)}
+
+    assert games == {"MIDDLE": 3, "UTILITY": 1, "UNKNOWN": 1}
+
+
+def test_iter_match_tables_chunks_the_stream():
+    async def stream():
+        for index in range(7, 0, -1):
+            yield make_player_match(index, PUUID, index % 2 == 0)
+
+    async def collect():
+        return [table async for table in iter_match_tables(stream(), PUUID, chunk_size=3)]
+
+    tables = asyncio.run(collect())
+
+    assert [len(table) for table in tables] == [3, 3, 1]
+    assert sum((table.match_ids for table in tables), []) == [f"NA1_{index}" for index in range(7, 0, -1)]
@@ -0,0 +1,203 @@
+"""
+Rate Limiter Tests
+Header parsing and the bucket bookkeeping behind RateLimiter
+"""
+import asyncio
+
+import pytest
+
+from services import rate_limiter
+from services.rate_limiter import (
+    RateLimitBucket,
+    RateLimiter,
+    get_method_name,
+    parse_rate_limit_header
+)
+
+
+HOST = "americas"
+METHOD = "match-v5.match"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the limiter module"""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    return now
+
+
+# Header parsing
+
+def test_parse_rate_limit_header():
+    assert parse_rate_limit_header("20:1,100:120") == [(20, 1), (100, 120)]
+    assert parse_rate_limit_header(" 20:1 , 100:120 ") == [(20, 1), (100, 120)]
+
+
+def test_parse_rate_limit_header_skips_malformed_parts():
+    assert parse_rate_limit_header("20:1,oops,5:x,1:2:3,100:120,") == [(20, 1), (100, 120)]
+
+
+@pytest.mark.parametrize("value", [None, "", "garbage"])
+def test_parse_rate_limit_header_empty(value):
+    assert parse_rate_limit_header(value) == []
+
+
+@pytest.mark.parametrize("path, method", [
+    ("/riot/account/v1/accounts/by-riot-id/Name/NA1", "account-v1.by-riot-id"),
+    ("/lol/match/v5/matches/by-puuid/abc/ids", "match-v5.ids"),
+    ("/lol/match/v5/matches/NA1_1", "match-v5.match"),
+    ("/lol/match/v5/matches/NA1_1/timeline", "match-v5.timeline"),
+    ("/lol/champion-mastery/v4/champion-masteries/by-puuid/abc/top", "champion-mastery-v4.top"),
+    ("/lol/champion-mastery/v4/champion-masteries/by-puuid/abc", "champion-mastery-v4.by-puuid"),
+    ("/lol/status/v4/platform-data", "/lol/status/v4")
+])
+def test_get_method_name(path, method):
+    assert get_method_name(path) == method
+
+
+# Buckets
+
+def test_bucket_waits_for_the_fullest_window():
+    bucket = RateLimitBucket([(2, 1), (3, 10)])
+
+    for _ in range(2):
+        assert bucket.wait_time(0.0) == 0
+        bucket.consume(0.0, margin=0.0)
+    assert bucket.wait_time(0.5) == pytest.approx(0.5)
+
+    # The 1s window reset; the 10s window has one request left
+    assert bucket.wait_time(1.0) == 0
+    bucket.consume(1.0, margin=0.0)
+    assert bucket.wait_time(1.0) == pytest.approx(9.0)
+
+
+def test_bucket_pads_windows_by_the_margin():
+    bucket = RateLimitBucket([(1, 1)])
+    bucket.consume(0.0, margin=0.05)
+
+    assert bucket.wait_time(1.0) == pytest.approx(0.05)
+    assert bucket.wait_time(1.05) == 0
+
+
+def test_set_limits_keeps_counts_of_remaining_windows():
+    bucket = RateLimitBucket([(20, 1), (100, 120)])
+    bucket.consume(0.0, margin=0.0)
+
+    bucket.set_limits([(10, 1), (50, 600)])
+
+    assert sorted(bucket.windows) == [1, 600]
+    assert (bucket.windows[1].limit, bucket.windows[1].count) == (10, 1)
+    assert bucket.windows[600].count == 0
+
+
+def test_sync_counts_only_moves_forward():
+    bucket = RateLimitBucket([(20, 1), (100, 120)])
+    for _ in range(5):
+        bucket.consume(0.0, margin=0.0)
+
+    bucket.sync_counts([(3, 1), (90, 120), (7, 600)], now=0.5, margin=0.0)
+
+    assert bucket.windows[1].count == 5
+    assert bucket.windows[120].count == 90
+    assert 600 not in bucket.windows
+
+
+def test_sync_counts_opens_a_window_when_none_is_running():
+    bucket = RateLimitBucket([(20, 1)])
+
+    bucket.sync_counts([(20, 1)], now=3.0, margin=0.1)
+
+    assert bucket.wait_time(3.0) == pytest.approx(1.1)
+
+
+def test_blocked_bucket_waits_for_the_block():
+    bucket = RateLimitBucket([(20, 1)])
+    bucket.blocked_until = 5.0
+
+    assert bucket.wait_time(2.0) == pytest.approx(3.0)
+    assert bucket.wait_time(6.0) == 0
+
+
+# RateLimiter
+
+def test_update_learns_limits_and_counts(clock):
+    limiter = RateLimiter(default_app_limits="20:1,100:120", margin=0.0)
+
+    limiter.update(HOST, METHOD, {
+        "X-App-Rate-Limit": "500:10,30000:600",
+        "X-App-Rate-Limit-Count": "2:10,40:600",
+        "X-Method-Rate-Limit": "2000:10",
+        "X-Method-Rate-Limit-Count": "1:10"
+    })
+
+    app_bucket, method_bucket = limiter._get_buckets(HOST, METHOD)
+    assert {seconds: window.limit for seconds, window in app_bucket.windows.items()} == {10: 500, 600: 30000}
+    assert app_bucket.windows[600].count == 40
+    assert {seconds: window.limit for seconds, window in method_bucket.windows.items()} == {10: 2000}
+    assert method_bucket.windows[10].count == 1
+
+
+def test_update_without_headers_keeps_defaults(clock):
+    limiter = RateLimiter(default_app_limits="20:1,100:120")
+
+    limiter.update(HOST, METHOD, {})
+
+    app_bucket, method_bucket = limiter._get_buckets(HOST, METHOD)
+    assert sorted(app_bucket.windows) == [1, 120]
+    assert method_bucket.windows == {}
+
+
+def test_buckets_are_per_host_and_method():
+    limiter = RateLimiter()
+
+    app_bucket, method_bucket = limiter._get_buckets(HOST, METHOD)
+
+    assert limiter._get_buckets(HOST, "match-v5.ids")[0] is app_bucket
+    assert limiter._get_buckets(HOST, "match-v5.ids")[1] is not method_bucket
+    assert limiter._get_buckets("europe", METHOD)[0] is not app_bucket
+
+
+@pytest.mark.parametrize("limit_type, app_blocked, method_blocked", [
+    ("method", False, True),
+    ("application", True, False),
+    ("service", True, True),
+    (None, True, True)
+])
+def test_penalize_blocks_the_bucket_that_tripped(clock, limit_type, app_blocked, method_blocked):
+    limiter = RateLimiter()
+    headers = {"X-Rate-Limit-Type": limit_type} if limit_type else {}
+
+    limiter.penalize(HOST, METHOD, headers, retry_after=4.0)
+
+    app_bucket, method_bucket = limiter._get_buckets(HOST, METHOD)
+    assert (app_bucket.blocked_until == clock[0] + 4.0) is app_blocked
+    assert (method_bucket.blocked_until == clock[0] + 4.0) is method_blocked
+
+
+def test_penalize_never_shortens_a_block(clock):
+    limiter = RateLimiter()
+
+    limiter.penalize(HOST, METHOD, {"X-Rate-Limit-Type": "method"}, retry_after=10.0)
+    limiter.penalize(HOST, METHOD, {"X-Rate-Limit-Type": "method"}, retry_after=1.0)
+
+    assert limiter._get_buckets(HOST, METHOD)[1].blocked_until == clock[0] + 10.0
+
+
+def test_acquire_sleeps_until_every_window_has_room(clock, monkeypatch):
+    limiter = RateLimiter(default_app_limits="2:1", margin=0.0)
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+
+    async def acquire_three():
+        for _ in range(3):
+            await limiter.acquire(HOST, METHOD)
+
+    asyncio.run(acquire_three())
+
+    assert sleeps == [pytest.approx(1.0)]
@@ -46,6 +46,43 @@ export const getPlayerStats = async (region, summonerName, matchCount = 15) => {
   return response.data
 }
 
+// Streams /api/player section by section; returns a function that closes the stream
+export const streamPlayerStats = (region, summonerName, matchCount = 15, handlers = {}) => {
+  const url = new URL(`${API_BASE_URL}/api/player/${region}/${encodeURIComponent(summonerName)}/stream`)
+  url.searchParams.set('match_count', matchCount)
+
+  const source = new EventSource(url.toString())
+  const listen = (event, handler) => {
+    source.addEventListener(event, (e) => handler?.(JSON.parse(e.data)))
+  }
+
+  listen('summoner', handlers.onSummoner)
+  listen('stats', handlers.onStats)
+  listen('section', handlers.onSection)
+  source.addEventListener('done', (e) => {
+    source.close()
+    handlers.onDone?.(JSON.parse(e.data))
+  })
+  source.addEventListener('error', (e) => {
+    source.close()
+    handlers.onError?.(e.data ? JSON.parse(e.data) : { detail: 'Stream connection lost' })
+  })
+
+  return () => source.close()
+}
+
+export const getSeasonStats = async (region, summonerName, options = {}) => {
+  const response = await api.get(`/api/season/${region}/${encodeURIComponent(summonerName)}`, {
+    params: {
+      start_time: options.startTime,
+      end_time: options.endTime,
+      queue: options.queue,
+      max_matches: options.maxMatches
+    }
+  })
+  return response.data
+}
+
 export const generateInsights = async (region, summonerName, matchCount = 15) => {
   const response = await api.post('/api/insights', {
     region,
@@ -82,6 +119,80 @@ export const analyzePersonality = async (region, summonerName, matchCount = 15)
   return response.data
 }
 
+export const generateAllInsights = async (
+  region,
+  summonerName,
+  matchCount = 15,
+  features = ['recap', 'roast', 'personality', 'hidden_gems']
+) => {
+  const response = await api.post('/api/ai-insights', {
+    region,
+    summonerName,
+    matchCount,
+    features
+  })
+  return response.data
+}
+
+// EventSource only supports GET, so POST streams are read with fetch
+const AI_STREAM_PATHS = {
+  recap: '/api/insights/stream',
+  roast: '/api/roast/stream',
+  personality: '/api/personality/stream',
+  hidden_gems: '/api/hidden-gems/stream'
+}
+
+export const streamAIFeature = (feature, region, summonerName, matchCount, handlers = {}) => {
+  const controller = new AbortController()
+
+  const dispatch = (block) => {
+    let event = 'message'
+    let data = ''
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event: ')) event = line.slice(7)
+      else if (line.startsWith('data: ')) data += line.slice(6)
+    }
+    if (!data) return
+    const payload = JSON.parse(data)
+    if (event === 'token') handlers.onToken?.(payload.text)
+    else if (event === 'result') handlers.onResult?.(payload[feature])
+    else if (event === 'error') handlers.onError?.(payload)
+  }
+
+  const run = async () => {
+    const response = await fetch(`${API_BASE_URL}${AI_STREAM_PATHS[feature]}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+      body: JSON.stringify({ region, summonerName, matchCount }),
+      signal: controller.signal
+    })
+    if (!response.ok) {
+      const body = await response.json().catch(() => ({}))
+      throw new Error(body.detail || `Request failed with status ${response.status}`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+      let boundary
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        dispatch(buffer.slice(0, boundary))
+        buffer = buffer.slice(boundary + 2)
+      }
+    }
+  }
+
+  run().catch((error) => {
+    if (error.name !== 'AbortError') handlers.onError?.({ detail: error.message })
+  })
+
+  return () => controller.abort()
+}
+
 export const comparePlayers = async (player1, player2, region, matchCount = 15) => {
   const response = await api.post('/api/compare', {
     player1,
@@ -92,5 +203,15 @@ export const comparePlayers = async (player1, player2, region, matchCount = 15)
   return response.data
 }
 
+export const compareTeam = async (region, { players, clashPlayer } = {}, matchCount = 15) => {
+  const response = await api.post('/api/compare/team', {
+    region,
+    players,
+    clashPlayer,
+    matchCount
+  })
+  return response.data
+}
+
 export default api
 